@@ -0,0 +1,196 @@
+"""
+Traitement par lots (sans navigateur) des exports Ubipharm (TXT) et Laborex (XLSX).
+
+Exemples :
+    python batch.py exports/ -o sorties/
+    python batch.py "exports/2026-*/*.txt" -o sorties/ --jobs 8
+
+Pour chaque fichier : un classeur Excel (une feuille par région pour Ubipharm,
+ventes / format analytique / synthèse pour Laborex), rangé sous le dossier de sortie
+selon son chemin relatif au dossier commun des entrées. Puis des fichiers consolidés
+sur l'ensemble des fichiers traités.
+"""
+import argparse
+import glob
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import pandas as pd
+
+from components.export import excel_par_region, excel_sheets
+from parsers.laborex import load_laborex_ventes, ventes_long, synthese_par_zone
+from parsers.ubipharm import parse_ubipharm_file
+
+EXTENSIONS = (".txt", ".xlsx")
+
+
+def collect_inputs(patterns: list) -> list:
+    """Dossiers (parcourus récursivement) ou motifs glob -> fichiers TXT/XLSX triés, sans doublons."""
+    files = set()
+    for pattern in patterns:
+        if os.path.isdir(pattern):
+            for root, _, names in os.walk(pattern):
+                files.update(os.path.join(root, n) for n in names if n.lower().endswith(EXTENSIONS))
+        else:
+            files.update(p for p in glob.glob(pattern, recursive=True) if p.lower().endswith(EXTENSIONS))
+    return sorted(os.path.abspath(f) for f in files if not os.path.basename(f).startswith("~$"))
+
+
+def input_root(files: list) -> str:
+    """Dossier commun à tous les fichiers d'entrée (chemins absolus)."""
+    if not files:
+        return ""
+    return os.path.commonpath([os.path.dirname(f) for f in files])
+
+
+def relative_name(path: str, root: str = None) -> str:
+    """Chemin du fichier relatif au dossier commun des entrées (ex. '2026-01/ventes.txt')."""
+    return os.path.relpath(path, root) if root else os.path.basename(path)
+
+
+def _output_path(out_dir: str, path: str, suffix: str, root: str = None) -> str:
+    """
+    Classeur de sortie : même arborescence que les entrées sous `out_dir`,
+    pour que deux fichiers de même nom dans des dossiers différents ne s'écrasent pas.
+    """
+    stem = os.path.splitext(relative_name(path, root))[0]
+    output = os.path.join(out_dir, f"{stem}_{suffix}.xlsx")
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    return output
+
+
+def process_ubipharm(path: str, out_dir: str, workers: int = 1, root: str = None) -> pd.DataFrame:
+    df = parse_ubipharm_file(path, parallel=workers if workers > 1 else False)
+    if df.empty:
+        raise ValueError("le parsing n'a retourné aucune donnée")
+    excel_par_region(df, output=_output_path(out_dir, path, "par_region", root))
+    return df
+
+
+def process_laborex(path: str, out_dir: str, cache_dir: str = None, root: str = None) -> pd.DataFrame:
+    ventes_df = load_laborex_ventes(path, cache_dir)
+    long = ventes_long(ventes_df)
+    excel_sheets({
+        "Ventes_par_zone": ventes_df,
+        "Format_analytique": long,
+        "Synthese_par_zone": synthese_par_zone(long),
+    }, output=_output_path(out_dir, path, "par_zone", root))
+    return long
+
+
+def process_file(path: str, out_dir: str, workers: int = 1, cache_dir: str = None, root: str = None):
+    """
+    Traite un fichier dans un processus du pool (ou dans le processus principal avec
+    `workers` > 1 : les régions d'un gros TXT sont alors parsées en parallèle).
+    `cache_dir` : copies Parquet des classeurs Laborex déjà lus (relances sur les mêmes fichiers).
+    `root` : dossier commun des entrées (arborescence reproduite sous `out_dir`).
+    Renvoie (chemin, type, DataFrame ou None, message d'erreur ou None, durée).
+    """
+    start = time.perf_counter()
+    kind = "ubipharm" if path.lower().endswith(".txt") else "laborex"
+    try:
+        if kind == "ubipharm":
+            df = process_ubipharm(path, out_dir, workers, root)
+        else:
+            df = process_laborex(path, out_dir, cache_dir, root)
+        return path, kind, df, None, time.perf_counter() - start
+    except Exception as e:  # un fichier invalide ne doit pas arrêter tout le lot
+        return path, kind, None, f"{type(e).__name__}: {e}", time.perf_counter() - start
+
+
+def run_files(files: list, out_dir: str, jobs: int, cache_dir: str = None):
+    """
+    Résultats de `process_file` au fil de l'eau : un fichier par processus du pool,
+    ou, s'il y a moins de fichiers que de processus, un fichier à la fois
+    avec ses régions réparties sur le pool.
+    """
+    root = input_root(files)
+    if len(files) < jobs:
+        for path in files:
+            yield process_file(path, out_dir, jobs, cache_dir, root)
+        return
+
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        futures = [pool.submit(process_file, path, out_dir, 1, cache_dir, root) for path in files]
+        for future in as_completed(futures):
+            yield future.result()
+
+
+def write_consolidated(results: dict, out_dir: str, root: str = None) -> list:
+    """
+    Écrit les fichiers consolidés (CSV) et renvoie leurs chemins. La colonne Fichier
+    contient le chemin relatif au dossier commun des entrées (noms identiques distingués).
+    """
+    written = []
+    if root is None:
+        root = input_root([p for items in results.values() for p, _ in items])
+
+    ubipharm = results.get("ubipharm")
+    if ubipharm:
+        df = pd.concat(
+            [df.assign(Fichier=relative_name(p, root)) for p, df in ubipharm],
+            ignore_index=True,
+        )
+        path = os.path.join(out_dir, "ubipharm_consolide.csv")
+        df.to_csv(path, index=False)
+        written.append(path)
+
+    laborex = results.get("laborex")
+    if laborex:
+        long = pd.concat(
+            [df.rename(columns={df.columns[0]: "Produit"}).assign(Fichier=relative_name(p, root))
+             for p, df in laborex],
+            ignore_index=True,
+        )
+        path = os.path.join(out_dir, "laborex_consolide.csv")
+        long.to_csv(path, index=False)
+        written.append(path)
+
+        path = os.path.join(out_dir, "laborex_synthese_par_zone.csv")
+        synthese_par_zone(long).to_csv(path, index=False)
+        written.append(path)
+
+    return written
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Traitement par lots des exports Ubipharm (TXT) et Laborex (XLSX).")
+    parser.add_argument("inputs", nargs="+", help="dossiers ou motifs glob (ex. 'exports/*.txt')")
+    parser.add_argument("-o", "--output", default="sorties", help="dossier de sortie (défaut : sorties)")
+    parser.add_argument("-j", "--jobs", type=int, default=os.cpu_count(),
+                        help="nombre de processus (défaut : nombre de cœurs)")
+    parser.add_argument("--cache-dir", help="dossier des copies Parquet des classeurs Laborex (relectures rapides)")
+    parser.add_argument("--no-consolidate", action="store_true", help="ne pas écrire les fichiers consolidés")
+    args = parser.parse_args(argv)
+
+    files = collect_inputs(args.inputs)
+    if not files:
+        print("Aucun fichier TXT/XLSX trouvé.", file=sys.stderr)
+        return 1
+    os.makedirs(args.output, exist_ok=True)
+
+    start = time.perf_counter()
+    results = {}
+    errors = 0
+    for path, kind, df, error, elapsed in run_files(files, args.output, max(1, args.jobs), args.cache_dir):
+        if error:
+            errors += 1
+            print(f"❌ {path} : {error}", file=sys.stderr)
+            continue
+        results.setdefault(kind, []).append((path, df))
+        print(f"✅ {path} ({kind}, {len(df)} lignes, {elapsed:.1f} s)")
+
+    if not args.no_consolidate:
+        for kind in results:
+            results[kind].sort(key=lambda item: item[0])  # ordre stable, indépendant du pool
+        for path in write_consolidated(results, args.output, input_root(files)):
+            print(f"📦 {path}")
+
+    print(f"{len(files) - errors}/{len(files)} fichier(s) traité(s) en {time.perf_counter() - start:.1f} s")
+    return 1 if errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,142 @@
+"""
+Banc de mesure : parsing (séquentiel, vectorisé et par régions en parallèle), répartition par communes et export Excel sur des fichiers synthétiques.
+
+    python -m benchmarks.run                                   # 1k, 10k, 100k lignes produit
+    python -m benchmarks.run --sizes 1000 1000000 --stages parse
+    python -m benchmarks.run --save avant.json
+    python -m benchmarks.run --baseline benchmarks/results/avant.json
+
+Chaque mesure tourne dans un processus neuf : la mémoire de pointe (RSS) n'est pas
+faussée par les mesures précédentes. Débit en lignes produit par seconde.
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import queue as queue_module
+import tempfile
+import time
+
+from benchmarks.synthetic import write_ubipharm_txt
+from components.perf import peak_rss_bytes
+
+DEFAULT_SIZES = [1_000, 10_000, 100_000]
+STAGES = ["parse", "parse_vectorized", "parse_parallel", "repartition", "export"]
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), "results")
+N_REGIONS = 10
+
+
+def _load(path, parallel=False, engine="loop"):
+    from parsers.ubipharm import parse_ubipharm_parallel, parse_ubipharm_file
+    if parallel:
+        return parse_ubipharm_parallel(path, min_bytes=0)   # pool forcé, même sur petits fichiers
+    return parse_ubipharm_file(path, engine=engine)
+
+
+def _run_stage(stage: str, path: str, queue):
+    """Exécuté dans un processus fils : prépare les entrées, puis mesure uniquement l'étape."""
+    from components.export import excel_par_region
+    from components.repartition import repartir_regions
+    from parsers.schema import sales_columns
+
+    df = None if stage.startswith("parse") else _load(path)
+    month_col = None if df is None else sales_columns(df)[0]
+
+    rss_before = peak_rss_bytes()
+    start = time.perf_counter()
+    if stage.startswith("parse"):
+        df = _load(path, parallel=stage == "parse_parallel",
+                   engine="vectorized" if stage == "parse_vectorized" else "loop")
+        rows = len(df)
+    elif stage == "repartition":
+        rows = len(repartir_regions(df, col=month_col))
+    else:
+        with tempfile.TemporaryDirectory() as tmp:
+            rows = excel_par_region(df, output=os.path.join(tmp, "export.xlsx")).rows
+    seconds = time.perf_counter() - start
+
+    queue.put({
+        "seconds": seconds,
+        "rows": rows,
+        "peak_rss_mb": max(0, peak_rss_bytes() - rss_before) / 2**20,
+    })
+
+
+def measure(stage: str, path: str) -> dict:
+    queue = multiprocessing.Queue()
+    proc = multiprocessing.Process(target=_run_stage, args=(stage, path, queue))
+    proc.start()
+    while True:
+        try:
+            result = queue.get(timeout=1)
+            break
+        except queue_module.Empty:
+            if not proc.is_alive():
+                raise RuntimeError(f"la mesure '{stage}' a échoué (code {proc.exitcode})")
+    proc.join()
+    return result
+
+
+def run(sizes: list, stages: list, workdir: str) -> list:
+    results = []
+    for size in sizes:
+        path = os.path.join(workdir, f"ubipharm_{size}.txt")
+        n_products = max(1, size // N_REGIONS)
+        lines = write_ubipharm_txt(path, n_regions=N_REGIONS, n_products=n_products, seed=size)
+        for stage in stages:
+            res = measure(stage, path)
+            res.update({
+                "stage": stage,
+                "size": lines,
+                "lines_per_s": lines / res["seconds"] if res["seconds"] else float("inf"),
+            })
+            results.append(res)
+            print(f"{stage:<16} {lines:>10,} lignes  {res['seconds']:>8.3f} s  "
+                  f"{res['lines_per_s']:>12,.0f} lignes/s  {res['peak_rss_mb']:>8.1f} Mo")
+    return results
+
+
+def compare(results: list, baseline_path: str):
+    """Affiche le ratio de débit par rapport à une exécution de référence (>1 = plus rapide)."""
+    with open(baseline_path, encoding="utf-8") as f:
+        baseline = {(r["stage"], r["size"]): r for r in json.load(f)["results"]}
+    print(f"\nComparaison avec {baseline_path}")
+    for res in results:
+        ref = baseline.get((res["stage"], res["size"]))
+        if ref is None:
+            continue
+        speedup = res["lines_per_s"] / ref["lines_per_s"] if ref["lines_per_s"] else float("nan")
+        mem = res["peak_rss_mb"] - ref["peak_rss_mb"]
+        print(f"{res['stage']:<16} {res['size']:>10,} lignes  débit x{speedup:.2f}  mémoire {mem:+.1f} Mo")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Banc de mesure parsing / répartition / export Ubipharm.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES, help="lignes produit par fichier")
+    parser.add_argument("--stages", nargs="+", choices=STAGES, default=STAGES)
+    parser.add_argument("--save", help=f"nom du fichier de résultats (dans {RESULTS_DIR})")
+    parser.add_argument("--baseline", help="fichier de résultats de référence à comparer")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as workdir:
+        results = run(args.sizes, args.stages, workdir)
+
+    if args.save:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        path = args.save if os.path.dirname(args.save) else os.path.join(RESULTS_DIR, args.save)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({
+                "date": time.strftime("%Y-%m-%d %H:%M:%S"),
+                "python": platform.python_version(),
+                "machine": platform.machine(),
+                "results": results,
+            }, f, indent=2)
+        print(f"\nRésultats enregistrés : {path}")
+
+    if args.baseline:
+        compare(results, args.baseline)
+
+
+if __name__ == "__main__":
+    main()
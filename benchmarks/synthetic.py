@@ -0,0 +1,80 @@
+"""
+Générateur de fichiers TXT Ubipharm synthétiques (mêmes motifs que les exports réels).
+
+    python -m benchmarks.synthetic sortie.txt --regions 40 --products 25000
+"""
+import argparse
+import random
+
+from components.repartition import region_to_communes
+
+PRODUCT_WORDS = [
+    "PARACETAMOL", "AMOXICILLINE", "IBUPROFENE", "DOLIPRANE", "SERUM PHYSIOLOGIQUE",
+    "VITAMINE C", "METRONIDAZOLE", "ARTEMETHER", "COTRIMOXAZOLE", "OMEPRAZOLE",
+]
+FORMS = ["CPR", "GEL", "SIROP", "INJ", "SUPPO", "SACHET"]
+OTHER_REGIONS = ["KAYES", "KOULIKORO", "SIKASSO", "SEGOU", "MOPTI", "TOMBOUCTOU", "GAO", "KIDAL"]
+
+
+def region_names(n_regions: int) -> list:
+    """Régions du mapping communes d'abord (utiles pour la répartition), puis régions génériques."""
+    base = list(region_to_communes) + OTHER_REGIONS
+    return [base[i] if i < len(base) else f"REGION {i + 1}" for i in range(n_regions)]
+
+
+def iter_ubipharm_lines(n_regions: int = 4, n_products: int = 250, missing_stock: float = 0.1,
+                        month: str = "11/26", seed: int = 0):
+    """
+    Lignes d'un export : en-tête 'Stocks / CR', puis pour chaque région une ligne
+    'Pays … Région NN/XX <nom>' suivie de `n_products` lignes produit.
+    """
+    rnd = random.Random(seed)
+    products = [
+        (f"{rnd.choice('ABCDEFGHJKLMNPRSTUVW')}{i:06d}",
+         f"{rnd.choice(PRODUCT_WORDS)} {rnd.choice([100, 250, 500, 1000])}MG {rnd.choice(FORMS)} B/{rnd.randint(1, 30)}")
+        for i in range(n_products)
+    ]
+
+    yield "UBIPHARM MALI                          ETAT DES VENTES PAR REGION"
+    yield ""
+    yield f"  Code     Désignation                               Stocks / CR  {month}   M-1   M-2   M-3   M-4   M-5   M-6"
+    yield ""
+    for r, name in enumerate(region_names(n_regions), start=1):
+        yield f"Pays 01 MALI          Région {r:02d}/ML {name}"
+        for code, label in products:
+            stock = "" if rnd.random() < missing_stock else str(rnd.randint(0, 2000))
+            sales = " ".join(f"{rnd.randint(0, 900):>5}" for _ in range(7))
+            yield f"  {code}  {label:<40} {stock:>6} / {rnd.randint(0, 60):<4} {sales}"
+        yield f"                     Total Région {name}"
+        yield ""
+
+
+def write_ubipharm_txt(path: str, encoding: str = "latin-1", **kwargs) -> int:
+    """Écrit le fichier en flux (pas de chaîne complète en mémoire). Renvoie le nombre de lignes produit."""
+    with open(path, "w", encoding=encoding, newline="\r\n") as f:
+        for line in iter_ubipharm_lines(**kwargs):
+            f.write(line + "\n")
+    return kwargs.get("n_regions", 4) * kwargs.get("n_products", 250)
+
+
+def ubipharm_txt(**kwargs) -> str:
+    """Même contenu en chaîne (petits volumes, tests rapides)."""
+    return "\r\n".join(iter_ubipharm_lines(**kwargs)) + "\r\n"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Génère un TXT Ubipharm synthétique.")
+    parser.add_argument("output")
+    parser.add_argument("--regions", type=int, default=4)
+    parser.add_argument("--products", type=int, default=250, help="produits par région")
+    parser.add_argument("--missing-stock", type=float, default=0.1, help="part des lignes sans Stock")
+    parser.add_argument("--month", default="11/26")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+    n = write_ubipharm_txt(args.output, n_regions=args.regions, n_products=args.products,
+                           missing_stock=args.missing_stock, month=args.month, seed=args.seed)
+    print(f"{args.output} : {n:,} lignes produit")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+"""
+Graphiques Plotly pré-agrégés et mis en cache, partagés par toutes les sessions.
+
+    fig = bar_figure(("analyse.produits", file_key, regions, search), lambda: totals_par_produit)
+    plot(fig)
+
+Une figure est identifiée par une clé (empreinte du jeu de données + état des filtres) :
+elle est construite une fois, à partir de la série renvoyée par la fonction (appelée
+seulement en l'absence de figure), puis resservie telle quelle aux reruns suivants.
+Le navigateur ne reçoit qu'un nombre borné de points : les barres au-delà des `n` plus
+fortes sont regroupées dans « Autres », les courbes trop longues sont moyennées par paquets.
+"""
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+
+from components.cube import top_n_positions
+from components.perf import measure
+
+MAX_BARS = 30
+MAX_POINTS = 500
+MAX_FIGURES = 64        # figures gardées (les plus récemment affichées)
+OTHERS = "Autres"
+
+
+def top_with_others(values: pd.Series, n: int = MAX_BARS, others: str = OTHERS) -> pd.Series:
+    """Les `n` plus fortes valeurs, décroissantes, puis la somme des autres sous `others`."""
+    values = pd.to_numeric(values, errors="coerce")
+    positions = top_n_positions(values.to_numpy(dtype=float), n)
+    top = values.iloc[positions]
+    if len(values) <= n:
+        return top
+    rest = float(np.nansum(values.to_numpy(dtype=float))) - float(np.nansum(top.to_numpy(dtype=float)))
+    return pd.concat([top, pd.Series([rest], index=[others])])
+
+
+def downsample(frame: pd.DataFrame, max_points: int = MAX_POINTS) -> pd.DataFrame:
+    """
+    Au plus `max_points` lignes : moyenne de chaque paquet de lignes consécutives,
+    étiquetée par la première ligne du paquet (l'index doit être ordonné).
+    """
+    if len(frame) <= max_points:
+        return frame
+    bucket = np.arange(len(frame)) * max_points // len(frame)
+    means = frame.groupby(bucket).mean()
+    means.index = frame.index[np.searchsorted(bucket, means.index)]
+    return means
+
+
+class ChartCache:
+    """Figures indexées par clé, les moins récemment affichées oubliées au-delà de `max_figures`."""
+
+    def __init__(self, max_figures: int = MAX_FIGURES):
+        self.max_figures = max_figures
+        self._figures = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._figures)
+
+    def get(self, key, build) -> go.Figure:
+        """Figure de `key`, construite par `build()` si elle n'est pas en cache."""
+        with self._lock:
+            fig = self._figures.get(key)
+            if fig is not None:
+                self._figures.move_to_end(key)
+                return fig
+        with measure(f"chart.{key[0] if isinstance(key, tuple) else key}"):
+            fig = build()
+        with self._lock:
+            self._figures[key] = fig
+            while len(self._figures) > self.max_figures:
+                self._figures.popitem(last=False)
+        return fig
+
+
+_default_cache = None
+_default_lock = threading.Lock()
+
+
+def get_chart_cache() -> ChartCache:
+    """Cache partagé par toutes les sessions du serveur."""
+    global _default_cache
+    with _default_lock:
+        if _default_cache is None:
+            _default_cache = ChartCache()
+        return _default_cache
+
+
+def _layout(fig: go.Figure, value_label: str) -> go.Figure:
+    fig.update_layout(margin=dict(l=10, r=10, t=30, b=10), yaxis_title=value_label, xaxis_title=None)
+    return fig
+
+
+def bar_figure(key, values, n: int = MAX_BARS, value_label: str = "Ventes") -> go.Figure:
+    """
+    Barres des `n` plus fortes valeurs de la série (index = libellés) et « Autres ».
+    `values` : série, ou fonction qui la renvoie (évaluée seulement si la figure est à construire).
+    """
+    def build():
+        series = top_with_others(values() if callable(values) else values, n)
+        labels = [str(label) for label in series.index]
+        fig = go.Figure(go.Bar(x=labels, y=series.to_numpy(dtype=float), name=value_label))
+        fig.update_xaxes(type="category", categoryorder="array", categoryarray=labels)
+        return _layout(fig, value_label)
+
+    return get_chart_cache().get(key, build)
+
+
+def line_figure(key, frame, max_points: int = MAX_POINTS, value_label: str = "Ventes") -> go.Figure:
+    """
+    Une courbe par colonne de `frame` (index = abscisse ordonnée), réduite à `max_points` points.
+    `frame` : DataFrame, ou fonction qui le renvoie.
+    """
+    def build():
+        data = downsample(frame() if callable(frame) else frame, max_points)
+        fig = go.Figure([
+            go.Scatter(x=[str(x) for x in data.index], y=data[col].to_numpy(dtype=float), mode="lines+markers", name=str(col))
+            for col in data.columns
+        ])
+        return _layout(fig, value_label)
+
+    return get_chart_cache().get(key, build)
+
+
+def plot(fig: go.Figure):
+    """Affiche une figure du cache (sans la copier : elle ne doit pas être modifiée)."""
+    import streamlit as st
+
+    st.plotly_chart(fig, use_container_width=True, config={"displaylogo": False})
@@ -0,0 +1,233 @@
+"""
+Découpage des régions en communes, lu dans un fichier de configuration versionné.
+
+    {
+      "version": "2026-10",
+      "regions": {
+        "BAMAKO EST": ["Commune 1", "Commune 2"],       # parts égales
+        "BAMAKO OUEST": {"Commune 4": 3, "KATI": 1}     # poids relatifs
+      }
+    }
+
+Le fichier (MABOUBI_COMMUNES_FILE, config/communes.json par défaut) est relu quand il change.
+Chaque version donne un `CommuneMapping` immuable, aux index précalculés (communes et parts
+d'une région, régions d'une commune), partagé par toutes les sessions : une même version
+n'est construite qu'une fois, et la correspondance région -> index est mémorisée par version.
+"""
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+COMMUNES_FILE_ENV = "MABOUBI_COMMUNES_FILE"
+DEFAULT_COMMUNES_FILE = os.path.join("config", "communes.json")
+MAX_VERSIONS = 8        # versions gardées en mémoire (fichier modifié, mappings ad hoc)
+MAX_LOOKUPS = 64        # jeux de régions mémorisés par version
+
+# Découpage utilisé sans fichier de configuration (même contenu que config/communes.json)
+DEFAULT_REGIONS = {
+    "BAMAKO RIVE DROITE": ["Commune 5", "Commune 6"],
+    "BAMAKO EST": ["Commune 1", "Commune 2", "Commune 3", "Commune 4"],
+    "BAMAKO OUEST": ["Commune 4"],
+    "BAMAKO CENTRE": ["Commune 1", "Commune 2", "Commune 3", "KATI"],
+}
+
+
+def _region_weights(region: str, spec) -> dict:
+    """{commune: poids} d'une entrée de configuration (liste : poids égaux)."""
+    if isinstance(spec, dict):
+        weights = {str(c): float(w) for c, w in spec.items()}
+    elif isinstance(spec, (list, tuple)):
+        weights = {str(c): 1.0 for c in spec}
+    else:
+        raise ValueError(f"Région {region!r} : liste de communes ou {{commune: poids}} attendu")
+    if any(w < 0 or w != w for w in weights.values()):
+        raise ValueError(f"Région {region!r} : poids négatif ou invalide")
+    return weights
+
+
+def _digest(regions: dict) -> str:
+    canonical = json.dumps(regions, ensure_ascii=False, sort_keys=True)
+    return hashlib.sha1(canonical.encode("utf-8")).hexdigest()[:12]
+
+
+class CommuneMapping:
+    """
+    Découpage région -> communes d'une version. Les couples région × commune sont rangés
+    région par région (ordre du fichier) : `starts[r]`, `counts[r]` délimitent ceux de la région r,
+    `pair_commune` / `pair_part` donnent la commune et sa part (somme = 1 par région).
+    Ne pas construire directement : passer par `commune_mapping` ou `get_commune_mapping`.
+    """
+
+    def __init__(self, weights: dict, version: str, digest: str):
+        self.version = version
+        self.digest = digest
+
+        regions, communes, parts = [], [], []
+        for region, region_weights in weights.items():
+            if not region_weights:
+                continue
+            w = np.fromiter(region_weights.values(), dtype=float, count=len(region_weights))
+            total = w.sum()
+            regions.append(region)
+            communes.append(list(region_weights))
+            # Poids tous nuls : parts égales, comme sans poids
+            parts.append(w / total if total > 0 else np.full(len(w), 1 / len(w)))
+
+        self.regions = pd.Index(regions, dtype=object)
+        self.communes = pd.Index(list(dict.fromkeys(c for names in communes for c in names)), dtype=object)
+        self.counts = np.array([len(names) for names in communes], dtype=np.int64)
+        self.starts = np.cumsum(self.counts) - self.counts
+        self.pair_region = np.repeat(np.arange(len(regions)), self.counts)
+        self.pair_commune = self.communes.get_indexer([c for names in communes for c in names])
+        self.pair_part = np.concatenate(parts) if parts else np.empty(0)
+
+        # Matrice région × commune des parts (répartition horizontale)
+        self.matrix = np.zeros((len(self.regions), len(self.communes)))
+        self.matrix[self.pair_region, self.pair_commune] = self.pair_part
+
+        # Index inverses
+        self.communes_by_region = dict(zip(regions, communes))
+        self.weights_by_region = {
+            region: dict(zip(names, p.tolist())) for region, names, p in zip(regions, communes, parts)
+        }
+        self.regions_by_commune = {}
+        for region, names in zip(regions, communes):
+            for commune in names:
+                self.regions_by_commune.setdefault(commune, []).append(region)
+
+        self._lookups = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.regions)
+
+    def __contains__(self, region):
+        return region in self.communes_by_region
+
+    def __repr__(self):
+        return f"CommuneMapping(version={self.version!r}, regions={len(self.regions)}, communes={len(self.communes)})"
+
+    def _lookup(self, labels: pd.Index) -> np.ndarray:
+        """Index de chaque libellé de région (-1 si absent du découpage), mémorisé par jeu de libellés."""
+        key = tuple(labels)
+        with self._lock:
+            found = self._lookups.get(key)
+            if found is not None:
+                self._lookups.move_to_end(key)
+                return found
+        found = self.regions.get_indexer(labels)
+        with self._lock:
+            self._lookups[key] = found
+            while len(self._lookups) > MAX_LOOKUPS:
+                self._lookups.popitem(last=False)
+        return found
+
+    def region_codes(self, regions) -> np.ndarray:
+        """
+        Index de région de chaque ligne (-1 hors découpage) : seuls les libellés distincts
+        (catégories, ou valeurs factorisées) sont cherchés, puis propagés par leurs codes.
+        """
+        values = regions.array if isinstance(regions, pd.Series) else regions
+        if isinstance(values, pd.Categorical):
+            # Code -1 (valeur manquante) : dernier élément, hors découpage
+            return np.append(self._lookup(values.categories), -1)[values.codes]
+        codes, uniques = pd.factorize(np.asarray(values, dtype=object))
+        return np.append(self._lookup(pd.Index(uniques, dtype=object)), -1)[codes]
+
+    def join(self, codes: np.ndarray):
+        """
+        Jointure lignes × communes sur les index de région `codes` : (ligne, couple) pour chaque
+        commune de la région de chaque ligne, lignes dans l'ordre puis communes dans l'ordre
+        du découpage. Les lignes hors découpage (code -1) sont ignorées.
+        """
+        rows = np.flatnonzero(codes >= 0)
+        codes = codes[rows]
+        counts = self.counts[codes]
+        total = int(counts.sum())
+        rows = np.repeat(rows, counts)
+        # Positions des tranches [start, start + count) concaténées
+        offsets = np.repeat(self.starts[codes] - (np.cumsum(counts) - counts), counts)
+        return rows, np.arange(total, dtype=np.int64) + offsets
+
+    def unmapped(self, regions) -> list:
+        """Régions présentes dans `regions` mais absentes du découpage."""
+        labels = pd.unique(pd.Series(regions).dropna().astype(str))
+        return [r for r in labels if r not in self.communes_by_region]
+
+    def with_regions(self, extra: dict) -> "CommuneMapping":
+        """Nouvelle version : ce découpage complété (ou corrigé) par `extra`."""
+        merged = dict(self.weights_by_region)
+        merged.update({region: _region_weights(region, spec) for region, spec in extra.items()})
+        return commune_mapping(merged)
+
+
+_mappings = OrderedDict()       # empreinte -> CommuneMapping
+_files = {}                     # chemin -> (mtime, taille, empreinte)
+_default_lock = threading.Lock()
+
+
+def commune_mapping(regions: dict, weights: dict = None, version: str = None) -> CommuneMapping:
+    """
+    Découpage de `regions` ({région: [communes]} ou {région: {commune: poids}}), construit une
+    fois par contenu. `weights` ({région: {commune: poids}}) pondère les communes listées ;
+    une commune absente de ses poids a un poids nul.
+    """
+    normalized = {}
+    for region, spec in regions.items():
+        region_weights = _region_weights(region, spec)
+        if weights and weights.get(region):
+            region_weights = {c: float(weights[region].get(c, 0)) for c in region_weights}
+        normalized[str(region)] = region_weights
+
+    digest = _digest(normalized)
+    with _default_lock:
+        mapping = _mappings.get(digest)
+        if mapping is not None and (version is None or mapping.version == version):
+            _mappings.move_to_end(digest)
+            return mapping
+
+    mapping = CommuneMapping(normalized, version or digest, digest)
+    with _default_lock:
+        _mappings[digest] = mapping
+        while len(_mappings) > MAX_VERSIONS:
+            _mappings.popitem(last=False)
+    return mapping
+
+
+def load_commune_mapping(path: str) -> CommuneMapping:
+    """Lit un fichier de découpage ({"version": ..., "regions": {...}})."""
+    with open(path, encoding="utf-8") as f:
+        config = json.load(f)
+    if not isinstance(config, dict) or not isinstance(config.get("regions"), dict):
+        raise ValueError(f"{path} : clé 'regions' ({{région: communes}}) attendue")
+    version = config.get("version")
+    return commune_mapping(config["regions"], version=str(version) if version is not None else None)
+
+
+def get_commune_mapping(path: str = None) -> CommuneMapping:
+    """
+    Découpage courant : fichier MABOUBI_COMMUNES_FILE (config/communes.json par défaut),
+    relu seulement s'il a changé ; `DEFAULT_REGIONS` si le fichier n'existe pas.
+    """
+    path = path or os.environ.get(COMMUNES_FILE_ENV, DEFAULT_COMMUNES_FILE)
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return commune_mapping(DEFAULT_REGIONS, version="défaut")
+
+    signature = (stat.st_mtime_ns, stat.st_size)
+    with _default_lock:
+        known = _files.get(path)
+        mapping = _mappings.get(known[2]) if known and known[:2] == signature else None
+    if mapping is not None:
+        return mapping
+
+    mapping = load_commune_mapping(path)
+    with _default_lock:
+        _files[path] = (*signature, mapping.digest)
+    return mapping
@@ -0,0 +1,88 @@
+import numpy as np
+import pandas as pd
+
+from components.perf import measure
+
+
+def top_n_positions(values, n: int, largest: bool = True) -> np.ndarray:
+    """
+    Positions des `n` plus grandes (ou plus petites) valeurs, triées, par sélection partielle
+    (np.argpartition, O(n) au lieu d'un tri complet). Les NaN passent en dernier ; les ex aequo
+    gardent l'ordre des positions, y compris à la limite du top (même résultat qu'un tri stable).
+    """
+    values = np.asarray(values, dtype=float)
+    valid = np.flatnonzero(~np.isnan(values))
+    k = min(n, len(valid))
+    if k == 0:
+        return np.flatnonzero(np.isnan(values))[:n]
+
+    keyed = -values[valid] if largest else values[valid]
+    if k < len(valid):
+        # Valeur de coupure : tout ce qui est strictement meilleur, puis les premiers ex aequo
+        cut = keyed[np.argpartition(keyed, k - 1)[k - 1]]
+        better = np.flatnonzero(keyed < cut)
+        tied = np.flatnonzero(keyed == cut)[:k - len(better)]
+        chosen = valid[np.concatenate([better, tied])]
+    else:
+        chosen = valid
+    keyed = -values[chosen] if largest else values[chosen]
+    chosen = chosen[np.argsort(keyed, kind="stable")]
+
+    if k < n:
+        chosen = np.concatenate([chosen, np.flatnonzero(np.isnan(values))[:n - k]])
+    return chosen
+
+
+class SalesCube:
+    """
+    Agrégats des ventes précalculés une fois par jeu de données :
+    (Région × produit × mois), puis totaux par région et par produit pour chaque mois.
+    Les requêtes (KPI, classements, top N, seuils) ne relisent plus les lignes produit.
+    """
+
+    def __init__(self, df: pd.DataFrame, sales_cols: list, product_col: str = "Nom Produit"):
+        self.sales_cols = list(sales_cols)
+        self.product_col = product_col
+
+        with measure("cube.build", rows=len(df)):
+            sales = df[self.sales_cols].apply(pd.to_numeric, errors="coerce")
+            keys = df[["Région", product_col]]
+            self.base = (
+                pd.concat([keys, sales], axis=1)
+                .groupby(["Région", product_col], observed=True)[self.sales_cols]
+                .sum()
+            )
+            # observed=True : les catégories sans ligne (produits supprimés) n'apparaissent pas
+            self.by_region = self.base.groupby(level=0, observed=True).sum()
+            self.by_product = self.base.groupby(level=1, observed=True).sum()
+            self.month_totals = self.by_region.sum()
+
+            self.n_products = df[product_col].nunique()
+            self.n_regions = df["Région"].nunique()
+
+    def _months(self, months):
+        return self.sales_cols if months is None else list(months)
+
+    def total(self, months: list = None) -> float:
+        """Ventes totales sur les mois choisis."""
+        return float(self.month_totals[self._months(months)].sum())
+
+    def region_totals(self, months: list = None) -> pd.Series:
+        return self.by_region[self._months(months)].sum(axis=1).rename("Total")
+
+    def product_totals(self, months: list = None) -> pd.Series:
+        return self.by_product[self._months(months)].sum(axis=1).rename("Total")
+
+    def region_ranking(self, months: list = None) -> pd.Series:
+        """Régions de la plus forte à la plus faible."""
+        return self.region_totals(months).sort_values(ascending=False)
+
+    def top_products(self, months: list = None, n: int = 10) -> pd.Series:
+        """Top N produits par sélection partielle (pas de tri de tous les produits)."""
+        totals = self.product_totals(months)
+        return totals.iloc[top_n_positions(totals.to_numpy(dtype=float, na_value=np.nan), n)]
+
+    def low_products(self, months: list = None, threshold: float = 0) -> pd.DataFrame:
+        """Produits dont le total est inférieur ou égal au seuil."""
+        totals = self.product_totals(months).reset_index()
+        return totals[totals["Total"] <= threshold]
@@ -0,0 +1,239 @@
+"""
+Registre des jeux de données parsés, partagé par toutes les sessions du serveur.
+
+Un fichier (export Ubipharm, classeur Laborex) est parsé une seule fois par contenu :
+les autres sessions qui le chargent, ou le reprennent dans la liste des jeux déjà chargés,
+reçoivent le même DataFrame, en lecture seule. Chaque session qui affiche un jeu
+le « tient » : un jeu tenu n'est jamais évincé ; les autres le sont, du moins récemment
+utilisé au plus récent, au-delà du budget mémoire.
+"""
+import os
+import threading
+import time
+from collections import OrderedDict
+
+import pandas as pd
+
+from components.parse_cache import CACHE_DIR_ENV, DEFAULT_MEMORY_BUDGET, ParseCache, content_key, frame_nbytes
+
+REGISTRY_BUDGET_ENV = "MABOUBI_REGISTRY_BUDGET"     # en octets
+LEASE_SECONDS = 30 * 60     # session sans rerun depuis 30 min : ne tient plus son jeu
+
+
+class Dataset:
+    """Jeu enregistré : métadonnées, DataFrame (None si évincé sur disque) et sessions qui le tiennent."""
+    __slots__ = ("key", "kind", "name", "rows", "nbytes", "loaded", "used", "df", "holders")
+
+    def __init__(self, key: str, kind: str, name: str, df: pd.DataFrame):
+        self.key = key
+        self.kind = kind
+        self.name = name
+        self.rows = len(df)
+        self.nbytes = frame_nbytes(df)
+        self.loaded = self.used = time.time()
+        self.df = df
+        self.holders = {}   # détenteur -> dernier rerun (epoch)
+
+    def refs(self, now: float = None, lease: float = LEASE_SECONDS) -> int:
+        now = now or time.time()
+        return sum(1 for seen in self.holders.values() if now - seen <= lease)
+
+    def label(self) -> str:
+        """Libellé stable (pas de compteur) : il entre dans l'identité du widget de choix."""
+        loaded = time.strftime("%d/%m %H:%M", time.localtime(self.loaded))
+        return f"{self.name} · {self.rows:,} lignes · chargé le {loaded}"
+
+
+class DatasetRegistry:
+    """
+    Jeux de données indexés par empreinte du contenu (`content_key`).
+    `disk_dir` : copie Parquet de chaque jeu ; un jeu évincé de la mémoire reste alors
+    disponible et se recharge sans reparser.
+    """
+
+    def __init__(self, memory_budget: int = DEFAULT_MEMORY_BUDGET, disk_dir: str = None,
+                 lease_seconds: float = LEASE_SECONDS):
+        self.memory_budget = memory_budget
+        self.lease_seconds = lease_seconds
+        self._disk = ParseCache(disk_dir) if disk_dir else None
+        self._datasets = OrderedDict()      # clé -> Dataset, du moins au plus récemment utilisé
+        self._holders = {}                  # détenteur -> clé tenue
+        self._loading = {}                  # clé -> verrou du parsing en cours
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._datasets)
+
+    def __contains__(self, key):
+        return key in self._datasets
+
+    @property
+    def memory_used(self) -> int:
+        return sum(d.nbytes for d in self._datasets.values() if d.df is not None)
+
+    def load(self, raw_bytes, name: str, kind: str, parser, version: str, key: str = None):
+        """
+        (clé, DataFrame) du contenu `raw_bytes`, parsé par `parser(raw_bytes)` s'il n'est
+        pas déjà enregistré ; (clé, None) si le parsing échoue (rien n'est enregistré).
+        Deux sessions qui chargent le même fichier en même temps ne le parsent qu'une fois.
+        """
+        key = key or content_key(raw_bytes, kind, version)
+        df = self.get(key)
+        if df is not None:
+            return key, df
+
+        with self._lock:
+            loading = self._loading.setdefault(key, threading.Lock())
+        with loading:
+            df = self.get(key)
+            if df is None:
+                df = self._disk.get(key) if self._disk else None
+                if df is None:
+                    df = parser(raw_bytes)
+                    if df is not None and self._disk:
+                        self._disk.put(key, df)
+                if df is not None:
+                    self._add(Dataset(key, kind, name, df))
+        with self._lock:
+            self._loading.pop(key, None)
+        return key, df
+
+    def _add(self, dataset: Dataset):
+        with self._lock:
+            previous = self._datasets.pop(dataset.key, None)
+            if previous is not None:
+                dataset.holders = previous.holders
+            self._datasets[dataset.key] = dataset
+            self._evict()
+
+    def get(self, key: str):
+        """DataFrame du jeu `key` (rechargé du disque s'il avait été évincé), sinon None."""
+        with self._lock:
+            dataset = self._datasets.get(key)
+            if dataset is None:
+                return None
+            self._datasets.move_to_end(key)
+            dataset.used = time.time()
+            if dataset.df is not None:
+                return dataset.df
+
+        df = self._disk.get(key) if self._disk else None
+        with self._lock:
+            if df is None:
+                self._datasets.pop(key, None)     # copie disque disparue
+                return None
+            dataset.df = df
+            self._evict()
+        return df
+
+    def acquire(self, key: str, holder: str):
+        """
+        `holder` (ex. session + page) affiche le jeu `key` : il n'est pas évincé tant que ce
+        détenteur le tient. Un détenteur ne tient qu'un jeu : le précédent est relâché.
+        À rappeler à chaque rerun (le bail expire après `lease_seconds` sans nouvelles).
+        """
+        with self._lock:
+            self._release(holder)
+            dataset = self._datasets.get(key)
+            if dataset is not None:
+                dataset.holders[holder] = time.time()
+                self._holders[holder] = key
+
+    def release(self, holder: str):
+        with self._lock:
+            self._release(holder)
+
+    def _release(self, holder: str):
+        key = self._holders.pop(holder, None)
+        dataset = self._datasets.get(key)
+        if dataset is not None:
+            dataset.holders.pop(holder, None)
+
+    def refs(self, key: str) -> int:
+        """Nombre de sessions qui tiennent le jeu (baux non expirés)."""
+        dataset = self._datasets.get(key)
+        return dataset.refs(lease=self.lease_seconds) if dataset else 0
+
+    def _evict(self):
+        """Évince les jeux non tenus, du moins récemment utilisé au plus récent, au-delà du budget."""
+        used = self.memory_used
+        now = time.time()
+        for key, dataset in list(self._datasets.items()):
+            if used <= self.memory_budget:
+                break
+            if dataset.df is None or dataset.refs(now, self.lease_seconds):
+                continue
+            used -= dataset.nbytes
+            if self._disk is not None:
+                dataset.df = None
+            else:
+                del self._datasets[key]
+
+    def datasets(self, kind: str = None) -> list:
+        """Jeux disponibles, du plus récemment chargé au plus ancien."""
+        with self._lock:
+            items = list(self._datasets.values())
+        return sorted((d for d in items if kind is None or d.kind == kind), key=lambda d: d.loaded, reverse=True)
+
+
+_default_registry = None
+_default_lock = threading.Lock()
+
+
+def get_dataset_registry() -> DatasetRegistry:
+    """
+    Registre partagé par toutes les sessions du serveur Streamlit (budget MABOUBI_REGISTRY_BUDGET,
+    copie disque dans MABOUBI_CACHE_DIR si la variable est définie).
+    """
+    global _default_registry
+    with _default_lock:
+        if _default_registry is None:
+            _default_registry = DatasetRegistry(
+                memory_budget=int(os.environ.get(REGISTRY_BUDGET_ENV, DEFAULT_MEMORY_BUDGET)),
+                disk_dir=os.environ.get(CACHE_DIR_ENV) or None,
+            )
+        return _default_registry
+
+
+def dataset_picker(kind: str, uploaded_file, parser, version: str, slot: str = None):
+    """
+    Jeu de la page : le fichier chargé s'il y en a un, sinon un jeu déjà chargé choisi dans
+    la liste (par cette session ou une autre). Renvoie (clé, DataFrame), (clé, None) si le
+    fichier ne se parse pas, ou (None, None). La session tient le jeu affiché.
+    """
+    import streamlit as st
+    from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+    registry = get_dataset_registry()
+    ctx = get_script_run_ctx()
+    slot = slot or kind
+    holder = f"{ctx.session_id if ctx else 'local'}:{slot}"
+
+    if uploaded_file is not None:
+        key, df = registry.load(uploaded_file.getvalue(), uploaded_file.name, kind, parser, version)
+    else:
+        available = registry.datasets(kind)
+        if not available:
+            registry.release(holder)
+            return None, None
+        # Choix mémorisé par clé : la liste change quand d'autres sessions chargent des fichiers
+        labels = {d.key: d.label() for d in available}
+        options = list(labels)
+        chosen = st.session_state.get(f"dataset_{slot}")
+        key = st.selectbox(
+            "…ou reprendre un fichier déjà chargé",
+            options,
+            index=options.index(chosen) if chosen in labels else None,
+            format_func=labels.get,
+            placeholder="Choisir un fichier",
+            key=f"dataset_{slot}_choice",
+        )
+        st.session_state[f"dataset_{slot}"] = key
+        if key is None:
+            registry.release(holder)
+            return None, None
+        df = registry.get(key)
+
+    if df is not None:
+        registry.acquire(key, holder)
+    return key, df
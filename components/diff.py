@@ -0,0 +1,134 @@
+"""
+Comparaison de deux exports Ubipharm (mois précédent -> mois courant).
+
+Les lignes sont appariées par (Région, Code Produit) : chaque couple devient un entier
+(codes factorisés des deux colonnes), puis une table de hachage sur l'export précédent
+donne, pour chaque ligne du mois courant, sa ligne d'origine. Les écarts (ventes du mois,
+Stock, CR) et les statuts sont ensuite calculés colonne par colonne, sans boucle par ligne.
+"""
+import numpy as np
+import pandas as pd
+
+from components.perf import timed
+from parsers.schema import sales_columns
+
+KEY_COLS = ["Région", "Code Produit"]
+NEW, DISCONTINUED, KEPT = "nouveau", "arrêté", "suivi"
+STATUSES = [NEW, DISCONTINUED, KEPT]
+
+
+def _floats(df: pd.DataFrame, col: str) -> np.ndarray:
+    if col not in df.columns:
+        return np.full(len(df), np.nan)
+    return pd.to_numeric(df[col], errors="coerce").to_numpy(dtype=float, na_value=np.nan)
+
+
+def _take(values: np.ndarray, positions: np.ndarray) -> np.ndarray:
+    """values[positions], NaN là où la position vaut -1."""
+    out = values[np.maximum(positions, 0)] if len(values) else np.full(len(positions), np.nan)
+    return np.where(positions >= 0, out, np.nan)
+
+
+def _stack(first: pd.Series, second: pd.Series) -> pd.Series:
+    """Concatène deux colonnes, en gardant une catégorielle si les deux le sont."""
+    if isinstance(first.dtype, pd.CategoricalDtype) and isinstance(second.dtype, pd.CategoricalDtype):
+        return pd.Series(pd.api.types.union_categoricals([first.array, second.array]))
+    return pd.concat([first, second], ignore_index=True)
+
+
+def _dedupe(df: pd.DataFrame, keys: np.ndarray):
+    """
+    Une ligne par couple (Région, Code Produit) : les doublons éventuels sont additionnés
+    (nom de la première occurrence). Renvoie (df, keys) inchangés s'il n'y en a pas.
+    """
+    index = pd.Index(keys)
+    if index.is_unique:
+        return df, keys
+    codes, uniques = pd.factorize(keys)
+    numeric = [c for c in ["Stock", "CR"] + sales_columns(df) if c in df.columns]
+    first = np.unique(codes, return_index=True)[1]
+    out = df.iloc[first].reset_index(drop=True)
+    for col in numeric:
+        values = _floats(df, col)
+        sums = np.bincount(codes, weights=np.nan_to_num(values), minlength=len(uniques))
+        seen = np.bincount(codes, weights=~np.isnan(values), minlength=len(uniques)) > 0
+        out[col] = np.where(seen, sums, np.nan)
+    return out, uniques
+
+
+@timed("diff.compare")
+def compare_exports(previous: pd.DataFrame, current: pd.DataFrame) -> pd.DataFrame:
+    """
+    Tableau aligné des deux exports : une ligne par (Région, Code Produit) présent dans l'un
+    ou l'autre, lignes du mois courant d'abord (dans leur ordre), puis produits arrêtés.
+
+    Colonnes : Région, Code Produit, Nom Produit, Statut (nouveau / arrêté / suivi),
+    Ventes préc., Ventes, Δ Ventes, Évolution % ; Stock préc., Stock, Δ Stock ; CR préc., CR, Δ CR.
+    Ventes = première colonne de ventes (mois courant) de chaque export. Les écarts comptent
+    une valeur absente comme 0, sauf pour le Stock (écart inconnu si un des stocks l'est).
+    Mois comparés dans `attrs["months"]` (précédent, courant).
+    """
+    prev_month = sales_columns(previous)[0] if sales_columns(previous) else None
+    cur_month = sales_columns(current)[0] if sales_columns(current) else None
+
+    # Clé entière par couple, commune aux deux exports
+    n_cur = len(current)
+    keys = np.zeros(n_cur + len(previous), dtype=np.int64)
+    for col in KEY_COLS:
+        codes, uniques = pd.factorize(_stack(current[col], previous[col]))
+        keys = keys * (len(uniques) + 1) + (codes + 1)     # valeur manquante : code 0
+    current, cur_keys = _dedupe(current, keys[:n_cur])
+    previous, prev_keys = _dedupe(previous, keys[n_cur:])
+
+    # Jointure par hachage : ligne d'origine de chaque ligne courante, puis lignes disparues
+    matched = pd.Index(prev_keys).get_indexer(cur_keys)
+    gone = np.setdiff1d(np.arange(len(previous)), matched[matched >= 0])
+    prev_pos = np.concatenate([matched, gone])
+    cur_pos = np.concatenate([np.arange(len(current)), np.full(len(gone), -1)])
+    # Identifiants : lus dans l'export courant, ou dans le précédent pour les produits arrêtés
+    id_pos = np.where(cur_pos >= 0, cur_pos, len(current) + prev_pos)
+
+    out = {col: _stack(current[col], previous[col]).take(id_pos).reset_index(drop=True)
+           for col in KEY_COLS + ["Nom Produit"]}
+    status = np.where(cur_pos < 0, 1, np.where(prev_pos < 0, 0, 2))
+    out["Statut"] = pd.Categorical.from_codes(status, STATUSES)
+
+    for label, prev_col, cur_col in [("Ventes", prev_month, cur_month), ("Stock", "Stock", "Stock"), ("CR", "CR", "CR")]:
+        before = _take(_floats(previous, prev_col), prev_pos) if prev_col else np.full(len(prev_pos), np.nan)
+        after = _take(_floats(current, cur_col), cur_pos) if cur_col else np.full(len(cur_pos), np.nan)
+        out[f"{label} préc."] = before
+        out[label] = after
+        if label == "Stock":
+            out[f"Δ {label}"] = after - before
+        else:
+            out[f"Δ {label}"] = np.nan_to_num(after) - np.nan_to_num(before)
+        if label == "Ventes":
+            with np.errstate(divide="ignore", invalid="ignore"):
+                out["Évolution %"] = np.where(before > 0, out["Δ Ventes"] / before * 100, np.nan)
+
+    aligned = pd.DataFrame(out)
+    aligned.attrs["months"] = (prev_month, cur_month)
+    return aligned
+
+
+def diff_summary(aligned: pd.DataFrame) -> dict:
+    """Indicateurs de la comparaison : produits par statut, ventes et stock totaux."""
+    counts = aligned["Statut"].value_counts()
+    return {
+        "nouveaux": int(counts.get(NEW, 0)),
+        "arrêtés": int(counts.get(DISCONTINUED, 0)),
+        "suivis": int(counts.get(KEPT, 0)),
+        "ventes_préc": float(np.nansum(aligned["Ventes préc."])),
+        "ventes": float(np.nansum(aligned["Ventes"])),
+        "stock_préc": float(np.nansum(aligned["Stock préc."])),
+        "stock": float(np.nansum(aligned["Stock"])),
+    }
+
+
+def region_deltas(aligned: pd.DataFrame) -> pd.DataFrame:
+    """Ventes des deux mois et écart par région, du plus fort recul à la plus forte hausse."""
+    return (
+        aligned.groupby("Région", observed=True)[["Ventes préc.", "Ventes", "Δ Ventes"]]
+        .sum()
+        .sort_values("Δ Ventes")
+    )
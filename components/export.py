@@ -0,0 +1,126 @@
+import os
+import time
+from io import BytesIO
+from typing import NamedTuple
+
+import pandas as pd
+from openpyxl import Workbook
+
+from components.perf import timed
+
+XLSX_MIME = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+SHEET_NAME_MAX = 31
+PROGRESS_ROWS = 10_000      # fréquence des rappels d'avancement pendant l'écriture
+CHUNK_ROWS = 10_000         # lignes converties à la fois pour l'écriture en flux
+
+
+class ExcelExport(NamedTuple):
+    """Résultat d'un export : octets (si pas de fichier cible), taille, durée, lignes écrites."""
+    data: bytes
+    nbytes: int
+    seconds: float
+    rows: int
+
+    def summary(self) -> str:
+        return f"{self.rows:,} lignes · {self.nbytes / 1024:,.0f} Ko · {self.seconds:.2f} s"
+
+
+def unique_sheet_names(names) -> list:
+    """
+    Noms de feuilles Excel : tronqués à 31 caractères, doublons suffixés _2, _3...
+    """
+    seen = {}
+    out = []
+    for name in names:
+        sheet_name = str(name)[:SHEET_NAME_MAX]
+        if sheet_name in seen:
+            seen[sheet_name] += 1
+            sheet_name = f"{sheet_name}_{seen[sheet_name]}"
+        else:
+            seen[sheet_name] = 1
+        out.append(sheet_name)
+    return out
+
+
+def _iter_rows(df: pd.DataFrame, chunk_rows: int = CHUNK_ROWS):
+    """
+    En-tête puis lignes, valeurs manquantes (NaN/NA) converties en cellules vides.
+    Conversion en objets Python tranche par tranche : jamais de copie objet de toute la feuille.
+    """
+    yield [str(c) for c in df.columns]
+    for start in range(0, len(df), chunk_rows):
+        chunk = df.iloc[start:start + chunk_rows]
+        columns = []
+        for _, col in chunk.items():
+            values = col.to_numpy(dtype=object)
+            missing = col.isna().to_numpy()
+            if missing.any():
+                values[missing] = None
+            columns.append(values)
+        yield from zip(*columns)
+
+
+def _write_streaming(sheets: list, target, progress):
+    """Classeur openpyxl en mode write-only : les lignes partent directement vers la sortie."""
+    wb = Workbook(write_only=True)
+    total = max(1, sum(len(df) for _, df in sheets))
+    done = 0
+    for sheet_name, df in sheets:
+        ws = wb.create_sheet(title=sheet_name)
+        for i, row in enumerate(_iter_rows(df)):
+            ws.append(row)
+            if progress and i % PROGRESS_ROWS == 0:
+                progress(0.9 * (done + i) / total, sheet_name)
+        done += len(df)
+    if progress:
+        progress(0.9, "enregistrement du classeur")
+    wb.save(target)
+
+
+def _write_pandas(sheets: list, target, progress):
+    total = max(1, sum(len(df) for _, df in sheets))
+    done = 0
+    with pd.ExcelWriter(target, engine="openpyxl") as writer:
+        for sheet_name, df in sheets:
+            if progress:
+                progress(0.9 * done / total, sheet_name)
+            df.to_excel(writer, index=False, sheet_name=sheet_name)
+            done += len(df)
+
+
+@timed("export.excel", rows=lambda export: export.rows)
+def excel_sheets(sheets: dict, output=None, streaming: bool = True, progress=None) -> ExcelExport:
+    """
+    Écrit {nom de feuille: DataFrame} dans un classeur.
+    `output` : chemin ou fichier ; si absent, les octets du classeur sont dans `.data`.
+    `streaming=False` repasse par pd.ExcelWriter (en-têtes mis en forme, modèle complet en RAM).
+    `progress(fraction, message)` est appelé pendant l'écriture (ex. `Job.report`).
+    """
+    start = time.perf_counter()
+    target = output if output is not None else BytesIO()
+    named = list(zip(unique_sheet_names(sheets.keys()), sheets.values()))
+
+    if streaming:
+        _write_streaming(named, target, progress)
+    else:
+        _write_pandas(named, target, progress)
+
+    data = None
+    if output is None:
+        data = target.getvalue()
+        nbytes = len(data)
+    elif isinstance(output, (str, os.PathLike)):
+        nbytes = os.path.getsize(output)
+    else:
+        nbytes = output.tell()
+
+    rows = sum(len(df) for _, df in named)
+    return ExcelExport(data, nbytes, time.perf_counter() - start, rows)
+
+
+def excel_par_region(df: pd.DataFrame, cols: list = None, output=None, streaming: bool = True,
+                     progress=None) -> ExcelExport:
+    """Une feuille par région (colonnes `cols`, toutes par défaut)."""
+    cols = cols or df.columns.tolist()
+    sheets = {region: df_region[cols] for region, df_region in df.groupby("Région", observed=True)}
+    return excel_sheets(sheets, output, streaming, progress)
@@ -0,0 +1,166 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+from components.perf import timed
+from parsers.schema import MONTH_RE, month_period
+
+HISTORY_DIR_ENV = "MABOUBI_HISTORY_DIR"
+DEFAULT_HISTORY_DIR = os.path.join("data", "historique")
+
+KEY_COLS = ["Région", "Code Produit", "Mois"]
+LONG_COLS = ["Région", "Code Produit", "Nom Produit", "Mois", "Ventes", "Stock", "CR", "Export"]
+PARTITION_FILE = "data.parquet"
+
+
+def current_month(df: pd.DataFrame) -> pd.Period:
+    """
+    Mois de l'export, lu dans l'en-tête de la première colonne de ventes (format MM/AA).
+    Lève ValueError si l'export n'a pas d'en-tête de mois (fallback 'MOIS') ou si ce mois
+    est invalide ('13/26') : rien n'est alors écrit dans l'historique.
+    """
+    for col in df.columns:
+        if MONTH_RE.match(str(col)):
+            return month_period(col)
+    raise ValueError("Mois courant introuvable dans les colonnes (format NN/NN attendu).")
+
+
+def to_long(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Passe la sortie de `parse_ubipharm_txt` (mois courant + M-1..M-6 en colonnes)
+    au format long : une ligne par (Région, Code Produit, Mois).
+    Stock et CR ne sont renseignés que pour le mois de l'export.
+    """
+    export = current_month(df)
+    month_col = next(c for c in df.columns if MONTH_RE.match(str(c)))
+    sales_cols = [month_col] + [f"M-{k}" for k in range(1, 7) if f"M-{k}" in df.columns]
+    offsets = [0] + [int(c[2:]) for c in sales_cols[1:]]
+
+    n, k = len(df), len(sales_cols)
+    months = np.array([str(export - off) for off in offsets], dtype=object)
+    is_current = np.array([off == 0 for off in offsets])
+
+    stock = pd.array(np.repeat(df["Stock"].to_numpy(dtype=float, na_value=np.nan), k), dtype="Float64").astype("Int64")
+    cr = pd.array(np.repeat(df["CR"].to_numpy(dtype=float, na_value=np.nan), k), dtype="Float64").astype("Int64")
+    current = np.tile(is_current, n)
+    stock[~current] = pd.NA
+    cr[~current] = pd.NA
+
+    long = pd.DataFrame({
+        "Région": np.repeat(df["Région"].to_numpy(dtype=object), k),
+        "Code Produit": np.repeat(df["Code Produit"].to_numpy(dtype=object), k),
+        "Nom Produit": np.repeat(df["Nom Produit"].to_numpy(dtype=object), k),
+        "Mois": np.tile(months, n),
+        "Ventes": pd.array(df[sales_cols].to_numpy(dtype=float, na_value=np.nan).ravel(), dtype="Float64").astype("Int64"),
+        "Stock": stock,
+        "CR": cr,
+        "Export": str(export),
+    })
+    return long[LONG_COLS]
+
+
+class HistoryStore:
+    """
+    Historique local des ventes, en Parquet partitionné par mois :
+    <racine>/mois=AAAA-MM/data.parquet.
+
+    Chaque ajout ne réécrit que les partitions des mois présents dans l'export.
+    Sur un même (Région, Code Produit, Mois), l'export le plus récent l'emporte.
+    """
+
+    def __init__(self, root: str = None):
+        self.root = root or os.environ.get(HISTORY_DIR_ENV) or DEFAULT_HISTORY_DIR
+
+    def _partition_path(self, month: str) -> str:
+        return os.path.join(self.root, f"mois={month}", PARTITION_FILE)
+
+    def months(self) -> list:
+        """Mois disponibles (AAAA-MM), triés."""
+        if not os.path.isdir(self.root):
+            return []
+        return sorted(
+            name.split("=", 1)[1]
+            for name in os.listdir(self.root)
+            if name.startswith("mois=") and os.path.exists(os.path.join(self.root, name, PARTITION_FILE))
+        )
+
+    def version(self, start: str = None, end: str = None) -> tuple:
+        """
+        Empreinte des partitions entre `start` et `end` : ((mois, date de modification, taille), ...).
+        Change dès qu'un ajout réécrit ou crée une de ces partitions (clé des caches de figures).
+        """
+        stats = [(month, os.stat(self._partition_path(month))) for month in self.months()
+                 if not ((start and month < start) or (end and month > end))]
+        return tuple((month, stat.st_mtime_ns, stat.st_size) for month, stat in stats)
+
+    @staticmethod
+    def _deduplicate(part: pd.DataFrame) -> pd.DataFrame:
+        """
+        Une ligne par clé : les ventes viennent de l'export le plus récent,
+        Stock et CR de l'export dont c'était le mois courant (seules lignes où CR est renseigné).
+        """
+        part = part.sort_values("Export", kind="stable")
+        latest = part.drop_duplicates(KEY_COLS, keep="last").drop(columns=["Stock", "CR"])
+        snapshot = (
+            part[part["CR"].notna()]
+            .drop_duplicates(KEY_COLS, keep="last")[KEY_COLS + ["Stock", "CR"]]
+        )
+        merged = latest.merge(snapshot, on=KEY_COLS, how="left")
+        return (
+            merged[LONG_COLS]
+            .sort_values(["Région", "Code Produit"], kind="stable")
+            .reset_index(drop=True)
+        )
+
+    @timed("history.append", rows=None)
+    def append(self, df: pd.DataFrame) -> int:
+        """
+        Ajoute un export parsé à l'historique.
+        Renvoie le nombre total de lignes des partitions réécrites.
+        """
+        if df.empty:
+            return 0
+        long = to_long(df)
+        written = 0
+        for month, part in long.groupby("Mois", sort=False):
+            path = self._partition_path(month)
+            if os.path.exists(path):
+                part = pd.concat([pd.read_parquet(path), part], ignore_index=True)
+            part = self._deduplicate(part)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.tmp"
+            part.to_parquet(tmp_path, index=False)
+            os.replace(tmp_path, path)
+            written += len(part)
+        return written
+
+    @timed("history.load")
+    def load(self, start: str = None, end: str = None, regions: list = None,
+             products: list = None) -> pd.DataFrame:
+        """
+        Lit l'historique au format long entre `start` et `end` (AAAA-MM, bornes incluses).
+        Seules les partitions des mois demandés sont ouvertes.
+        """
+        filters = []
+        if regions:
+            filters.append(("Région", "in", list(regions)))
+        if products:
+            filters.append(("Code Produit", "in", list(products)))
+
+        frames = []
+        for month in self.months():
+            if (start and month < start) or (end and month > end):
+                continue
+            frames.append(pd.read_parquet(self._partition_path(month), filters=filters or None))
+
+        if not frames:
+            return pd.DataFrame(columns=LONG_COLS)
+        return pd.concat(frames, ignore_index=True)
+
+    def monthly_totals(self, start: str = None, end: str = None, regions: list = None) -> pd.DataFrame:
+        """Ventes totales par mois et par région (tendance multi-mois)."""
+        hist = self.load(start=start, end=end, regions=regions)
+        if hist.empty:
+            return pd.DataFrame(columns=["Mois", "Région", "Ventes"])
+        return hist.groupby(["Mois", "Région"], as_index=False)["Ventes"].sum()
@@ -0,0 +1,159 @@
+"""
+File de tâches de fond partagée par le serveur (exports Excel, agrégations lourdes).
+
+    jobs = get_job_queue()
+    job = jobs.submit(("excel", data_key, cols), lambda report: excel_par_region(df, cols, progress=report))
+    if job_status(job):
+        st.download_button(..., data=job.result.data)
+    ...
+    rerun_while_running(job)      # en fin de page
+
+Une tâche est identifiée par une clé (empreinte du jeu de données + paramètres) : soumettre
+à nouveau la même clé renvoie la tâche existante, en cours ou terminée, dont le résultat
+est servi sans recalcul, pour toutes les sessions. Les tâches tournent dans des threads du
+serveur : un rerun, ou un autre widget modifié pendant le calcul, ne les interrompt pas.
+"""
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from components.perf import measure
+
+JOB_WORKERS_ENV = "MABOUBI_JOB_WORKERS"
+DEFAULT_WORKERS = 2
+MAX_FINISHED = 32       # résultats gardés (les plus récemment consultés)
+POLL_SECONDS = 0.5
+
+PENDING, RUNNING, DONE, FAILED = "en attente", "en cours", "terminé", "échec"
+
+
+class Job:
+    """État d'une tâche, lu par les pages pendant qu'un thread du pool la fait avancer."""
+
+    def __init__(self, key, name: str):
+        self.key = key
+        self.name = name
+        self.status = PENDING
+        self.progress = 0.0
+        self.message = ""
+        self.result = None
+        self.error = None
+        self.seconds = None
+        self._finished = threading.Event()
+
+    @property
+    def done(self) -> bool:
+        return self.status == DONE
+
+    @property
+    def finished(self) -> bool:
+        """Terminée, avec succès ou non."""
+        return self._finished.is_set()
+
+    def report(self, fraction: float, message: str = None):
+        """Avancement (0 à 1) et message, appelés depuis la tâche."""
+        self.progress = min(1.0, max(0.0, float(fraction)))
+        if message is not None:
+            self.message = message
+
+    def wait(self, timeout: float = None) -> bool:
+        """Attend la fin de la tâche (au plus `timeout` secondes) ; True si elle est finie."""
+        return self._finished.wait(timeout)
+
+
+class JobQueue:
+    """Pool de threads et tâches indexées par clé ; les plus anciens résultats sont oubliés."""
+
+    def __init__(self, workers: int = None, max_finished: int = MAX_FINISHED):
+        workers = workers or int(os.environ.get(JOB_WORKERS_ENV, DEFAULT_WORKERS))
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="maboubi-job")
+        self._jobs = OrderedDict()
+        self._lock = threading.Lock()
+        self.max_finished = max_finished
+
+    def __len__(self):
+        return len(self._jobs)
+
+    def get(self, key):
+        """Tâche existante pour `key` (en cours ou terminée), sinon None."""
+        with self._lock:
+            job = self._jobs.get(key)
+            if job is not None:
+                self._jobs.move_to_end(key)
+            return job
+
+    def submit(self, key, func, name: str = None) -> Job:
+        """
+        Lance `func(report)` en arrière-plan, sauf si une tâche de même clé existe déjà
+        (une tâche en échec est relancée). `report(fraction, message)` met à jour l'avancement.
+        """
+        with self._lock:
+            job = self._jobs.get(key)
+            if job is not None and job.status != FAILED:
+                self._jobs.move_to_end(key)
+                return job
+            job = Job(key, name or getattr(func, "__name__", "job"))
+            self._jobs[key] = job
+            self._jobs.move_to_end(key)
+            self._evict()
+        self._pool.submit(self._run, job, func)
+        return job
+
+    def _run(self, job: Job, func):
+        job.status = RUNNING
+        start = time.perf_counter()
+        try:
+            with measure(f"job.{job.name}"):
+                job.result = func(job.report)
+            job.progress = 1.0
+            job.status = DONE
+        except Exception as e:  # l'erreur est affichée par la page, le pool continue
+            job.error = f"{type(e).__name__}: {e}"
+            job.status = FAILED
+        finally:
+            job.seconds = time.perf_counter() - start
+            job._finished.set()
+
+    def _evict(self):
+        finished = [key for key, job in self._jobs.items() if job.finished]
+        for key in finished[:max(0, len(finished) - self.max_finished)]:
+            del self._jobs[key]
+
+
+_default_queue = None
+_default_lock = threading.Lock()
+
+
+def get_job_queue() -> JobQueue:
+    """File partagée par toutes les sessions (MABOUBI_JOB_WORKERS threads, 2 par défaut)."""
+    global _default_queue
+    with _default_lock:
+        if _default_queue is None:
+            _default_queue = JobQueue()
+        return _default_queue
+
+
+def job_status(job: Job) -> bool:
+    """Affiche l'avancement (ou l'erreur) d'une tâche ; True si son résultat est prêt."""
+    import streamlit as st
+
+    if job.done:
+        return True
+    if job.status == FAILED:
+        st.error(f"❌ {job.error}")
+    else:
+        label = f"⏳ {job.status}" + (f" · {job.message}" if job.message else "")
+        st.progress(job.progress, text=label)
+    return False
+
+
+def rerun_while_running(*jobs, interval: float = POLL_SECONDS):
+    """En fin de page : relance le script tant qu'une des tâches affichées n'est pas finie."""
+    import streamlit as st
+
+    pending = [job for job in jobs if job is not None and not job.finished]
+    if pending:
+        pending[0].wait(interval)
+        st.rerun()
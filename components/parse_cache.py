@@ -0,0 +1,102 @@
+import hashlib
+import os
+import threading
+
+import pandas as pd
+
+from components.perf import timed
+
+DEFAULT_MEMORY_BUDGET = 512 * 1024 * 1024      # 512 Mo en RAM (registre des jeux de données)
+DEFAULT_DISK_BUDGET = 2 * 1024 * 1024 * 1024   # 2 Go sur disque
+CACHE_DIR_ENV = "MABOUBI_CACHE_DIR"
+
+
+@timed("parse_cache.content_key", rows=None)
+def content_key(raw_bytes, namespace: str, version: str) -> str:
+    """
+    Clé de cache : empreinte SHA-256 du contenu brut + parseur + version du parseur.
+    Deux uploads identiques (même sous un autre nom) partagent la même clé.
+    """
+    digest = hashlib.sha256(raw_bytes).hexdigest()
+    return f"{namespace}-v{version}-{digest}"
+
+
+def frame_nbytes(df: pd.DataFrame) -> int:
+    """Taille mémoire réelle d'un DataFrame (chaînes incluses)."""
+    return int(df.memory_usage(index=True, deep=True).sum())
+
+
+class ParseCache:
+    """
+    Copies Parquet des résultats de parsing, indexées par `content_key`, évincées du plus
+    ancien au plus récent quand le budget disque est dépassé. La mémoire est gérée par
+    le registre des jeux de données (`components.dataset_registry`), qui s'appuie sur ce cache
+    pour recharger un jeu évincé sans le reparser.
+    """
+
+    def __init__(self, disk_dir: str, disk_budget: int = DEFAULT_DISK_BUDGET):
+        self.disk_dir = disk_dir
+        self.disk_budget = disk_budget
+        os.makedirs(disk_dir, exist_ok=True)
+
+    def _disk_path(self, key):
+        return os.path.join(self.disk_dir, f"{key}.parquet")
+
+    def _disk_evict(self):
+        files = []
+        for name in os.listdir(self.disk_dir):
+            if name.endswith(".parquet"):
+                path = os.path.join(self.disk_dir, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                files.append((stat.st_mtime, stat.st_size, path))
+
+        total = sum(size for _, size, _ in files)
+        for _, size, path in sorted(files):
+            if total <= self.disk_budget:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+
+    def get(self, key):
+        path = self._disk_path(key)
+        if not os.path.exists(path):
+            return None
+        try:
+            df = pd.read_parquet(path)
+        except (ImportError, OSError, ValueError):
+            return None
+        os.utime(path)  # marque l'entrée comme récemment utilisée
+        return df
+
+    def put(self, key, df):
+        path = self._disk_path(key)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            df.to_parquet(tmp_path, index=True)
+            os.replace(tmp_path, path)
+        except (ImportError, OSError, ValueError, TypeError):
+            # Copie "best effort" (pyarrow absent, colonnes non sérialisables...)
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            return
+        self._disk_evict()
+
+    def get_or_parse(self, raw_bytes, parser, namespace: str, version: str, key: str = None):
+        """
+        Renvoie la copie en cache pour ce contenu, sinon appelle `parser(raw_bytes)`
+        et l'enregistre. Un résultat None (échec de parsing) n'est pas mis en cache.
+        `key` évite de rehacher le contenu si l'appelant a déjà calculé `content_key`.
+        """
+        key = key or content_key(raw_bytes, namespace, version)
+        df = self.get(key)
+        if df is None:
+            df = parser(raw_bytes)
+            if df is not None:
+                self.put(key, df)
+        return df
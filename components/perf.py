@@ -0,0 +1,225 @@
+"""
+Instrumentation légère des étapes chaudes (parsing, transformations, exports).
+
+    with measure("export.excel") as s:
+        ...
+        s.rows = len(df)
+
+    @timed("laborex.read_excel")
+    def read_laborex_excel(source): ...
+
+Chaque étape enregistre durée, lignes traitées et mémoire : croissance du pic RSS du
+processus (coût quasi nul ; 0 si ni `resource` ni psutil ne sont disponibles) et, si MABOUBI_PERF_TRACEMALLOC=1, pic d'allocations Python
+de l'étape (tracemalloc, plus précis mais ralentit les allocations).
+Les mesures vont dans un historique en mémoire (panneau « Performance ») et, si
+MABOUBI_PERF_LOG désigne un fichier, dans un journal JSON lines.
+"""
+import functools
+import json
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from collections import deque
+from typing import NamedTuple
+
+try:
+    import resource     # Unix uniquement
+except ImportError:
+    resource = None
+try:
+    import psutil       # optionnel : pic mémoire hors Unix
+except ImportError:
+    psutil = None
+
+PERF_LOG_ENV = "MABOUBI_PERF_LOG"
+TRACEMALLOC_ENV = "MABOUBI_PERF_TRACEMALLOC"
+HISTORY_SIZE = 1000
+
+_history = deque(maxlen=HISTORY_SIZE)
+_lock = threading.Lock()
+_local = threading.local()
+
+
+class StageTiming(NamedTuple):
+    """Mesure d'une étape : nom, début (epoch), durée, lignes, hausse du pic RSS, pic tracemalloc (Mo)."""
+    stage: str
+    started: float
+    seconds: float
+    rows: int
+    rss_mb: float
+    alloc_mb: float
+    page: str
+    depth: int
+
+
+def peak_rss_bytes() -> int:
+    """Pic de mémoire résidente du processus en octets (0 si la plateforme ne le fournit pas)."""
+    if resource is not None:
+        rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return rss if sys.platform == "darwin" else rss * 1024
+    if psutil is not None:
+        info = psutil.Process().memory_info()
+        return int(getattr(info, "peak_wset", info.rss))    # Windows : pic du working set
+    return 0
+
+
+def _maxrss_mb() -> float:
+    return peak_rss_bytes() / 2**20
+
+
+def _stack() -> list:
+    if not hasattr(_local, "stack"):
+        _local.stack = []
+        _local.run = []
+        _local.page = ""
+    return _local.stack
+
+
+class _Stage:
+    """État d'une étape en cours ; `rows` peut être renseigné dans le bloc `with`."""
+    __slots__ = ("name", "rows", "child_peak")
+
+    def __init__(self, name: str, rows=None):
+        self.name = name
+        self.rows = rows
+        self.child_peak = 0
+
+
+class measure:
+    """Context manager : mesure le bloc et l'enregistre sous `name`."""
+
+    def __init__(self, name: str, rows: int = None):
+        self._stage = _Stage(name, rows)
+
+    def __enter__(self) -> _Stage:
+        stack = _stack()
+        self._trace = os.environ.get(TRACEMALLOC_ENV) == "1"
+        if self._trace:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+            self._alloc_start = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+        self._rss_start = _maxrss_mb()
+        self._started = time.time()
+        self._t0 = time.perf_counter()
+        stack.append(self._stage)
+        return self._stage
+
+    def __exit__(self, exc_type, exc, tb):
+        seconds = time.perf_counter() - self._t0
+        stack = _stack()
+        stack.pop()
+
+        alloc_mb = 0.0
+        if self._trace and tracemalloc.is_tracing():
+            # reset_peak est global : le pic des étapes imbriquées est remonté au parent
+            peak = max(tracemalloc.get_traced_memory()[1], self._stage.child_peak)
+            alloc_mb = max(0, peak - self._alloc_start) / 2**20
+            if stack:
+                stack[-1].child_peak = max(stack[-1].child_peak, peak)
+
+        record(StageTiming(
+            stage=self._stage.name,
+            started=self._started,
+            seconds=seconds,
+            rows=int(self._stage.rows or 0),
+            rss_mb=_maxrss_mb() - self._rss_start,
+            alloc_mb=alloc_mb,
+            page=_local.page,
+            depth=len(stack),
+        ))
+        return False
+
+
+def _default_rows(result):
+    return getattr(result, "shape", (None,))[0]
+
+
+def timed(name: str = None, rows=_default_rows):
+    """
+    Décorateur : mesure chaque appel de la fonction (nom par défaut : module.fonction).
+    `rows(résultat)` donne les lignes traitées (par défaut le nombre de lignes d'un DataFrame).
+    """
+    def decorator(func):
+        label = name or f"{func.__module__}.{func.__qualname__}"
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with measure(label) as s:
+                result = func(*args, **kwargs)
+                s.rows = rows(result) if rows else None
+            return result
+        return wrapper
+    return decorator
+
+
+def record(timing: StageTiming):
+    """Ajoute une mesure à l'historique, au rerun courant et au journal JSON lines."""
+    _stack()
+    _local.run.append(timing)
+    with _lock:
+        _history.append(timing)
+        path = os.environ.get(PERF_LOG_ENV)
+        if path:
+            entry = dict(timing._asdict(), pid=os.getpid())
+            with open(path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+
+
+def begin_run(page: str):
+    """Début d'un rerun de page : les mesures suivantes lui sont rattachées."""
+    _stack()
+    _local.run = []
+    _local.page = page
+
+
+def run_timings() -> list:
+    """Mesures du rerun courant (thread du script), dans l'ordre de fin."""
+    _stack()
+    return list(_local.run)
+
+
+def history(page: str = None) -> list:
+    """Dernières mesures du processus (toutes sessions), filtrées par page si demandé."""
+    with _lock:
+        items = list(_history)
+    return [t for t in items if page is None or t.page == page]
+
+
+def performance_panel(page: str = None):
+    """
+    Panneau « Performance » dans la barre latérale (affiché si on l'active) :
+    étapes du rerun courant, puis durée médiane et maximale par étape sur l'historique.
+    """
+    import pandas as pd
+    import streamlit as st
+
+    if not st.sidebar.toggle("⏱️ Performance", key="perf_panel"):
+        return
+
+    with st.sidebar:
+        current = run_timings()
+        if current:
+            df = pd.DataFrame(current, columns=StageTiming._fields)
+            df["stage"] = ["· " * d + s for d, s in zip(df["depth"], df["stage"])]
+            st.caption(f"Ce rerun : {df.loc[df['depth'] == 0, 'seconds'].sum():.2f} s mesurées")
+            st.dataframe(
+                df[["stage", "seconds", "rows", "rss_mb", "alloc_mb"]].round(3),
+                hide_index=True, use_container_width=True,
+            )
+        else:
+            st.caption("Aucune étape mesurée pendant ce rerun.")
+
+        past = history(page)
+        if past:
+            df = pd.DataFrame(past, columns=StageTiming._fields)
+            summary = (
+                df.groupby("stage")["seconds"]
+                .agg(appels="count", médiane="median", max="max")
+                .sort_values("max", ascending=False)
+                .round(3)
+            )
+            st.caption("Historique du serveur")
+            st.dataframe(summary, use_container_width=True)
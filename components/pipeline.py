@@ -0,0 +1,66 @@
+from components.perf import measure
+
+
+class Pipeline:
+    """
+    Calculs d'une page découpés en étapes mémoïsées, avec leurs dépendances.
+
+    Chaque entrée (fichier, filtres...) reçoit une version qui n'augmente que si sa clé change ;
+    chaque étape garde son dernier résultat avec les versions de ses dépendances.
+    À chaque rerun, seules les étapes en aval d'une entrée modifiée sont recalculées.
+    `store` est un dict persistant entre les reruns (ex. une entrée de st.session_state).
+
+        pipe = Pipeline(st.session_state.setdefault("analyse_pipeline", {}))
+        pipe.input("regions", tuple(selected))
+        pipe.stage("filtre", lambda df, regions: ..., deps=["load", "regions"])
+        filtered = pipe.get("filtre")
+    """
+
+    def __init__(self, store: dict):
+        self._store = store
+        self._stages = {}
+        self._versions = {}
+        self.recomputed = []   # étapes recalculées pendant ce rerun
+
+    def input(self, name: str, value, key=None):
+        """
+        Déclare une entrée. `key` (par défaut la valeur) identifie son contenu :
+        pour un gros objet, passer une empreinte (ex. hash du fichier).
+        """
+        key = value if key is None else key
+        entry = self._store.get(name)
+        version = 0 if entry is None else entry["version"] + (entry["key"] != key)
+        self._store[name] = {"key": key, "value": value, "version": version}
+        self._versions[name] = version
+        return self
+
+    def stage(self, name: str, func, deps: list):
+        """Déclare une étape : `func` reçoit les valeurs de `deps` (entrées ou étapes), dans l'ordre."""
+        self._stages[name] = (func, list(deps))
+        return self
+
+    def _resolve(self, name: str) -> int:
+        """Met l'étape (ou l'entrée) à jour si besoin et renvoie sa version."""
+        if name in self._versions:
+            return self._versions[name]
+
+        func, deps = self._stages[name]
+        signature = tuple(self._resolve(d) for d in deps)
+        entry = self._store.get(name)
+        if entry is None or entry["deps"] != signature:
+            with measure(f"pipeline.{name}") as m:
+                value = func(*(self._store[d]["value"] for d in deps))
+                m.rows = getattr(value, "shape", (None,))[0]
+            version = 0 if entry is None else entry["version"] + 1
+            self._store[name] = {"deps": signature, "value": value, "version": version}
+            self.recomputed.append(name)
+        self._versions[name] = self._store[name]["version"]
+        return self._versions[name]
+
+    def get(self, name: str):
+        self._resolve(name)
+        return self._store[name]["value"]
+
+    def key(self, name: str) -> tuple:
+        """Identifiant hashable du résultat courant d'une étape (clé de cache pour l'affichage)."""
+        return name, self._resolve(name)
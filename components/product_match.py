@@ -0,0 +1,243 @@
+import json
+import os
+import re
+import threading
+import unicodedata
+
+import numpy as np
+import pandas as pd
+
+from components.cube import top_n_positions
+
+MAPPING_FILE_ENV = "MABOUBI_MAPPING_FILE"
+DEFAULT_MAPPING_FILE = os.path.join("data", "correspondances_produits.json")
+
+NGRAM = 3
+MAX_DF = 0.2            # n-grammes présents dans plus de 20 % des produits : ignorés (« MG », « CP »...)
+DEFAULT_THRESHOLD = 0.5
+
+_NON_ALNUM_RE = re.compile(r"[^A-Z0-9]+")
+_UNIT_RE = re.compile(r"(\d)\s+(MG|G|ML|L|UI|MCG|%)\b")
+
+
+def normalize_name(name) -> str:
+    """
+    Forme canonique d'un libellé produit : majuscules sans accents, ponctuation -> espace,
+    unités collées aux dosages ('500 mg' -> '500MG'), espaces simples.
+    """
+    text = unicodedata.normalize("NFKD", str(name)).encode("ascii", "ignore").decode("ascii").upper()
+    text = _NON_ALNUM_RE.sub(" ", text).replace(" %", "%")
+    return _UNIT_RE.sub(r"\1\2", text).strip()
+
+
+def ngrams(normalized: str, n: int = NGRAM) -> set:
+    """n-grammes de caractères du libellé normalisé, bordé d'espaces (débuts et fins de mots comptent)."""
+    padded = f" {normalized} "
+    return {padded[i:i + n] for i in range(max(1, len(padded) - n + 1))}
+
+
+class ProductIndex:
+    """
+    Index inversé n-gramme -> produits, construit une fois sur un catalogue (ex. les
+    `Nom Produit` Ubipharm). Une requête ne parcourt que les listes des n-grammes qu'elle
+    contient : pas de comparaison de chaque libellé avec chaque produit.
+
+    Score : Jaccard pondéré par l'IDF des n-grammes (les n-grammes rares pèsent plus),
+    entre 0 et 1. Les candidats sont trouvés par les `PROBES` n-grammes les plus rares du libellé
+    (jamais ceux présents dans plus de MAX_DF des produits, ex. « MG ») ; tous les n-grammes
+    comptent ensuite dans le score exact des `CANDIDATES` meilleurs.
+    """
+
+    CANDIDATES = 20
+    PROBES = 10
+
+    def __init__(self, names, n: int = NGRAM, max_df: float = MAX_DF):
+        self.names = list(dict.fromkeys(str(x) for x in names if pd.notna(x)))
+        self.n = n
+
+        vocab = {}
+        gram_ids, targets = [], []
+        for target, name in enumerate(self.names):
+            ids = {vocab.setdefault(g, len(vocab)) for g in ngrams(normalize_name(name), n)}
+            gram_ids.extend(ids)
+            targets.extend([target] * len(ids))
+        gram_ids = np.asarray(gram_ids, dtype=np.int32)
+        targets = np.asarray(targets, dtype=np.int32)
+
+        n_docs = max(1, len(self.names))
+        df = np.bincount(gram_ids, minlength=len(vocab))
+        self._vocab = vocab
+        self._weights = np.log1p(n_docs / np.maximum(df, 1))
+        self._rare = df <= max(1, max_df * n_docs)
+        self._unknown_weight = np.log1p(n_docs)   # absent du catalogue : aussi rare que possible
+        self._totals = np.bincount(targets, weights=self._weights[gram_ids], minlength=len(self.names))
+
+        # Listes inversées au format CSR : produits du n-gramme g = targets[offsets[g]:offsets[g + 1]]
+        order = np.argsort(gram_ids, kind="stable")
+        self._targets = targets[order]
+        self._offsets = np.concatenate([[0], np.cumsum(df)])
+        # Et l'inverse : n-grammes du produit t = doc_grams[doc_offsets[t]:doc_offsets[t + 1]]
+        self._doc_grams = gram_ids
+        self._doc_offsets = np.concatenate([[0], np.cumsum(np.bincount(targets, minlength=len(self.names)))])
+
+    def __len__(self):
+        return len(self.names)
+
+    def best(self, label, k: int = 5) -> list:
+        """Les `k` meilleurs candidats : [(nom, score), ...] par score décroissant, scores nuls exclus."""
+        return self.best_many([label], k)[0]
+
+    def best_many(self, labels, k: int = 5, chunk: int = 256) -> list:
+        """`best` pour une liste de libellés, traités par blocs en calcul vectorisé."""
+        parsed = []
+        for label in labels:
+            grams = ngrams(normalize_name(label), self.n)
+            known = [self._vocab[g] for g in grams if g in self._vocab]
+            parsed.append((known, len(grams) - len(known)))
+
+        results = []
+        for start in range(0, len(parsed), chunk):
+            results.extend(self._best_chunk(parsed[start:start + chunk], k))
+        return results
+
+    def _best_chunk(self, parsed: list, k: int) -> list:
+        m, n = len(parsed), len(self.names)
+        if n == 0:
+            return [[] for _ in parsed]
+
+        lengths = np.array([len(known) for known, _ in parsed])
+        query_of = np.repeat(np.arange(m, dtype=np.int32), lengths)
+        grams = np.fromiter((g for known, _ in parsed for g in known), dtype=np.int32, count=lengths.sum())
+        unknown = np.array([u for _, u in parsed])
+        query_totals = (np.bincount(query_of, weights=self._weights[grams], minlength=m)
+                        + unknown * self._unknown_weight)
+
+        # 1. Candidats : recouvrement sur les n-grammes discriminants, via les listes inversées
+        # (seuls les PROBES n-grammes les plus rares de chaque libellé : un bon candidat les partage)
+        rare = self._rare[grams]
+        df = self._offsets[grams[rare] + 1] - self._offsets[grams[rare]]
+        rare_q, rare_g, _ = _top_per_group(query_of[rare], grams[rare], -df, self.PROBES)
+        counts = self._offsets[rare_g + 1] - self._offsets[rare_g]
+        targets = self._targets[_expand(self._offsets[rare_g], counts)]
+        rough = np.bincount(np.repeat(rare_q.astype(np.int64), counts) * n + targets,
+                            weights=np.repeat(self._weights[rare_g], counts), minlength=m * n)
+        touched = np.flatnonzero(rough)          # triés par libellé puis produit
+        if not len(touched):
+            return [[] for _ in range(m)]
+        pairs_q, pairs_t = np.divmod(touched, n)
+        rough = rough[touched]
+        # Écarte d'emblée les produits à moins de la moitié du meilleur recouvrement du libellé
+        starts = np.flatnonzero(np.r_[True, pairs_q[1:] != pairs_q[:-1]])
+        row_max = np.maximum.reduceat(rough, starts)
+        close = rough >= 0.5 * np.repeat(row_max, np.diff(np.r_[starts, len(touched)]))
+        pairs_q, pairs_t, _ = _top_per_group(pairs_q[close], pairs_t[close], rough[close],
+                                             max(k, self.CANDIDATES))
+
+        # 2. Score exact (tous les n-grammes) sur les seuls candidats
+        in_query = np.zeros((m, len(self._vocab)), dtype=bool)
+        in_query[query_of, grams] = True
+        counts = self._doc_offsets[pairs_t + 1] - self._doc_offsets[pairs_t]
+        cand_grams = self._doc_grams[_expand(self._doc_offsets[pairs_t], counts)]
+        shared = np.where(in_query[np.repeat(pairs_q, counts), cand_grams], self._weights[cand_grams], 0.0)
+        overlap = np.bincount(np.repeat(np.arange(len(pairs_t)), counts), weights=shared, minlength=len(pairs_t))
+        scores = overlap / (query_totals[pairs_q] + self._totals[pairs_t] - overlap)
+
+        results = [[] for _ in range(m)]
+        best_q, best_t, best_s = _top_per_group(pairs_q, pairs_t, scores, k)
+        for q, t, score in zip(best_q.tolist(), best_t.tolist(), best_s.tolist()):
+            if score > 0:
+                results[q].append((self.names[t], score))
+        return results
+
+
+def _top_per_group(groups: np.ndarray, items: np.ndarray, values: np.ndarray, k: int):
+    """
+    Les `k` éléments de plus forte valeur de chaque groupe : (groupes, éléments, valeurs),
+    groupes croissants puis valeurs décroissantes.
+    """
+    order = np.lexsort((-values, groups))
+    groups, items, values = groups[order], items[order], values[order]
+    idx = np.arange(len(groups))
+    first = np.maximum.accumulate(np.where(np.r_[True, groups[1:] != groups[:-1]], idx, 0))
+    keep = idx - first < k
+    return groups[keep], items[keep], values[keep]
+
+
+def _expand(starts: np.ndarray, counts: np.ndarray) -> np.ndarray:
+    """Positions des tranches [start, start + count) concaténées (lecture CSR vectorisée)."""
+    offsets = np.repeat(starts - (np.cumsum(counts) - counts), counts)
+    return np.arange(counts.sum(), dtype=offsets.dtype) + offsets
+
+
+class MappingStore:
+    """
+    Correspondances validées libellé (ex. Laborex) -> produit (ex. Ubipharm), en JSON.
+    La clé est le libellé normalisé : une variante de casse ou d'accents reste reconnue.
+    """
+
+    def __init__(self, path: str = None):
+        self.path = path or os.environ.get(MAPPING_FILE_ENV, DEFAULT_MAPPING_FILE)
+        self._lock = threading.Lock()
+        self._mapping = None
+
+    def _load(self) -> dict:
+        if self._mapping is None:
+            try:
+                with open(self.path, encoding="utf-8") as f:
+                    self._mapping = json.load(f)
+            except FileNotFoundError:
+                self._mapping = {}
+        return self._mapping
+
+    def get(self, label):
+        return self._load().get(normalize_name(label))
+
+    def __len__(self):
+        return len(self._load())
+
+    def update(self, pairs: dict):
+        """Enregistre {libellé: produit} (écriture atomique du fichier)."""
+        with self._lock:
+            mapping = self._load()
+            mapping.update({normalize_name(k): v for k, v in pairs.items()})
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            tmp = f"{self.path}.tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(mapping, f, ensure_ascii=False, indent=1, sort_keys=True)
+            os.replace(tmp, self.path)
+
+
+_default_store = None
+_default_lock = threading.Lock()
+
+
+def get_mapping_store() -> MappingStore:
+    """Correspondances partagées par toutes les sessions (fichier MABOUBI_MAPPING_FILE ou data/)."""
+    global _default_store
+    with _default_lock:
+        if _default_store is None:
+            _default_store = MappingStore()
+        return _default_store
+
+
+def match_products(labels, index: ProductIndex, store: MappingStore = None,
+                   threshold: float = DEFAULT_THRESHOLD) -> pd.DataFrame:
+    """
+    Propose un produit du catalogue pour chaque libellé distinct.
+    Les correspondances déjà validées (`store`) sont reprises telles quelles (Score 1, Validé).
+    Colonnes : Libellé, Produit, Score, Validé ; Produit vide si le meilleur score < `threshold`.
+    """
+    labels = list(dict.fromkeys(str(x) for x in labels if pd.notna(x)))
+    confirmed = [store.get(label) if store is not None else None for label in labels]
+    pending = [label for label, product in zip(labels, confirmed) if product is None]
+    proposals = dict(zip(pending, index.best_many(pending, k=1)))
+
+    rows = []
+    for label, product in zip(labels, confirmed):
+        if product is not None:
+            rows.append((label, product, 1.0, True))
+            continue
+        best = proposals[label]
+        product, score = best[0] if best else (None, 0.0)
+        rows.append((label, product if score >= threshold else None, score, False))
+    return pd.DataFrame(rows, columns=["Libellé", "Produit", "Score", "Validé"])
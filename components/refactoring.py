@@ -3,14 +3,19 @@ import pandas as pd
 import re
 from io import BytesIO
 
+from parsers.ubipharm import parse_ubipharm_bytes, PARSER_VERSION
+from components.parse_cache import content_key
+from components.table import paged_table, lazy_sections
+
 
 # --- Page Refactoring ---
 st.header("⚙️ Refactoring des données")
 uploaded_file = st.file_uploader("Upload fichier TXT brut", type="txt")
 
 if uploaded_file:
-    txt_content = uploaded_file.read().decode("utf-8", errors="ignore")
-    df = parse_ubipharm_txt(txt_content)
+    raw_bytes = uploaded_file.getvalue()
+    file_key = content_key(raw_bytes, "ubipharm", PARSER_VERSION)
+    df = parse_ubipharm_bytes(raw_bytes)
 
     if df.empty:
         st.warning("Le parsing n’a retourné aucune ligne. Vérifiez le format du fichier TXT.")
@@ -19,15 +24,12 @@ if uploaded_file:
 
         # Vue globale
         st.subheader("🌍 Vue globale : tous les produits")
-        st.dataframe(df, use_container_width=True)
+        paged_table(df, key="refactoring_global", data_key=file_key)
 
-        # Vue par région
+        # Vue par région (chargée à la demande)
         st.subheader("📋 Produits regroupés par région")
         regions = df["Région"].dropna().unique()
-        for region in regions:
-            st.markdown(f"### 📍 {region}")
-            region_df = df[df["Région"] == region]
-            st.dataframe(region_df, use_container_width=True)
+        lazy_sections(df, by="Région", key="refactoring_region", data_key=file_key)
 
         # Sélecteur de colonnes pour export
         st.subheader("🧩 Sélection des colonnes à exporter")
@@ -40,7 +42,7 @@ if uploaded_file:
         if st.button("Appliquer le filtrage"):
             filtered_df = df[selected_cols]
             st.subheader("🗂️ Aperçu des colonnes sélectionnées (vue globale)")
-            st.dataframe(filtered_df, use_container_width=True)
+            paged_table(filtered_df, key="refactoring_filtered", data_key=(file_key, tuple(selected_cols)))
 
             
 
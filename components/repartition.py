@@ -1,29 +1,27 @@
+import numpy as np
 import pandas as pd
 
-region_to_communes = {
-    "BAMAKO RIVE DROITE": ["Commune 5", "Commune 6"],
-    "BAMAKO EST": ["Commune 1", "Commune 2", "Commune 3", "Commune 4"],
-    "BAMAKO OUEST": ["Commune 4"],
-    "BAMAKO CENTRE": ["Commune 1", "Commune 2", "Commune 3", "KATI"],
-}
+from components.communes import DEFAULT_REGIONS, CommuneMapping, commune_mapping, get_commune_mapping
+from components.perf import timed
+
+region_to_communes = DEFAULT_REGIONS     # découpage intégré ; le découpage courant vient de config/communes.json
+
+ID_COLS = ["Région", "Code Produit", "Nom Produit"]
+
 
 def repartir_par_communes(df_region: pd.DataFrame, communes: list, col: str = "11/25") -> pd.DataFrame:
     """
     Répartit la valeur d'une colonne entre les communes en lignes (vertical).
     """
-    repartition = []
-    for _, row in df_region.iterrows():
-        valeur = row[col] if pd.notnull(row[col]) else 0
-        part = valeur / len(communes) if len(communes) > 0 else valeur
-        for commune in communes:
-            repartition.append({
-                "Région": row["Région"],
-                "Commune": commune,
-                "Code Produit": row["Code Produit"],
-                "Nom Produit": row["Nom Produit"],
-                col: part
-            })
-    return pd.DataFrame(repartition)
+    if not communes or df_region.empty:
+        return pd.DataFrame()
+
+    n = len(communes)
+    valeurs = df_region[col].fillna(0).to_numpy(dtype=float)
+    out = {c: np.repeat(df_region[c].to_numpy(dtype=object), n) for c in ID_COLS}
+    out["Commune"] = np.tile(np.asarray(communes, dtype=object), len(df_region))
+    out[col] = np.repeat(valeurs / n, n)
+    return pd.DataFrame(out, columns=["Région", "Commune", "Code Produit", "Nom Produit", col])
 
 
 def repartir_par_communes_horizontal(df_region: pd.DataFrame, communes: list, col: str = "11/25") -> pd.DataFrame:
@@ -37,3 +35,55 @@ def repartir_par_communes_horizontal(df_region: pd.DataFrame, communes: list, co
         df_out[f"{col} {commune}"] = valeur_col / len(communes)
 
     return df_out
+
+
+def _as_mapping(mapping, weights: dict = None) -> CommuneMapping:
+    """Découpage à appliquer : courant (None), dict {région: communes} ou `CommuneMapping`."""
+    if mapping is None:
+        mapping = get_commune_mapping()
+    if isinstance(mapping, CommuneMapping):
+        return commune_mapping(mapping.weights_by_region, weights) if weights else mapping
+    return commune_mapping(mapping, weights)
+
+
+@timed("repartition.regions")
+def repartir_regions(df: pd.DataFrame, col: str = "11/25", mapping=None,
+                     weights: dict = None, horizontal: bool = False, keep_unmapped: bool = False) -> pd.DataFrame:
+    """
+    Répartit `col` entre les communes de toutes les régions du découpage en un seul appel.
+
+    - mapping : `CommuneMapping`, ou {région: [communes]} ; par défaut le découpage courant
+      (`get_commune_mapping`, fichier de configuration) ;
+    - weights : {région: {commune: poids}} pour une répartition pondérée ;
+      sans poids pour une région, les parts sont égales.
+    - keep_unmapped : les régions absentes du découpage sont gardées entières, comme une
+      commune unique portant leur nom ; sinon elles sont ignorées.
+    - horizontal=False : mêmes colonnes que `repartir_par_communes` (une ligne par produit × commune) ;
+      horizontal=True : mêmes colonnes que `repartir_par_communes_horizontal`, une colonne
+      "<col> <commune>" par commune du découpage (0 pour les communes hors de la région).
+
+    Chaque ligne est rattachée à sa région par index (une recherche par libellé distinct),
+    puis étendue à ses communes par une jointure vectorisée sur les couples précalculés.
+    """
+    mapping = _as_mapping(mapping, weights)
+    if keep_unmapped:
+        extra = mapping.unmapped(df["Région"])
+        if extra:
+            mapping = mapping.with_regions({region: [region] for region in extra})
+    codes = mapping.region_codes(df["Région"])
+    values = df[col].fillna(0).to_numpy(dtype=float)
+
+    if not horizontal:
+        rows, pairs = mapping.join(codes)
+        out = {c: df[c].take(rows).reset_index(drop=True) for c in ID_COLS}
+        out["Commune"] = pd.Categorical.from_codes(mapping.pair_commune[pairs], mapping.communes)
+        out[col] = values[rows] * mapping.pair_part[pairs]
+        return pd.DataFrame(out, columns=["Région", "Commune", "Code Produit", "Nom Produit", col])
+
+    # Parts de chaque ligne lues dans la matrice région × commune
+    mapped = codes >= 0
+    split = mapping.matrix[codes[mapped]] * values[mapped][:, None]
+    df_out = df[mapped].copy()
+    for j, commune in enumerate(mapping.communes):
+        df_out[f"{col} {commune}"] = split[:, j]
+    return df_out
@@ -0,0 +1,32 @@
+import numpy as np
+import pandas as pd
+
+
+class NameIndex:
+    """
+    Index de recherche « contient » sur une colonne texte (ex. Nom Produit).
+    Les noms distincts sont mis en minuscules une seule fois ; une recherche ne parcourt
+    que ces noms distincts puis retrouve les lignes par leur code, sans relire la colonne.
+    """
+
+    def __init__(self, values: pd.Series):
+        cat = values.cat if isinstance(values.dtype, pd.CategoricalDtype) else values.astype("category").cat
+        self.codes = cat.codes.to_numpy()
+        self.lower = pd.Index(cat.categories.astype(str)).str.lower()
+
+    def __len__(self):
+        return len(self.codes)
+
+    def _hits(self, term: str) -> np.ndarray:
+        """Codes des noms distincts contenant `term`."""
+        return np.flatnonzero(self.lower.str.contains(term.lower(), regex=False))
+
+    def mask(self, term: str) -> np.ndarray:
+        """Lignes dont le nom contient `term` (insensible à la casse, texte littéral)."""
+        return np.isin(self.codes, self._hits(term))
+
+    def positions(self, term: str, within: np.ndarray = None) -> np.ndarray:
+        """Positions (iloc) des lignes trouvées, restreintes à `within` si fourni."""
+        if within is None:
+            return np.flatnonzero(self.mask(term))
+        return within[np.isin(self.codes[within], self._hits(term))]
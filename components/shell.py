@@ -0,0 +1,77 @@
+"""
+Coquille commune des pages : configuration, logo et menu de navigation.
+
+    from components.shell import app_shell
+    app_shell("ubipharm")
+    ... corps de la page ...
+
+Le menu est rendu une seule fois par rerun, sur la page active (présélectionnée) :
+un choix dans le menu change de page avant que le corps de la page courante ne s'exécute,
+et arriver sur une page ne renvoie jamais ailleurs.
+"""
+import os
+from typing import NamedTuple
+
+import streamlit as st
+from streamlit_option_menu import option_menu
+
+from components.perf import begin_run
+
+LOGO_PATH = os.path.join("assets", "logo.png")
+LOGO_WIDTH = 120
+
+
+class Page(NamedTuple):
+    key: str
+    label: str      # entrée du menu
+    path: str       # script, relatif à la racine de l'application
+    icon: str       # icône Bootstrap du menu
+    title: str      # titre de l'onglet du navigateur
+
+
+PAGES = [
+    Page("accueil", "🏠 Tableau de bord", "app.py", "house", "Tableau de bord"),
+    Page("ubipharm", "📊 Extraction Ubipharm", "pages/ubipharm_page.py", "bar-chart", "Extraction Ubipharm"),
+    Page("laborex", "🧾 Extraction Laborex", "pages/laborex.py", "file-text", "Extraction Laborex"),
+    Page("analyse", "📈 Analyse Ubipharm", "pages/analyse.py", "graph-up", "Analyse Ubipharm"),
+    Page("correspondance", "🔗 Correspondance produits", "pages/correspondance.py", "link", "Correspondance produits"),
+    Page("comparaison", "🔀 Comparaison mensuelle", "pages/comparaison.py", "arrow-left-right", "Comparaison mensuelle"),
+]
+_BY_KEY = {p.key: p for p in PAGES}
+
+
+@st.cache_resource
+def _logo(path: str = LOGO_PATH) -> bytes:
+    """Logo lu une fois par processus (et non à chaque rerun de chaque session)."""
+    with open(path, "rb") as f:
+        return f.read()
+
+
+def app_shell(page: str) -> Page:
+    """
+    À appeler en tête de chaque page : configuration, début des mesures de performance,
+    logo et menu. Si l'utilisateur choisit une autre page, on y bascule immédiatement.
+    """
+    current = _BY_KEY[page]
+    st.set_page_config(page_title=current.title, page_icon="📊", layout="wide")
+    begin_run(page)
+
+    with st.sidebar:
+        st.image(_logo(), width=LOGO_WIDTH)
+        selected = option_menu(
+            "Navigation",
+            [p.label for p in PAGES],
+            icons=[p.icon for p in PAGES],
+            menu_icon="cast",
+            default_index=PAGES.index(current),
+            key=f"nav_{page}",
+        )
+
+    if selected and selected != current.label:     # None : menu pas encore monté côté navigateur
+        st.switch_page(next(p.path for p in PAGES if p.label == selected))
+    return current
+
+
+def page_path(page: str) -> str:
+    """Chemin du script d'une page (pour st.page_link / st.switch_page)."""
+    return _BY_KEY[page].path
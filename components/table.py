@@ -0,0 +1,78 @@
+import math
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+DEFAULT_PAGE_SIZE = 50
+
+
+def is_text_dtype(dtype) -> bool:
+    return dtype == object or isinstance(dtype, pd.CategoricalDtype)
+
+
+def _view_positions(df: pd.DataFrame, search: str, search_cols: list, sort_col, ascending: bool) -> np.ndarray:
+    """Positions (iloc) des lignes filtrées puis triées, calculées côté serveur."""
+    mask = np.ones(len(df), dtype=bool)
+    if search:
+        needle = search.lower()
+        found = np.zeros(len(df), dtype=bool)
+        for col in search_cols:
+            found |= df[col].astype(str).str.lower().str.contains(needle, regex=False, na=False).to_numpy()
+        mask &= found
+    positions = np.flatnonzero(mask)
+
+    if sort_col is not None and len(positions):
+        values = df[sort_col].iloc[positions].reset_index(drop=True)
+        order = values.sort_values(ascending=ascending, kind="stable", na_position="last").index
+        positions = positions[order.to_numpy()]
+    return positions
+
+
+def paged_table(df: pd.DataFrame, key: str, page_size: int = DEFAULT_PAGE_SIZE,
+                search_cols: list = None, data_key=None):
+    """
+    Tableau paginé : seule la page visible est envoyée au navigateur.
+    Recherche et tri sont calculés côté serveur ; si `data_key` identifie les données
+    (ex. empreinte du fichier + filtres), le résultat est mémorisé dans la session
+    tant que ni les données ni les paramètres ne changent.
+    """
+    if df.empty:
+        st.dataframe(df, use_container_width=True)
+        return
+
+    if search_cols is None:
+        search_cols = [c for c in df.columns if is_text_dtype(df[c].dtype)]
+
+    c1, c2, c3 = st.columns([3, 2, 1])
+    search = c1.text_input("🔎 Rechercher", key=f"{key}_search") if search_cols else ""
+    sort_col = c2.selectbox("Trier par", options=[None] + list(df.columns),
+                            format_func=lambda c: "—" if c is None else str(c), key=f"{key}_sort")
+    ascending = c3.radio("Ordre", ["↑", "↓"], horizontal=True, key=f"{key}_order") == "↑"
+
+    signature = (data_key, len(df), search, sort_col, ascending)
+    cached = st.session_state.get(f"{key}_view")
+    if data_key is None or cached is None or cached[0] != signature:
+        cached = (signature, _view_positions(df, search, search_cols, sort_col, ascending))
+        st.session_state[f"{key}_view"] = cached
+    positions = cached[1]
+
+    n_pages = max(1, math.ceil(len(positions) / page_size))
+    if st.session_state.get(f"{key}_page", 1) > n_pages:
+        st.session_state[f"{key}_page"] = 1
+    page = st.number_input("Page", min_value=1, max_value=n_pages, step=1, key=f"{key}_page")
+    start = (int(page) - 1) * page_size
+    st.dataframe(df.iloc[positions[start:start + page_size]], use_container_width=True)
+    st.caption(f"Page {int(page)}/{n_pages} · {len(positions):,} ligne(s) sur {len(df):,}")
+
+
+def lazy_sections(df: pd.DataFrame, by: str, key: str, page_size: int = DEFAULT_PAGE_SIZE, data_key=None):
+    """
+    Une section par valeur de `by` (ex. Région), rendue uniquement quand on la coche :
+    les sections fermées ne coûtent ni calcul ni transfert.
+    """
+    counts = df[by].value_counts(sort=False, dropna=True)
+    for value in df[by].dropna().unique():
+        if st.checkbox(f"📍 {value} ({counts[value]:,} lignes)", key=f"{key}_{value}"):
+            paged_table(df[df[by] == value], key=f"{key}_{value}_table", page_size=page_size,
+                        data_key=None if data_key is None else (data_key, value))
@@ -0,0 +1,116 @@
+"""
+Tendances et prévisions sur les 7 mois de ventes de chaque ligne (mois courant, M-1..M-6).
+
+Les ventes forment une matrice (lignes × mois, du plus ancien au plus récent) : moyennes
+mobiles, croissances, couverture du stock et prévision du mois suivant sont calculées
+par opérations matricielles NumPy sur tout le bloc, jamais ligne par ligne.
+"""
+import numpy as np
+import pandas as pd
+
+from components.perf import measure
+from parsers.schema import sales_columns
+
+SHORT_WINDOW = 3
+LONG_WINDOW = 6
+TREND_COLS = [
+    "Moy. 3 mois", "Moy. 6 mois", "Évol. M-1 %", "Tendance 3 mois %", "Couverture (mois)", "Prévision M+1",
+]
+
+
+def sales_matrix(df: pd.DataFrame, sales_cols: list = None) -> np.ndarray:
+    """Ventes (lignes × mois), du mois le plus ancien au mois courant ; valeur absente = 0."""
+    sales_cols = sales_columns(df) if sales_cols is None else sales_cols
+    values = df[list(reversed(sales_cols))].apply(pd.to_numeric, errors="coerce")
+    return np.nan_to_num(values.to_numpy(dtype=float, na_value=np.nan))
+
+
+def moving_average(matrix: np.ndarray, window: int) -> np.ndarray:
+    """Moyennes mobiles sur `window` mois (sommes cumulées) : lignes × (mois - window + 1)."""
+    window = min(window, matrix.shape[1])
+    cumsum = np.cumsum(np.pad(matrix, ((0, 0), (1, 0))), axis=1)
+    return (cumsum[:, window:] - cumsum[:, :-window]) / window
+
+
+def _growth(after: np.ndarray, before: np.ndarray) -> np.ndarray:
+    """Croissance en % (NaN si la base est nulle)."""
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(before > 0, (after - before) / before * 100, np.nan)
+
+
+def linear_forecast(matrix: np.ndarray) -> np.ndarray:
+    """
+    Prévision du mois suivant par droite des moindres carrés sur les mois de chaque ligne
+    (pente = covariance mois / ventes ÷ variance des mois), bornée à 0.
+    """
+    n_months = matrix.shape[1]
+    t = np.arange(n_months, dtype=float)
+    t_centered = t - t.mean()
+    mean = matrix.mean(axis=1)
+    slope = (matrix - mean[:, None]) @ t_centered / (t_centered @ t_centered) if n_months > 1 else 0.0
+    return np.maximum(mean + slope * (n_months - t.mean()), 0)
+
+
+def trend_frame(matrix: np.ndarray, stock: np.ndarray, index=None) -> pd.DataFrame:
+    """Colonnes de tendance (`TREND_COLS`) d'une matrice de ventes et des stocks correspondants."""
+    short = moving_average(matrix, SHORT_WINDOW)
+    long = moving_average(matrix, LONG_WINDOW)
+    previous = matrix[:, -2] if matrix.shape[1] > 1 else np.full(len(matrix), np.nan)
+    earlier = short[:, -1 - SHORT_WINDOW] if short.shape[1] > SHORT_WINDOW else np.full(len(matrix), np.nan)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        coverage = np.where(short[:, -1] > 0, stock / short[:, -1], np.nan)
+    return pd.DataFrame({
+        "Moy. 3 mois": short[:, -1],
+        "Moy. 6 mois": long[:, -1],
+        "Évol. M-1 %": _growth(matrix[:, -1], previous),
+        "Tendance 3 mois %": _growth(short[:, -1], earlier),
+        "Couverture (mois)": coverage,
+        "Prévision M+1": np.round(linear_forecast(matrix)),
+    }, index=index)
+
+
+class SalesTrends:
+    """
+    Tendances calculées une fois par jeu de données : par ligne produit (`products`,
+    aligné sur l'index du DataFrame) et par région (`regions`, ventes et stocks agrégés).
+    La couverture est le stock divisé par la moyenne des 3 derniers mois (en mois de ventes).
+    """
+
+    def __init__(self, df: pd.DataFrame, sales_cols: list = None):
+        self.sales_cols = sales_columns(df) if sales_cols is None else list(sales_cols)
+
+        with measure("trends.build", rows=len(df)):
+            matrix = sales_matrix(df, self.sales_cols)
+            stock = pd.to_numeric(df["Stock"], errors="coerce").to_numpy(dtype=float, na_value=np.nan)
+            self.products = trend_frame(matrix, stock, index=df.index)
+
+            # Agrégats par région : une somme par colonne (bincount) sur les codes de région
+            codes, regions = pd.factorize(df["Région"], sort=True)
+            valid = codes >= 0
+            n = len(regions)
+            region_sales = np.column_stack([
+                np.bincount(codes[valid], weights=matrix[valid, j], minlength=n) for j in range(matrix.shape[1])
+            ]) if n else np.zeros((0, matrix.shape[1]))
+            region_stock = np.bincount(codes[valid], weights=np.nan_to_num(stock[valid]), minlength=n)
+            self.regions = trend_frame(region_sales, region_stock, index=pd.Index(regions, name="Région"))
+            self.regions.insert(0, "Ventes (mois courant)", region_sales[:, -1] if n else [])
+
+            self.month_totals = matrix.sum(axis=0)
+            self.stock_total = float(np.nansum(stock))
+            self.low_coverage = int((self.products["Couverture (mois)"] < 1).sum())
+
+    def kpis(self) -> dict:
+        """Indicateurs globaux : prévision totale, croissances, couverture du stock total."""
+        totals = self.month_totals[None, :]
+        short = moving_average(totals, SHORT_WINDOW)[0, -1]
+        previous = totals[:, -2] if totals.shape[1] > 1 else np.array([np.nan])
+        return {
+            "prévision": float(self.products["Prévision M+1"].sum()),
+            "évolution": float(_growth(totals[:, -1], previous)[0]),
+            "couverture": self.stock_total / short if short > 0 else float("nan"),
+            "ruptures": self.low_coverage,
+        }
+
+    def with_products(self, df: pd.DataFrame) -> pd.DataFrame:
+        """`df` (ou une partie de ses lignes) complété des colonnes de tendance."""
+        return df.join(self.products)
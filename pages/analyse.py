@@ -1,9 +1,22 @@
 import re
-import io
+
+import numpy as np
 import pandas as pd
 import streamlit as st
 
-st.set_page_config(page_title="Analyse Ubipharm", layout="wide")
+from components.charts import bar_figure, line_figure, plot
+from components.history_store import HistoryStore
+from parsers.schema import read_sales_csv
+from components.export import excel_sheets, XLSX_MIME
+from components.parse_cache import content_key
+from components.table import paged_table
+from components.cube import top_n_positions
+from components.pipeline import Pipeline
+from components.search_index import NameIndex
+from components.perf import performance_panel
+from components.shell import app_shell
+
+app_shell("analyse")
 
 st.header("📊 Analyse des indicateurs de performance — Ubipharm")
 
@@ -24,38 +37,47 @@ def detect_commune_columns(df: pd.DataFrame, month_col: str):
     pattern = re.compile(rf"^{re.escape(month_col)}\s+Commune\s+\d+$")
     return [c for c in df.columns if pattern.match(str(c))]
 
-def kpi_block(df: pd.DataFrame, month_col: str):
+def compute_kpis(df: pd.DataFrame, month_col: str):
     total_month = df[month_col].sum() if month_col in df.columns else 0
     nb_products = df.shape[0]
     avg_per_product = total_month / nb_products if nb_products else 0
+    return total_month, nb_products, avg_per_product
 
+def kpi_block(kpis):
+    total_month, nb_products, avg_per_product = kpis
     c1, c2, c3 = st.columns(3)
     c1.metric("Total ventes (mois courant)", f"{total_month:,.0f}")
     c2.metric("Nombre de produits", f"{nb_products}")
     c3.metric("Vente moyenne / produit", f"{avg_per_product:,.2f}")
 
-def top_bottom_products(df: pd.DataFrame, month_col: str, n=10):
+def top_bottom_frames(df: pd.DataFrame, month_col: str, n=10):
+    values = pd.to_numeric(df[month_col], errors="coerce").to_numpy(dtype=float, na_value=np.nan)
+    cols = ["Région", "Nom Produit", month_col]
+    top_df = df.iloc[top_n_positions(values, n, largest=True)][cols]
+    bottom_df = df.iloc[top_n_positions(values, n, largest=False)][cols]
+    return top_df, bottom_df
+
+def top_bottom_products(frames):
+    top_df, bottom_df = frames
     st.subheader("🏆 Top produits (mois courant)")
-    top_df = df.sort_values(by=month_col, ascending=False).head(n)
-    st.dataframe(top_df[["Région", "Nom Produit", month_col]], use_container_width=True)
+    st.dataframe(top_df, use_container_width=True)
 
     st.subheader("🔻 Produits à faible consommation")
-    bottom_df = df.sort_values(by=month_col, ascending=True).head(n)
-    st.dataframe(bottom_df[["Région", "Nom Produit", month_col]], use_container_width=True)
+    st.dataframe(bottom_df, use_container_width=True)
 
-def commune_comparison(df: pd.DataFrame, month_col: str, commune_cols: list):
+def commune_comparison(df: pd.DataFrame, month_col: str, commune_cols: list, sums, chart_key, data_key=None):
     if not commune_cols:
         st.info("Aucune colonne de communes détectée pour le mois courant.")
         return
     st.subheader("🏙️ Répartition par communes (mois courant)")
-    # Sommes par commune
-    sums = df[commune_cols].sum().rename("Ventes")
-    st.bar_chart(sums)
+    # Sommes par commune (calculées seulement si le graphique n'est pas en cache)
+    plot(bar_figure(("analyse.communes",) + chart_key, sums))
 
     # Tableau détaillé
-    st.dataframe(df[["Région", "Nom Produit"] + commune_cols + [month_col]], use_container_width=True)
+    paged_table(df[["Région", "Nom Produit"] + commune_cols + [month_col]], key="analyse_communes",
+                search_cols=["Nom Produit"], data_key=data_key)
 
-def stock_cr_section(df: pd.DataFrame):
+def stock_cr_section(df: pd.DataFrame, data_key=None):
     cols = [c for c in ["Stock", "CR"] if c in df.columns]
     if not cols:
         return
@@ -65,27 +87,90 @@ def stock_cr_section(df: pd.DataFrame):
         c1.metric("Stock total", f"{df['Stock'].fillna(0).sum():,.0f}")
     if "CR" in cols:
         c2.metric("CR total", f"{df['CR'].fillna(0).sum():,.0f}")
-    st.dataframe(df[["Région", "Nom Produit"] + cols], use_container_width=True)
+    paged_table(df[["Région", "Nom Produit"] + cols], key="analyse_stock",
+                search_cols=["Nom Produit"], data_key=data_key)
+
+def history_section(regions: list):
+    """Tendance multi-mois lue dans l'historique local (partitions des mois choisis uniquement)."""
+    store = HistoryStore()
+    months = store.months()
+    if not months:
+        return
+    st.subheader("🗓️ Tendance historique")
+    start, end = st.select_slider("Période", options=months, value=(months[0], months[-1]))
+    # Totaux lus seulement si la figure est à construire ; la clé suit les réécritures de partitions
+    key = ("analyse.historique", store.version(start, end), tuple(regions))
+    fig = line_figure(key, lambda: store.monthly_totals(start=start, end=end, regions=regions or None)
+                      .pivot(index="Mois", columns="Région", values="Ventes"))
+    if not fig.data:
+        st.info("Aucune donnée historique pour ces régions.")
+        return
+    plot(fig)
+
+def export_files(df: pd.DataFrame):
+    return df.to_csv(index=False).encode("utf-8"), excel_sheets({"Analyse": df})
 
-def export_section(df: pd.DataFrame):
+def export_section(files):
+    csv_bytes, export = files
     st.subheader("📥 Export")
-    csv_bytes = df.to_csv(index=False).encode("utf-8")
     st.download_button("Télécharger CSV (filtré)", csv_bytes, "analyse_filtrée.csv", "text/csv")
 
-    output = io.BytesIO()
-    with pd.ExcelWriter(output, engine="openpyxl") as writer:
-        df.to_excel(writer, index=False, sheet_name="Analyse")
     st.download_button(
         "Télécharger Excel (filtré)",
-        output.getvalue(),
+        export.data,
         "analyse_filtrée.xlsx",
-        "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+        XLSX_MIME
     )
+    st.caption(export.summary())
+
+# Étapes de calcul (mémoïsées par `Pipeline` : un changement de filtre ne recalcule que l'aval)
+def detect_columns(df: pd.DataFrame):
+    month_col = detect_month_column(df)
+    return month_col, detect_commune_columns(df, month_col)
+
+def region_rows(df: pd.DataFrame, regions: tuple):
+    """Positions des lignes des régions choisies (None = toutes les lignes)."""
+    if not regions or "Région" not in df.columns:
+        return None
+    mask = df["Région"].isin(regions).to_numpy()
+    return None if mask.all() else np.flatnonzero(mask)
+
+def search_rows(index: NameIndex, rows, search: str):
+    """Positions restantes après la recherche produit, via l'index des noms en minuscules."""
+    if not search:
+        return rows
+    return index.positions(search, within=rows)
+
+def select_rows(df: pd.DataFrame, rows):
+    return df if rows is None else df.iloc[rows]
+
+def sales_by_product(df: pd.DataFrame, month_col: str) -> pd.Series:
+    """Ventes du mois par produit, toutes régions confondues (série du graphique)."""
+    return pd.to_numeric(df[month_col], errors="coerce").groupby(df["Nom Produit"], observed=True).sum()
+
+def build_pipeline(raw: bytes, file_key: str) -> Pipeline:
+    pipe = Pipeline(st.session_state.setdefault("analyse_pipeline", {}))
+    pipe.input("file", raw, key=file_key)
+    pipe.stage("load", read_sales_csv, ["file"])
+    pipe.stage("columns", detect_columns, ["load"])
+    pipe.stage("name_index", lambda df: NameIndex(df["Nom Produit"]), ["load"])
+    pipe.stage("region_rows", region_rows, ["load", "regions"])
+    pipe.stage("rows", search_rows, ["name_index", "region_rows", "search"])
+    pipe.stage("filtered", select_rows, ["load", "rows"])
+    pipe.stage("kpis", lambda df, cols: compute_kpis(df, cols[0]), ["filtered", "columns"])
+    pipe.stage("chart", lambda df, cols: sales_by_product(df, cols[0]), ["filtered", "columns"])
+    pipe.stage("top_bottom", lambda df, cols: top_bottom_frames(df, cols[0], n=10), ["filtered", "columns"])
+    pipe.stage("commune_sums", lambda df, cols: df[cols[1]].sum().rename("Ventes"), ["filtered", "columns"])
+    pipe.stage("export", export_files, ["filtered"])
+    return pipe
 
 if uploaded:
-    df = pd.read_csv(uploaded)
+    raw = uploaded.getvalue()
+    file_key = content_key(raw, "analyse", "2")
+    pipe = build_pipeline(raw, file_key)
+    df = pipe.get("load")
     # Détection du mois courant
-    month_col = detect_month_column(df)
+    month_col, commune_cols = pipe.get("columns")
     if not month_col:
         st.error("Impossible de détecter la colonne du mois courant (format NN/NN). Vérifiez votre export.")
         st.dataframe(df.head(), use_container_width=True)
@@ -98,36 +183,40 @@ if uploaded:
     regions = sorted(df["Région"].dropna().unique()) if "Région" in df.columns else []
     selected_regions = st.sidebar.multiselect("Régions", options=regions, default=regions)
     search = st.sidebar.text_input("Recherche produit (contient)")
+    pipe.input("regions", tuple(selected_regions))
+    pipe.input("search", search)
 
-    filtered = df.copy()
-    if selected_regions and "Région" in filtered.columns:
-        filtered = filtered[filtered["Région"].isin(selected_regions)]
-    if search:
-        filtered = filtered[filtered["Nom Produit"].str.contains(search, case=False, na=False)]
+    filtered = pipe.get("filtered")
+    data_key = pipe.key("filtered")
+    # Graphiques partagés entre sessions : même fichier et mêmes filtres, même figure
+    chart_key = (file_key, tuple(selected_regions), search)
 
     # KPIs
-    kpi_block(filtered, month_col)
+    kpi_block(pipe.get("kpis"))
 
     # Graphique global des ventes par produit
     st.subheader("📈 Ventes par produit (mois courant)")
-    chart_df = filtered[["Nom Produit", month_col]].sort_values(by=month_col, ascending=False).head(30)
-    st.bar_chart(chart_df.set_index("Nom Produit"))
+    plot(bar_figure(("analyse.produits",) + chart_key, lambda: pipe.get("chart")))
 
     # Top / Bottom
-    top_bottom_products(filtered, month_col, n=10)
+    top_bottom_products(pipe.get("top_bottom"))
 
     # Communes
-    commune_cols = detect_commune_columns(filtered, month_col)
-    commune_comparison(filtered, month_col, commune_cols)
+    commune_comparison(filtered, month_col, commune_cols, lambda: pipe.get("commune_sums"), chart_key, data_key)
 
     # Stock / CR
-    stock_cr_section(filtered)
+    stock_cr_section(filtered, data_key)
 
     # Tableau complet filtré
     st.subheader("🧾 Tableau filtré")
-    st.dataframe(filtered, use_container_width=True)
+    paged_table(filtered, key="analyse_filtered", data_key=data_key)
+
+    # Historique
+    history_section(selected_regions)
 
     # Export
-    export_section(filtered)
+    export_section(pipe.get("export"))
 else:
     st.info("Chargez un CSV exporté pour lancer l’analyse.")
+
+performance_panel("analyse")
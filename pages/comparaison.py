@@ -0,0 +1,77 @@
+import streamlit as st
+
+from components.charts import bar_figure, plot
+from components.dataset_registry import dataset_picker
+from components.diff import STATUSES, compare_exports, diff_summary, region_deltas
+from components.export import excel_sheets, XLSX_MIME
+from components.jobs import get_job_queue, job_status, rerun_while_running
+from components.perf import performance_panel
+from components.shell import app_shell
+from components.table import paged_table
+from parsers.ubipharm import parse_ubipharm_bytes, PARSER_VERSION
+
+app_shell("comparaison")
+
+st.header("🔀 Comparaison de deux exports Ubipharm")
+
+diff_job = None
+
+
+def parse(raw: bytes):
+    return parse_ubipharm_bytes(raw, engine="vectorized")
+
+
+c1, c2 = st.columns(2)
+with c1:
+    previous_file = st.file_uploader("📂 Export du mois précédent", type="txt")
+    previous_key, previous = dataset_picker("ubipharm", previous_file, parse, PARSER_VERSION, slot="comparaison_avant")
+with c2:
+    current_file = st.file_uploader("📂 Export du mois courant", type="txt")
+    current_key, current = dataset_picker("ubipharm", current_file, parse, PARSER_VERSION, slot="comparaison_apres")
+
+if previous_key and current_key:
+    if previous is None or previous.empty or current is None or current.empty:
+        st.error("❌ Un des deux exports n'a retourné aucune donnée.")
+        st.stop()
+
+    # Tableau aligné calculé une fois par couple d'exports, partagé entre sessions
+    diff_job = get_job_queue().submit(
+        ("ubipharm_diff", previous_key, current_key),
+        lambda report: compare_exports(previous, current),
+        name="compare_exports",
+    )
+    diff_job.wait(2)
+
+    if job_status(diff_job):
+        aligned = diff_job.result
+        summary = diff_summary(aligned)
+        prev_month, cur_month = aligned.attrs["months"]
+        st.caption(f"Ventes comparées : {prev_month} (précédent) → {cur_month} (courant)")
+
+        k1, k2, k3, k4 = st.columns(4)
+        k1.metric("💰 Ventes du mois", f"{summary['ventes']:,.0f}",
+                  f"{summary['ventes'] - summary['ventes_préc']:+,.0f}")
+        k2.metric("📦 Stock", f"{summary['stock']:,.0f}", f"{summary['stock'] - summary['stock_préc']:+,.0f}")
+        k3.metric("🆕 Nouveaux produits", f"{summary['nouveaux']:,}")
+        k4.metric("🛑 Produits arrêtés", f"{summary['arrêtés']:,}")
+
+        st.subheader("🌍 Écart des ventes par région")
+        regions = region_deltas(aligned)
+        plot(bar_figure(("comparaison.regions", previous_key, current_key), regions["Δ Ventes"],
+                        n=len(regions), value_label="Δ Ventes"))
+
+        st.subheader("🧾 Détail par produit")
+        statuses = st.multiselect("Statut", options=STATUSES, default=STATUSES)
+        shown = aligned if len(statuses) == len(STATUSES) else aligned[aligned["Statut"].isin(statuses)]
+        paged_table(shown, key="comparaison_detail", search_cols=["Nom Produit", "Code Produit"],
+                    data_key=(previous_key, current_key, tuple(statuses)))
+
+        if st.button("📥 Générer Excel (comparaison)"):
+            export = excel_sheets({"Comparaison": aligned, "Régions": regions.reset_index()})
+            st.caption(export.summary())
+            st.download_button("📥 Télécharger Excel", export.data, "comparaison.xlsx", XLSX_MIME)
+else:
+    st.info("Chargez (ou reprenez) deux exports Ubipharm pour les comparer.")
+
+performance_panel("comparaison")
+rerun_while_running(diff_job)
@@ -0,0 +1,105 @@
+
+import pandas as pd
+import streamlit as st
+
+from components.dataset_registry import dataset_picker
+from components.product_match import ProductIndex, get_mapping_store, match_products, DEFAULT_THRESHOLD
+from components.perf import performance_panel
+from components.shell import app_shell
+from parsers.laborex import LABOREX_READER_VERSION, read_laborex_ventes, ventes_long
+from parsers.schema import sales_columns
+from parsers.ubipharm import parse_ubipharm_bytes, PARSER_VERSION
+
+app_shell("correspondance")
+
+st.header("🔗 Correspondance des produits Ubipharm ↔ Laborex")
+
+c1, c2 = st.columns(2)
+with c1:
+    ubipharm_file = st.file_uploader("📂 TXT brut Ubipharm", type="txt")
+    ubipharm_key, ubipharm = dataset_picker(
+        "ubipharm", ubipharm_file, lambda b: parse_ubipharm_bytes(b, engine="vectorized"), PARSER_VERSION,
+        slot="correspondance_ubipharm",
+    )
+with c2:
+    laborex_file = st.file_uploader("📂 Excel Laborex", type=["xlsx"])
+    laborex_key, ventes_df = dataset_picker(
+        "laborex", laborex_file, read_laborex_ventes, LABOREX_READER_VERSION, slot="correspondance_laborex"
+    )
+threshold = st.slider("Score minimum pour proposer un produit", 0.0, 1.0, DEFAULT_THRESHOLD, 0.05)
+
+
+def product_index(df: pd.DataFrame, key: str) -> ProductIndex:
+    """Index n-grammes des produits Ubipharm, construit une fois par fichier et par session."""
+    cached = st.session_state.get("match_index")
+    if cached is None or cached[0] != key:
+        cached = (key, ProductIndex(df["Nom Produit"].unique()))
+        st.session_state["match_index"] = cached
+    return cached[1]
+
+
+if ubipharm_key and ventes_df is not None:
+    if ubipharm is None or ubipharm.empty:
+        st.error("❌ Le TXT Ubipharm n'a retourné aucune donnée.")
+        st.stop()
+
+    label_col = ventes_df.columns[0]
+
+    # Propositions (mémorisées tant que fichiers, seuil et correspondances validées ne changent pas)
+    index = product_index(ubipharm, ubipharm_key)
+    store = get_mapping_store()
+    signature = (ubipharm_key, laborex_key, threshold)
+    cached = st.session_state.get("match_result")
+    if cached is None or cached[0] != signature:
+        cached = (signature, match_products(ventes_df[label_col], index, store, threshold))
+        st.session_state["match_result"] = cached
+    matches = cached[1]
+
+    st.caption(
+        f"{len(matches):,} libellés Laborex · {matches['Produit'].notna().sum():,} rapprochés · "
+        f"{int(matches['Validé'].sum()):,} déjà validés · {len(index):,} produits Ubipharm"
+    )
+
+    st.subheader("✏️ Propositions")
+    edited = st.data_editor(
+        matches,
+        column_config={
+            "Produit": st.column_config.SelectboxColumn("Produit Ubipharm", options=index.names),
+            "Score": st.column_config.ProgressColumn("Score", min_value=0.0, max_value=1.0, format="%.2f"),
+            "Validé": st.column_config.CheckboxColumn("Validé"),
+        },
+        disabled=["Libellé", "Score"],
+        hide_index=True,
+        use_container_width=True,
+        key="match_editor",
+    )
+
+    if st.button("💾 Enregistrer les correspondances validées"):
+        valid = edited[edited["Validé"] & edited["Produit"].notna()]
+        store.update(dict(zip(valid["Libellé"], valid["Produit"])))
+        st.session_state.pop("match_result", None)
+        st.success(f"✅ {len(valid):,} correspondance(s) enregistrée(s) dans {store.path}")
+
+    # Rapport consolidé : ventes des deux distributeurs par produit Ubipharm
+    st.subheader("📊 Ventes consolidées (produits rapprochés)")
+    month_col = sales_columns(ubipharm)[0]
+    ubipharm_totals = ubipharm.groupby("Nom Produit", observed=True)[month_col].sum().astype(float)
+    long = ventes_long(ventes_df)
+    laborex_totals = long.groupby(label_col, observed=True)["Vente"].sum()
+    laborex_totals.index = laborex_totals.index.astype(str)
+
+    linked = edited[edited["Produit"].notna()]
+    consolidated = (
+        pd.DataFrame({
+            "Produit": linked["Produit"].to_numpy(),
+            "Laborex": laborex_totals.reindex(linked["Libellé"]).fillna(0).to_numpy(),
+        })
+        .groupby("Produit", as_index=False)["Laborex"].sum()
+    )
+    consolidated[f"Ubipharm ({month_col})"] = ubipharm_totals.reindex(consolidated["Produit"]).fillna(0).to_numpy()
+    consolidated["Total"] = consolidated["Laborex"] + consolidated[f"Ubipharm ({month_col})"]
+    st.dataframe(consolidated.sort_values("Total", ascending=False), hide_index=True, use_container_width=True)
+else:
+    st.info("Chargez un export Ubipharm et un classeur Laborex pour rapprocher les produits.")
+
+performance_panel("correspondance")
@@ -1,101 +1,61 @@
 import streamlit as st
 import pandas as pd
-from io import BytesIO
-
-from parsers.ubipharm import parse_ubipharm_txt
-from streamlit_option_menu import option_menu
-
-st.set_page_config(page_title="Tableau de bord", page_icon="📊", layout="wide")
-
-
-st.title("MABOU BI ")
-st.write("Bienvenue dans votre application d'analyse de données.")
-
-
-
-# -------------------------------
-# Barre de navigation moderne
-# -------------------------------
-with st.sidebar:
-    st.image("assets/logo.png", width=120)
-    selected = option_menu(
-        "Navigation",
-        ["🏠 Tableau de bord", "📊 Extraction Ubipharm", "🧾 Extraction Laborex", ],
-        icons=["house", "bar-chart", "file-text"],
-        menu_icon="cast",
-        default_index=0,
-    )
-
-# -------------------------------
-# Logique de navigation
-# -------------------------------
-if selected == "🏠 Tableau de bord":
-   
-
-    st.subheader("⚙️ Actions rapides")
-    col1, col2 = st.columns(2)
-
-    with col1:
-        st.markdown("### 🧾 Extraction Ubipharm")
-        if st.button("➕ Nouvelle base"):
-            st.switch_page("pages/ubipharm_page.py")
-
-    with col2:
-        st.markdown("### 💰 Extraction Laborex")
-        if st.button("➕ Nouveau base"):
-            st.switch_page("pages/laborex.py")
-
-
-    st.markdown("---")
-    st.caption("© 2026 MABOU-INSTRUMED - Système de gestion de données pharmaceutiques.")
-
-elif selected == "📊 Extraction Ubipharm": 
-    st.switch_page("pages/ubipharm_page.py")
-
-elif selected == "🧾 Extraction Laborex":
-    st.switch_page("pages/laborex.py")
 
+from parsers.ubipharm import parse_ubipharm_bytes, PARSER_VERSION
+from parsers.schema import sales_columns
+from components.dataset_registry import dataset_picker
+from components.history_store import HistoryStore
+from components.export import excel_par_region, XLSX_MIME
+from components.table import paged_table
+from components.cube import SalesCube
+from components.trends import SalesTrends
+from components.jobs import get_job_queue, job_status, rerun_while_running
+from components.perf import performance_panel
+from components.shell import app_shell
 
+app_shell("ubipharm")
 
+st.header("📊 Extraction Ubipharm")
 
 # --------------------------------------------------
 # INIT
 # --------------------------------------------------
 df_filtered = None
+data_key = None
 product_col = None
 selected_cols = []
+export_job = cube_job = trends_job = None
 
 # --------------------------------------------------
 # UPLOAD
 # --------------------------------------------------
 uploaded_file = st.file_uploader("📂 Upload fichier TXT brut (Ubipharm)", type="txt")
 
-if uploaded_file:
-    raw_bytes = uploaded_file.read()
-
-    # Multi-encodages
-    txt_content = None
-    for enc in ["utf-8-sig", "latin-1", "utf-8"]:
-        try:
-            txt_content = raw_bytes.decode(enc)
-            break
-        except UnicodeDecodeError:
-            continue
+# Parsing partagé entre sessions par empreinte du contenu (registre des jeux de données) :
+# un fichier déjà chargé, ici ou par un collègue, n'est ni renvoyé ni reparsé ;
+# le parseur vectorisé traite les lignes en bloc, dans le processus du serveur
+file_key, df = dataset_picker(
+    "ubipharm", uploaded_file, lambda b: parse_ubipharm_bytes(b, engine="vectorized"), PARSER_VERSION
+)
 
-    if txt_content is None:
+if file_key:
+    if df is None:
         st.error("❌ Impossible de décoder le fichier TXT.")
     else:
-        txt_content = txt_content.replace("\ufeff", "")
-
-        # Parsing
-        df = parse_ubipharm_txt(txt_content)
-
         if df.empty:
             st.warning("⚠️ Le parsing n’a retourné aucune donnée.")
         else:
             st.success("✅ Fichier parsé avec succès")
             st.dataframe(df.head(), use_container_width=True)
 
+            # Historique multi-mois (ajout incrémental, mois déjà présents dédupliqués)
+            if st.button("🗄️ Ajouter à l'historique"):
+                try:
+                    written = HistoryStore().append(df)
+                    st.success(f"✅ Historique mis à jour ({written} lignes)")
+                except ValueError as e:
+                    st.error(f"❌ {e}")
+
             # --------------------------------------------------
             # NETTOYAGE PRODUITS
             # --------------------------------------------------
@@ -114,6 +74,8 @@ if uploaded_file:
                 df_filtered = df.copy()
                 st.info("ℹ️ Aucun produit supprimé")
 
+            data_key = (file_key, tuple(undesirable_products))
+
 # --------------------------------------------------
 # VUE GLOBALE
 # --------------------------------------------------
@@ -123,10 +85,7 @@ if df_filtered is not None:
     st.subheader("🌍 Vue globale : données filtrées")
 
     # Colonnes ventes
-    sales_cols = [
-        c for c in df_filtered.columns
-        if c.startswith("M-") or "/" in c or c == "MOIS"
-    ]
+    sales_cols = sales_columns(df_filtered)
 
     show_all = st.checkbox("📊 Afficher toutes les colonnes de ventes")
 
@@ -143,108 +102,121 @@ if df_filtered is not None:
     fixed_cols = ["Région", product_col]
     cols_to_show = fixed_cols + selected_cols
 
-    st.dataframe(df_filtered[cols_to_show], use_container_width=True)
-
     # --------------------------------------------------
-    # EXPORT EXCEL
+    # TENDANCES ET PRÉVISIONS (calculées une fois par jeu de données)
     # --------------------------------------------------
-    st.divider()
-    if st.button("📥 Générer Excel (par région)"):
+    jobs = get_job_queue()
+    trends_job = jobs.submit(
+        ("ubipharm_trends", data_key),
+        lambda report: SalesTrends(df_filtered, sales_cols),
+        name="sales_trends",
+    )
+    trends_job.wait(0.2)
+    show_trends = st.checkbox("📈 Ajouter les tendances et prévisions au tableau")
 
-        output = BytesIO()
-        with pd.ExcelWriter(output, engine="openpyxl") as writer:
-            sheet_names = {}
+    table = df_filtered[cols_to_show]
+    if show_trends and trends_job.done:
+        table = trends_job.result.with_products(table)
 
-            for region, df_region in df_filtered.groupby("Région"):
-                sheet_name = region[:31]
-                if sheet_name in sheet_names:
-                    sheet_names[sheet_name] += 1
-                    sheet_name = f"{sheet_name}_{sheet_names[sheet_name]}"
-                else:
-                    sheet_names[sheet_name] = 1
+    paged_table(
+        table, key="ubipharm_global",
+        search_cols=[product_col], data_key=(data_key, tuple(cols_to_show), show_trends and trends_job.done)
+    )
+
+    if job_status(trends_job):
+        trends = trends_job.result
+        kpis = trends.kpis()
+
+        st.subheader("📈 Tendances et prévisions")
+        t1, t2, t3, t4 = st.columns(4)
+        t1.metric("🔮 Prévision M+1", f"{kpis['prévision']:,.0f}")
+        t2.metric("📊 Évolution vs M-1", f"{kpis['évolution']:+.1f} %" if pd.notna(kpis["évolution"]) else "—")
+        t3.metric("📦 Couverture du stock", f"{kpis['couverture']:.1f} mois" if pd.notna(kpis["couverture"]) else "—")
+        t4.metric("⚠️ Lignes < 1 mois de stock", f"{kpis['ruptures']:,}")
 
-                df_region[cols_to_show].to_excel(
-                    writer,
-                    index=False,
-                    sheet_name=sheet_name
-                )
+        st.dataframe(trends.regions, use_container_width=True)
 
-        excel_data = output.getvalue()
+    # --------------------------------------------------
+    # EXPORT EXCEL (tâches de fond : un autre widget modifié ne perd pas le calcul)
+    # --------------------------------------------------
+    st.divider()
+    export_key = ("ubipharm_excel_par_region", data_key, tuple(cols_to_show))
+    if st.button("📥 Générer Excel (par région)"):
+        jobs.submit(
+            export_key,
+            lambda report: excel_par_region(df_filtered, cols_to_show, progress=report),
+            name="excel_par_region",
+        )
+        st.session_state["ubipharm_analyses"] = data_key
 
+    # Classeur déjà généré pour ces données et ces colonnes : servi tout de suite
+    export_job = jobs.get(export_key)
+    if export_job is not None and job_status(export_job):
+        export = export_job.result
         st.success("✅ Fichier Excel généré")
+        st.caption(export.summary())
         st.download_button(
             label="📥 Télécharger Excel (par région)",
-            data=excel_data,
+            data=export.data,
             file_name="ventes_par_region.xlsx",
-            mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+            mime=XLSX_MIME
         )
 
-        # --------------------------------------------------
-        # ANALYSES
-        # --------------------------------------------------
+    # --------------------------------------------------
+    # ANALYSES
+    # --------------------------------------------------
+    if st.session_state.get("ubipharm_analyses") == data_key:
         st.divider()
         st.subheader("📊 Analyses – Données filtrées")
 
-        sales_numeric = df_filtered[selected_cols].apply(
-            pd.to_numeric, errors="coerce"
+        # Agrégats calculés une seule fois par jeu de données (toutes colonnes de ventes)
+        cube_job = jobs.submit(
+            ("ubipharm_cube", data_key),
+            lambda report: SalesCube(df_filtered, sales_cols, product_col),
+            name="sales_cube",
         )
+        cube_job.wait(0.2)     # agrégats rapides : affichés dès ce rerun
 
-        # KPI
-        col1, col2, col3 = st.columns(3)
+        if job_status(cube_job):
+            cube = cube_job.result
 
-        with col1:
-            st.metric("💰 Ventes totales", f"{sales_numeric.sum().sum():,.0f}")
+            # KPI
+            col1, col2, col3 = st.columns(3)
 
-        with col2:
-            st.metric("📦 Produits", df_filtered[product_col].nunique())
+            with col1:
+                st.metric("💰 Ventes totales", f"{cube.total(selected_cols):,.0f}")
 
-        with col3:
-            st.metric("🌍 Régions", df_filtered["Région"].nunique())
+            with col2:
+                st.metric("📦 Produits", cube.n_products)
 
-        # Classement régions
-        st.subheader("🏆 Classement des régions")
+            with col3:
+                st.metric("🌍 Régions", cube.n_regions)
 
-        region_sales = (
-            df_filtered
-            .assign(Total=sales_numeric.sum(axis=1))
-            .groupby("Région")["Total"]
-            .sum()
-            .sort_values(ascending=False)
-        )
+            # Classement régions
+            st.subheader("🏆 Classement des régions")
 
-        st.dataframe(region_sales.reset_index(), use_container_width=True)
+            region_sales = cube.region_ranking(selected_cols)
 
-        # Top produits
-        st.subheader("🔥 Top 10 produits")
+            st.dataframe(region_sales.reset_index(), use_container_width=True)
 
-        top_products = (
-            df_filtered
-            .assign(Total=sales_numeric.sum(axis=1))
-            .groupby(product_col)["Total"]
-            .sum()
-            .sort_values(ascending=False)
-            .head(10)
-        )
+            # Top produits
+            st.subheader("🔥 Top 10 produits")
 
-        st.dataframe(top_products.reset_index(), use_container_width=True)
+            top_products = cube.top_products(selected_cols, n=10)
 
-        # Faible consommation
-        st.subheader("⚠️ Produits à faible consommation")
+            st.dataframe(top_products.reset_index(), use_container_width=True)
 
-        threshold = st.number_input(
-            "Seuil de vente",
-            min_value=0,
-            value=10
-        )
+            # Faible consommation
+            st.subheader("⚠️ Produits à faible consommation")
 
-        low_products = (
-            df_filtered
-            .assign(Total=sales_numeric.sum(axis=1))
-            .groupby(product_col)["Total"]
-            .sum()
-            .reset_index()
-        )
+            threshold = st.number_input(
+                "Seuil de vente",
+                min_value=0,
+                value=10
+            )
 
-        low_products = low_products[low_products["Total"] <= threshold]
-        st.dataframe(low_products, use_container_width=True)
+            low_products = cube.low_products(selected_cols, threshold)
+            paged_table(low_products, key="ubipharm_low", search_cols=[product_col])
 
+performance_panel("ubipharm")
+rerun_while_running(export_job, cube_job, trends_job)
@@ -0,0 +1,180 @@
+import os
+from collections import Counter
+from io import BytesIO
+
+import numpy as np
+import pandas as pd
+from openpyxl import load_workbook
+
+from components.parse_cache import ParseCache
+from components.perf import timed
+
+# À incrémenter si la lecture du classeur change (clé du cache de parsing)
+LABOREX_READER_VERSION = "3"
+
+HEADER_ROW = 3      # 3 lignes de titre avant la ligne d'en-têtes
+
+# Textes lus comme valeurs manquantes (mêmes chaînes que les valeurs NA par défaut de pandas)
+NA_STRINGS = frozenset({
+    "", "#N/A", "#N/A N/A", "#NA", "-1.#IND", "-1.#QNAN", "-NaN", "-nan", "1.#IND", "1.#QNAN",
+    "<NA>", "N/A", "NA", "NULL", "NaN", "None", "n/a", "nan", "null",
+})
+
+
+@timed("laborex.read_excel")
+def read_laborex_excel(source) -> pd.DataFrame:
+    """Lit un classeur Laborex (chemin, octets ou fichier) en sautant les 3 lignes de titre."""
+    return pd.read_excel(source, skiprows=3)
+
+
+def _scan_openpyxl(source) -> tuple:
+    """
+    Parcourt la première feuille en flux (openpyxl en lecture seule, valeurs uniquement) :
+    en-tête, libellé et colonnes VENTE, les autres cellules ne servant qu'à situer la fin
+    des données. Renvoie (en-tête, {position: [(ligne, valeur)]}, largeur, nombre de lignes).
+    """
+    wb = load_workbook(source, read_only=True, data_only=True, keep_links=False)
+    try:
+        ws = wb.worksheets[0]
+        ws.reset_dimensions()   # dimensions déclarées parfois fausses : lignes non complétées
+        rows = ws.iter_rows(min_row=HEADER_ROW + 1, values_only=True)
+        header = next(rows, ())
+        header = header[:_trimmed_len(header)]
+        columns = {}
+        width, n_rows = len(header), 0
+        for i, row in enumerate(rows):
+            n = _trimmed_len(row)
+            if not n:
+                continue
+            n_rows = i + 1
+            width = max(width, n)
+            for col in [0] + list(range(1, n, 2)):
+                value = row[col]
+                if value is not None and value != "":
+                    columns.setdefault(col, []).append((i, value))
+    finally:
+        wb.close()
+    return header, columns, width, n_rows
+
+
+def _trimmed_len(row: tuple) -> int:
+    """Longueur de la ligne sans ses cellules vides finales."""
+    n = len(row)
+    while n and (row[n - 1] is None or row[n - 1] == ""):
+        n -= 1
+    return n
+
+
+def _column_names(header: tuple, width: int) -> list:
+    """Noms de colonnes comme pd.read_excel : 'Unnamed: i' si vide, doublons suffixés .1, .2..."""
+    names, seen = [], Counter()
+    for i in range(width):
+        value = header[i] if i < len(header) else None
+        name = f"Unnamed: {i}" if value is None or value == "" else str(value)
+        if seen[name]:
+            deduped = f"{name}.{seen[name]}"
+            while deduped in seen:
+                seen[name] += 1
+                deduped = f"{name}.{seen[name]}"
+            seen[deduped] += 1
+            seen[name] += 1
+            name = deduped
+        else:
+            seen[name] += 1
+        names.append(name)
+    return names
+
+
+def _column(cells: list, n_rows: int) -> pd.Series:
+    """
+    Colonne typée comme pd.read_excel à partir de [(ligne, valeur)] : vide ou texte NA -> NaN,
+    entiers gardés entiers s'il n'y a pas de trou.
+    """
+    out = [np.nan] * n_rows
+    for r, v in cells:
+        out[r] = np.nan if isinstance(v, str) and v in NA_STRINGS else v
+    return pd.Series(out)
+
+
+@timed("laborex.read_ventes")
+def read_laborex_ventes(source) -> pd.DataFrame:
+    """
+    Lit directement le libellé et les colonnes VENTE d'un classeur Laborex (chemin, octets,
+    fichier ou .parquet produit par `laborex_to_parquet`). Mêmes valeurs que
+    `ventes_par_zone_large(read_laborex_excel(source))`, en-têtes convertis en texte
+    (noms de colonnes compatibles avec les copies Parquet).
+
+    La feuille est lue une fois, en flux, par openpyxl en lecture seule : sans DataFrame
+    intermédiaire de toute la feuille ni inférence de types pandas.
+    """
+    if isinstance(source, (str, os.PathLike)) and os.fspath(source).endswith(".parquet"):
+        return pd.read_parquet(source)
+    if isinstance(source, (bytes, bytearray)):
+        source = BytesIO(source)
+
+    header, columns, width, n_rows = _scan_openpyxl(source)
+    if not width:
+        return pd.DataFrame()
+
+    names = _column_names(header, width)
+    frame = {}
+    for pos in [0] + list(range(1, width, 2)):
+        frame[names[pos]] = _column(columns.get(pos, []), n_rows)
+    return pd.DataFrame(frame)
+
+
+def laborex_to_parquet(source, path: str) -> pd.DataFrame:
+    """Convertit un classeur Laborex en fichier Parquet (libellé + VENTE) pour les relectures."""
+    ventes_df = read_laborex_ventes(source)
+    tmp = f"{path}.tmp"
+    ventes_df.to_parquet(tmp, index=False)
+    os.replace(tmp, path)
+    return ventes_df
+
+
+def load_laborex_ventes(path: str, cache_dir: str = None) -> pd.DataFrame:
+    """
+    `read_laborex_ventes` avec, si `cache_dir` est fourni, une copie Parquet par contenu
+    de classeur : les relectures d'un même fichier ne rouvrent pas le XLSX.
+    """
+    if not cache_dir:
+        return read_laborex_ventes(path)
+    with open(path, "rb") as f:
+        raw = f.read()
+    cache = ParseCache(cache_dir)
+    return cache.get_or_parse(raw, read_laborex_ventes, namespace="laborex", version=LABOREX_READER_VERSION)
+
+
+def ventes_par_zone_large(df: pd.DataFrame) -> pd.DataFrame:
+    """Garde le libellé produit et les colonnes VENTE (1 colonne sur 2 après le libellé)."""
+    label_col = df.columns[0]
+    vente_cols = df.columns[1::2]
+    return df[[label_col] + list(vente_cols)]
+
+
+@timed("laborex.ventes_long")
+def ventes_long(ventes_df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Format analytique : une ligne par produit × zone, ventes numériques (0 si vide).
+    Libellé et zone en catégories (zones dans l'ordre des colonnes) : peu de valeurs distinctes répétées.
+    """
+    label_col = ventes_df.columns[0]
+    long = ventes_df.melt(
+        id_vars=label_col,
+        var_name="Zone",
+        value_name="Vente"
+    )
+    long[label_col] = long[label_col].astype("category")
+    long["Zone"] = pd.Categorical(long["Zone"], categories=ventes_df.columns[1:])
+    long["Vente"] = pd.to_numeric(long["Vente"], errors="coerce").fillna(0).astype("float64")
+    return long
+
+
+def synthese_par_zone(long: pd.DataFrame) -> pd.DataFrame:
+    """Ventes totales par zone, de la plus forte à la plus faible."""
+    return (
+        long
+        .groupby("Zone", as_index=False, observed=True)["Vente"]
+        .sum()
+        .sort_values("Vente", ascending=False)
+    )
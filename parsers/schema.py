@@ -0,0 +1,130 @@
+import re
+from io import BytesIO
+
+import numpy as np
+import pandas as pd
+
+MONTH_RE = re.compile(r'^\d{2}/\d{2}$')
+OFFSET_RE = re.compile(r'^M-(\d+)$')
+
+ID_COLS = ["Région", "Code Produit", "Nom Produit"]
+QTY_COLS = ["Stock", "CR"]
+INT_DTYPE = "Int32"       # entier nullable compact (Stock manquant -> <NA>)
+N_SALES_COLS = 7
+
+
+class SchemaError(ValueError):
+    """Le DataFrame ne respecte pas le schéma des ventes parsées."""
+
+
+def is_sales_column(col) -> bool:
+    """Colonne de ventes : mois courant (NN/NN), M-1..M-6 ou fallback 'MOIS'."""
+    col = str(col)
+    return bool(MONTH_RE.match(col) or OFFSET_RE.match(col)) or col == "MOIS"
+
+
+def sales_columns(df: pd.DataFrame) -> list:
+    return [c for c in df.columns if is_sales_column(c)]
+
+
+def month_period(header: str) -> pd.Period:
+    """
+    Mois (pd.Period) d'un en-tête de ventes 'MM/AA'. Lève ValueError si l'en-tête n'a pas
+    ce format ou si le mois sort de 1..12 (pd.Period reporterait '13/26' sur janvier 2027).
+    """
+    if not MONTH_RE.match(str(header)):
+        raise ValueError(f"en-tête de mois invalide : {header}")
+    mm, yy = str(header).split("/")
+    if not 1 <= int(mm) <= 12:
+        raise ValueError(f"mois invalide : {header}")
+    return pd.Period(year=2000 + int(yy), month=int(mm), freq="M")
+
+
+def month_names(sales_cols: list) -> dict:
+    """
+    Nomme chaque colonne de ventes par son mois réel (MM/AA) à partir du mois courant :
+    {'11/26': '11/26', 'M-1': '10/26', ...}. Vide si le mois courant est inconnu ('MOIS')
+    ou invalide ('13/26').
+    """
+    current = next((c for c in sales_cols if MONTH_RE.match(str(c))), None)
+    if current is None:
+        return {}
+    try:
+        period = month_period(current)
+    except ValueError:
+        return {}
+    names = {}
+    for col in sales_cols:
+        m = OFFSET_RE.match(str(col))
+        offset = int(m.group(1)) if m else 0
+        names[col] = (period - offset).strftime("%m/%y")
+    return names
+
+
+def to_int(values) -> pd.api.extensions.ExtensionArray:
+    """Entiers nullables compacts (None/NaN -> <NA>)."""
+    return pd.array(values, dtype=INT_DTYPE)
+
+
+def categorize(df: pd.DataFrame, cols: list = None) -> pd.DataFrame:
+    """Passe les colonnes identifiants présentes (Région, produit...) en catégories."""
+    cols = [c for c in (cols or ID_COLS) if c in df.columns and not isinstance(df[c].dtype, pd.CategoricalDtype)]
+    if not cols:
+        return df
+    return df.assign(**{c: df[c].astype("category") for c in cols})
+
+
+def validate(df: pd.DataFrame) -> None:
+    """
+    Vérifie en une passe : colonnes attendues, 7 colonnes de ventes,
+    identifiants catégoriels, quantités entières nullables et positives.
+    """
+    missing = [c for c in ID_COLS + QTY_COLS if c not in df.columns]
+    if missing:
+        raise SchemaError(f"Colonnes manquantes : {', '.join(missing)}")
+
+    sales_cols = sales_columns(df)
+    if len(sales_cols) != N_SALES_COLS:
+        raise SchemaError(f"{N_SALES_COLS} colonnes de ventes attendues, {len(sales_cols)} trouvées")
+
+    for col in ID_COLS:
+        if not isinstance(df[col].dtype, pd.CategoricalDtype):
+            raise SchemaError(f"'{col}' doit être catégorielle")
+
+    qty = df[QTY_COLS + sales_cols]
+    if any(str(t) != INT_DTYPE for t in qty.dtypes):
+        raise SchemaError(f"Stock, CR et ventes doivent être de type {INT_DTYPE}")
+    if bool((qty.to_numpy(dtype="float64", na_value=np.nan) < 0).any()):
+        raise SchemaError("Quantités négatives")
+    if df["CR"].isna().any():
+        raise SchemaError("CR manquant")
+
+
+def apply_schema(df: pd.DataFrame, check: bool = True) -> pd.DataFrame:
+    """
+    Type un DataFrame de ventes (sortie du parseur, CSV, Parquet...) :
+    identifiants en catégories, Stock/CR/ventes en Int32 nullable,
+    mois réels des colonnes de ventes dans `df.attrs["months"]`.
+    """
+    if df.empty:
+        return df
+    sales_cols = sales_columns(df)
+    typed = categorize(df)
+    typed = typed.assign(**{c: to_int(typed[c]) for c in QTY_COLS + sales_cols if c in typed.columns})
+    typed.attrs["months"] = month_names(sales_cols)
+    if check:
+        validate(typed)
+    return typed
+
+
+def read_sales_csv(raw: bytes) -> pd.DataFrame:
+    """
+    Relit un CSV de ventes exporté (parsé ou réparti par communes) avec le schéma typé.
+    Un CSV retouché hors schéma (colonnes manquantes, quantités non entières...) garde ses
+    colonnes telles quelles, identifiants seulement passés en catégories.
+    """
+    df = pd.read_csv(BytesIO(raw))
+    try:
+        return apply_schema(df)
+    except (TypeError, ValueError):     # SchemaError, ou cast Int32 impossible
+        return categorize(df)
@@ -1,7 +1,197 @@
+import codecs
+import io
+import mmap
+import os
 import re
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
 import pandas as pd
 
-MONTH_RE = re.compile(r'^\d{2}/\d{2}$')
+from components.perf import measure, timed
+from parsers.schema import MONTH_RE, month_names, to_int, validate
+
+TOKEN_RE = re.compile(r'\S+')
+# Fins de ligne de `str.splitlines` (parseur d'origine) : '\r\n', '\r', '\n', NEL, \v, \f...
+LINE_SEP_RE = re.compile(r'\r\n|[\n\r\v\f\x1c-\x1e\x85\u2028\u2029]')
+_EXTRA_SEP_RE = re.compile(r'[\v\f\x1c-\x1e\x85\u2028\u2029]')
+REGION_RE = re.compile(r'Pays.*R.gion\s+\d+/\w+\s+(.*)')
+PRODUCT_RE = re.compile(
+    r'\s+([A-Z0-9]+)\s+(.+?)\s+(\d+)?\s*/\s*(\d+)\s+'   # Stock (optionnel) / CR
+    r'(\d+)\s+(\d+)\s+(\d+)\s+(\d+)\s+(\d+)\s+(\d+)\s+(\d+)'  # 7 colonnes de ventes
+)
+
+# Mêmes motifs en octets, pour le parsing par mmap : l'espace ne traverse jamais
+# une fin de ligne et 'é' de 'Région' peut tenir sur 1 (latin-1) ou 2 octets (UTF-8).
+_SP = rb'[ \t\r\f\v]'
+REGION_RE_BYTES = re.compile(
+    rb'[^\n]*?Pays[^\n]*R[^\n]{1,2}gion' + _SP + rb'+\d+/\w+' + _SP + rb'+([^\n]*)'
+)
+PRODUCT_RE_BYTES = re.compile(
+    rb'^' + _SP + rb'+([A-Z0-9]+)' + _SP + rb'+([^\n]+?)' + _SP + rb'+(\d+)?' + _SP + rb'*/' + _SP + rb'*(\d+)'
+    + (_SP + rb'+(\d+)') * 7,
+    re.MULTILINE,
+)
+# Les motifs en octets ne voient que '\n' / '\r\n' et les blancs et chiffres ASCII : un '\r' isolé,
+# une autre fin de ligne ou un blanc / chiffre que seuls `\s` / `\d` reconnaissent (espace
+# insécable, NEL...) renvoient le fichier vers les motifs texte
+_PRINTABLE_BYTES = bytes(range(0x20, 0x7F)) + b"\t\n"
+_PLAIN_BYTES = _PRINTABLE_BYTES + b"\r"
+_TEXT_ONLY_RE = re.compile(r'[^\S\t\n\r ]|[^\D0-9]')
+# Mêmes fins de ligne en octets, ramenées à '\n' pour le moteur vectorisé
+_LINE_SEP_BYTES_RE = {
+    "utf-8": re.compile(rb'\r\n?|[\x0b\x0c\x1c-\x1e]|\xc2\x85|\xe2\x80[\xa8\xa9]'),
+    "latin-1": re.compile(rb'\r\n?|[\x0b\x0c\x1c-\x1e\x85]'),
+}
+
+# Moteur vectorisé (mots découpés sur les blancs ASCII, chiffres ASCII) : les lignes qui contiennent
+# un blanc, un chiffre ou un caractère de contrôle que les motifs texte voient autrement, ou dont
+# le nom peut contenir lui-même une fin de ligne produit, passent par PRODUCT_RE.
+_SLOW_CHARS_RE = re.compile(r'[^\S\t\n\r ]|[^\D0-9]|[\x00-\x08\x0e-\x1f]')
+_WS_BYTES = np.zeros(256, dtype=bool)
+_WS_BYTES[[0x09, 0x0A, 0x0B, 0x0C, 0x0D, 0x20]] = True
+_CODE_RE2 = r'^[A-Z0-9]+$'     # code produit de PRODUCT_RE, vérifié dans Arrow (RE2)
+_TAIL_TOKENS = 9    # '/', CR et 7 colonnes de ventes
+_TAIL_OFFSETS = np.array([-1] + list(range(1, _TAIL_TOKENS)))     # mots lus autour du '/'
+_BLOCK_ROWS = 1 << 13   # lignes traitées ensemble par le moteur vectorisé
+# Conversion de 8 chiffres à la fois (`_token_values`), indexée par la longueur du mot
+_KEEP_BYTES = np.array([int.from_bytes(bytes(8 - n) + b"\xff" * n, "little") for n in range(9)], dtype=np.uint64)
+_ZERO_FILL = np.array([int.from_bytes(b"0" * (8 - n) + bytes(n), "little") for n in range(9)], dtype=np.uint64)
+_ZEROS = np.uint64(0x3030303030303030)
+_OVER_NINE = np.uint64(0x7676767676767676)
+_HIGH_BITS = np.uint64(0x8080808080808080)
+_COMBINE = [(np.uint64(10 * 2**8 + 1), np.uint64(8), np.uint64(0x00FF00FF00FF00FF)),
+            (np.uint64(100 * 2**16 + 1), np.uint64(16), np.uint64(0x0000FFFF0000FFFF)),
+            (np.uint64(10000 * 2**32 + 1), np.uint64(32), np.uint64(0xFFFFFFFFFFFFFFFF))]
+
+HEADER_MARKER = "Stocks / CR"
+SNIFF_BYTES = 64 * 1024     # préfixe examiné pour choisir l'encodage
+SCAN_BYTES = 1024 * 1024    # taille des morceaux décodés par `_needs_text_parser` et `_check_utf8`
+PARALLEL_MIN_BYTES = 16 * 1024 * 1024   # en dessous, le pool de processus ne paie pas
+BOM = "\ufeff"
+DEFAULT_HEADERS = ["MOIS", "M-1", "M-2", "M-3", "M-4", "M-5", "M-6"]
+ENGINES = ("loop", "vectorized")
+
+# À incrémenter dès que la sortie du parseur change (clé des caches)
+PARSER_VERSION = "5"
+
+
+def _latin1_fallback(error: UnicodeDecodeError):
+    """Octets invalides dans l'encodage choisi : relus en latin-1 au lieu d'être remplacés par U+FFFD."""
+    return error.object[error.start:error.end].decode("latin-1"), error.end
+
+
+# Gestionnaire d'erreurs de décodage de tous les chemins : un export latin-1 dont le préfixe
+# examiné par `sniff_encoding` est en ASCII pur garde ses accents
+DECODE_ERRORS = "ubipharm-latin-1"
+codecs.register_error(DECODE_ERRORS, _latin1_fallback)
+
+
+def _headers_from_line(line):
+    """
+    Construit les 7 en-têtes de ventes à partir d'une ligne 'Stocks / CR ...'.
+    """
+    tokens = TOKEN_RE.findall(line)
+    # tokens ex: ['Stocks', '/', 'CR', '11/26', 'M-1', 'M-2', 'M-3', 'M-4', 'M-5', 'M-6']
+    # On ignore les 3 premiers et on garde le reste
+    sales_headers = tokens[3:]
+    # Nettoyage: enlever toute occurrence résiduelle de '/' par sécurité
+    sales_headers = [h for h in sales_headers if h != '/']
+
+    # Validation: on attend 7 colonnes de ventes
+    if len(sales_headers) != 7:
+        # Fallback: si la première ressemble à un mois, compléter avec M-1..M-6
+        month = next((h for h in sales_headers if MONTH_RE.match(h)), None)
+        if month:
+            sales_headers = [month, "M-1", "M-2", "M-3", "M-4", "M-5", "M-6"]
+        else:
+            # Dernier recours: forcer un schéma standard
+            sales_headers = list(DEFAULT_HEADERS)
+
+    # Validation: la première doit être le mois courant (NN/NN)
+    if not MONTH_RE.match(sales_headers[0]):
+        # Si l'ordre est inversé, tenter de remettre le mois en premier
+        month_idx = next((i for i, h in enumerate(sales_headers) if MONTH_RE.match(h)), None)
+        if month_idx is not None and month_idx != 0:
+            sales_headers = [sales_headers[month_idx]] + [h for i, h in enumerate(sales_headers) if i != month_idx]
+
+    return sales_headers
+
+
+def sniff_encoding(prefix: bytes) -> str:
+    """
+    Choisit l'encodage d'un export à partir de ses premiers octets seulement :
+    BOM UTF-8 -> 'utf-8-sig', UTF-8 valide -> 'utf-8', sinon 'latin-1' (exports Windows).
+    Les octets non UTF-8 trouvés plus loin sont relus en latin-1 (`DECODE_ERRORS`).
+    """
+    if prefix.startswith(codecs.BOM_UTF8):
+        return "utf-8-sig"
+    try:
+        prefix.decode("utf-8")
+    except UnicodeDecodeError as e:
+        # Caractère multi-octets coupé par la fin du préfixe : c'est quand même de l'UTF-8
+        if e.reason == "unexpected end of data":
+            return "utf-8"
+        return "latin-1"
+    return "utf-8"
+
+
+def _peek(stream, size: int) -> bytes:
+    """Lit les `size` premiers octets d'un flux binaire sans les consommer."""
+    if hasattr(stream, "peek"):
+        return stream.peek(size)[:size]
+    pos = stream.tell()
+    prefix = stream.read(size)
+    stream.seek(pos)
+    return prefix
+
+
+def iter_lines(source, encoding=None):
+    """
+    Itère paresseusement sur les lignes d'une source TXT.
+    Accepte une chaîne, des octets, un fichier texte ou binaire (upload Streamlit inclus),
+    ou tout itérable de lignes. Rien n'est matérialisé en liste.
+
+    Pour les sources binaires, l'encodage (si non fourni) est déterminé sur un préfixe
+    borné puis le contenu est décodé morceau par morceau, les octets invalides relus en
+    latin-1 ; les BOM sont retirés.
+    """
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        source = io.BytesIO(source)
+
+    if isinstance(source, str):
+        pos = 0
+        for sep in LINE_SEP_RE.finditer(source):
+            yield source[pos:sep.start()]
+            pos = sep.end()
+        if pos < len(source):
+            yield source[pos:]
+        return
+
+    if hasattr(source, "read") and not isinstance(source, io.TextIOBase):
+        # Flux binaire : décodage incrémental, sans copie complète du contenu
+        encoding = encoding or sniff_encoding(_peek(source, SNIFF_BYTES))
+        text = io.TextIOWrapper(source, encoding=encoding, errors=DECODE_ERRORS, newline=None)
+        extra_sep = _EXTRA_SEP_RE.search     # NEL, \v, \f... : TextIOWrapper ne coupe que '\r' / '\n'
+        try:
+            for line in text:
+                line = line.rstrip("\n")
+                # BOM résiduels (fichiers concaténés)
+                if BOM in line:
+                    line = line.replace(BOM, "")
+                if extra_sep(line):
+                    yield from _EXTRA_SEP_RE.split(line)
+                else:
+                    yield line
+        finally:
+            # Rend le flux à l'appelant au lieu de le fermer avec le wrapper
+            text.detach()
+        return
+
+    for line in source:
+        yield from _EXTRA_SEP_RE.split(line.rstrip("\r\n"))
+
 
 def extract_headers(txt_content):
     """
@@ -9,85 +199,709 @@ def extract_headers(txt_content):
     Ignore 'Stocks', '/', 'CR' et ne garde que les 7 colonnes de ventes.
     Valide que la première est bien un mois au format NN/NN.
     """
-    for line in txt_content.splitlines():
-        if "Stocks / CR" in line:
-            tokens = re.findall(r'\S+', line)
-            # tokens ex: ['Stocks', '/', 'CR', '11/26', 'M-1', 'M-2', 'M-3', 'M-4', 'M-5', 'M-6']
-            # On ignore les 3 premiers et on garde le reste
-            sales_headers = tokens[3:]
-            # Nettoyage: enlever toute occurrence résiduelle de '/' par sécurité
-            sales_headers = [h for h in sales_headers if h != '/']
-
-            # Validation: on attend 7 colonnes de ventes
-            if len(sales_headers) != 7:
-                # Fallback: si la première ressemble à un mois, compléter avec M-1..M-6
-                month = next((h for h in sales_headers if MONTH_RE.match(h)), None)
-                if month:
-                    sales_headers = [month, "M-1", "M-2", "M-3", "M-4", "M-5", "M-6"]
-                else:
-                    # Dernier recours: forcer un schéma standard
-                    sales_headers = ["MOIS", "M-1", "M-2", "M-3", "M-4", "M-5", "M-6"]
+    for line in iter_lines(txt_content):
+        if HEADER_MARKER in line:
+            return _headers_from_line(line)
 
-            # Validation: la première doit être le mois courant (NN/NN)
-            if not MONTH_RE.match(sales_headers[0]):
-                # Si l'ordre est inversé, tenter de remettre le mois en premier
-                month_idx = next((i for i, h in enumerate(sales_headers) if MONTH_RE.match(h)), None)
-                if month_idx is not None and month_idx != 0:
-                    sales_headers = [sales_headers[month_idx]] + [h for i, h in enumerate(sales_headers) if i != month_idx]
+    # Si aucune ligne d'en-tête trouvée, fallback standard
+    return list(DEFAULT_HEADERS)
 
-            return sales_headers
 
-    # Si aucune ligne d'en-tête trouvée, fallback standard
-    return ["MOIS", "M-1", "M-2", "M-3", "M-4", "M-5", "M-6"]
+def _int32(values) -> pd.arrays.IntegerArray:
+    """Colonne Int32 (sans valeur manquante) d'entiers 64 bits, construite sans conversion intermédiaire."""
+    values = np.frombuffer(values, dtype=np.int64).astype(np.int32)
+    return pd.arrays.IntegerArray(values, np.zeros(len(values), dtype=bool))
+
+
+def _build_frame(region_codes, regions, codes, names, stocks, cr, sales, headers, typed):
+    """Assemble les colonnes accumulées par un parseur en DataFrame (typé ou historique)."""
+    if len(regions) == 0:
+        return pd.DataFrame()
+
+    if headers is None:
+        headers = list(DEFAULT_HEADERS)
+
+    region_names = np.array(list(region_codes), dtype=object)
+    region_idx = np.frombuffer(regions, dtype=np.int32)
+
+    if not typed:
+        columns = {
+            "Région": region_names[region_idx],
+            "Code Produit": codes,
+            "Nom Produit": names,
+            "Stock": stocks,
+            "CR": np.frombuffer(cr, dtype=np.int64),
+        }
+        for h, col in zip(headers, sales):
+            columns[h] = np.frombuffer(col, dtype=np.int64)
+        return pd.DataFrame(columns)
+
+    # Les régions sont déjà codées : catégorielle construite sans re-hacher les chaînes
+    columns = {
+        "Région": pd.Categorical.from_codes(region_idx, categories=region_names)
+                    .reorder_categories(sorted(region_names)),
+        "Code Produit": pd.Categorical(codes),
+        "Nom Produit": pd.Categorical(names),
+        "Stock": to_int(stocks),
+        "CR": _int32(cr),
+    }
+    for h, col in zip(headers, sales):
+        columns[h] = _int32(col)
 
+    df = pd.DataFrame(columns, copy=False)
+    df.attrs["months"] = month_names(list(dict.fromkeys(headers)))
+    validate(df)
+    return df
 
-def parse_ubipharm_txt(txt_content):
-    lines = txt_content.splitlines()
-    region = None
-    data = []
 
-    headers = extract_headers(txt_content)  # 7 colonnes de ventes attendues
+def _check_engine(engine: str, parallel=False):
+    if engine not in ENGINES:
+        raise ValueError(f"Moteur inconnu : {engine!r} (attendu : {', '.join(ENGINES)})")
+    if parallel and engine != "loop":
+        raise ValueError(f"Le parsing parallèle n'utilise que le moteur 'loop' (reçu : {engine!r})")
+
+
+@timed("ubipharm.parse")
+def parse_ubipharm_txt(txt_content, encoding=None, typed=True, parallel=False, engine="loop"):
+    """
+    Parse un export TXT Ubipharm en une seule passe.
+    `txt_content` peut être une chaîne, des octets, un fichier ou un itérable de lignes :
+    en-têtes, régions et produits sont détectés au fil de la lecture et les valeurs
+    sont rangées directement par colonne (pas de dict par ligne).
+
+    Par défaut la sortie suit le schéma de `parsers.schema` (identifiants catégoriels,
+    quantités Int32 nullables). `typed=False` renvoie les types historiques
+    (chaînes object, int64, Stock en float si valeurs manquantes).
+
+    Un chemin (`pathlib.Path`) est parsé par mmap, voir `parse_ubipharm_file`.
+    `parallel=True` (ou un nombre de processus) répartit les régions d'un chemin ou
+    d'octets sur plusieurs cœurs, voir `parse_ubipharm_parallel`.
+
+    `engine="vectorized"` charge tout le texte et traite les lignes en bloc (voir
+    `_parse_vectorized`) : même sortie, environ 5x plus rapide sur les gros fichiers, mais le
+    contenu est matérialisé en entier. `engine="loop"` (défaut) lit la source au fil de l'eau.
+    """
+    _check_engine(engine, parallel)
+    if isinstance(txt_content, os.PathLike):
+        return parse_ubipharm_file(txt_content, encoding=encoding, typed=typed, parallel=parallel, engine=engine)
+    if parallel and isinstance(txt_content, (bytes, bytearray)):
+        return parse_ubipharm_parallel(txt_content, encoding=encoding, typed=typed,
+                                       workers=None if parallel is True else parallel)
+    if engine == "vectorized":
+        data, data_encoding = _read_content(txt_content, encoding)
+        return _parse_vectorized(data, typed, data_encoding)
+
+    region_search = REGION_RE.search
+    product_match = PRODUCT_RE.match
+
+    headers = None
+    region_code = -1
+    region_codes = {}
+
+    regions = array("i")
+    codes = []
+    names = []
+    stocks = []
+    cr = array("q")
+    sales = [array("q") for _ in range(7)]
+
+    for line in iter_lines(txt_content, encoding=encoding):
+        # En-têtes de ventes : la première ligne 'Stocks / CR' fait foi
+        if headers is None and HEADER_MARKER in line:
+            headers = _headers_from_line(line)
 
-    for line in lines:
         # Détecter la région
-        region_match = re.search(r'Pays.*R.gion\s+\d+/\w+\s+(.*)', line)
+        region_match = region_search(line)
         if region_match:
             region = region_match.group(1).strip()
+            # Région sans nom : ses lignes produit sont ignorées jusqu'à la région suivante
+            region_code = region_codes.setdefault(region, len(region_codes)) if region else -1
             continue
 
         # Détecter les lignes produit
-        product_match = re.match(
-            r'\s+([A-Z0-9]+)\s+(.+?)\s+(\d+)?\s*/\s*(\d+)\s+'   # Stock (optionnel) / CR
-            r'(\d+)\s+(\d+)\s+(\d+)\s+(\d+)\s+(\d+)\s+(\d+)\s+(\d+)',  # 7 colonnes de ventes
-            line
-        )
-        if product_match and region:
-            code = product_match.group(1).strip()
-            name = product_match.group(2).strip()
-            stock = int(product_match.group(3)) if product_match.group(3) else None
-            cr = int(product_match.group(4))
-            sales = [int(product_match.group(i)) for i in range(5, 12)]
-
-            # --- Correction : réalignement ---
-            if len(sales) == 7:
-                # Si la première n’est pas un mois, mais la dernière oui → on décale
-                if not MONTH_RE.match(str(sales[0])) and MONTH_RE.match(str(sales[-1])):
-                    sales = [sales[-1]] + sales[:-1]
-
-            # Validation stricte
-            if len(headers) != 7 or len(sales) != 7:
-                continue
-
-            row = {
-                "Région": region,
-                "Code Produit": code,
-                "Nom Produit": name,
-                "Stock": stock,
-                "CR": cr,
-            }
-            for h, val in zip(headers, sales):
-                row[h] = val
-
-            data.append(row)
-
-    return pd.DataFrame(data)
+        if region_code < 0:
+            continue
+        m = product_match(line)
+        if m is None:
+            continue
+
+        groups = m.groups()
+        regions.append(region_code)
+        codes.append(groups[0])
+        names.append(groups[1].strip())
+        stocks.append(int(groups[2]) if groups[2] else None)
+        cr.append(int(groups[3]))
+        for col, val in zip(sales, groups[4:]):
+            col.append(int(val))
+
+    return _build_frame(region_codes, regions, codes, names, stocks, cr, sales, headers, typed)
+
+
+def _read_content(source, encoding=None):
+    """
+    Contenu complet d'une source pour le moteur vectorisé : (octets, encodage), l'encodage
+    valant 'utf-8' ou 'latin-1' (exports Windows gardés tels quels, sans recodage). Mêmes règles
+    que `iter_lines` : encodage détecté sur un préfixe, BOM retirés des sources binaires.
+    """
+    if isinstance(source, (bytes, bytearray, memoryview)) or (
+            hasattr(source, "read") and not isinstance(source, io.TextIOBase)):
+        raw = bytes(source) if isinstance(source, (bytes, bytearray, memoryview)) else source.read()
+        encoding = encoding or sniff_encoding(raw[:SNIFF_BYTES])
+        codec = codecs.lookup(encoding).name
+        if codec == "iso8859-1":
+            return raw, "latin-1"
+        try:
+            if codec not in ("utf-8", "utf-8-sig"):
+                raise UnicodeError(encoding)
+            _check_utf8(raw)        # déjà de l'UTF-8 valide : gardé tel quel, sans recodage
+            data = raw.replace(codecs.BOM_UTF8, b"") if codecs.BOM_UTF8 in raw else raw
+        except UnicodeError:
+            data = raw.decode(encoding, errors=DECODE_ERRORS).replace(BOM, "").encode("utf-8")
+    elif isinstance(source, str):
+        data = source.encode("utf-8")
+    elif hasattr(source, "read"):
+        data = source.read().encode("utf-8")
+    else:
+        data = "\n".join(iter_lines(source, encoding=encoding)).encode("utf-8")
+    return data, "utf-8"
+
+
+def _check_utf8(buf) -> None:
+    """Lève UnicodeDecodeError si buf n'est pas de l'UTF-8 valide, validé par morceaux de `SCAN_BYTES`."""
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    view = memoryview(buf)
+    for start in range(0, len(view), SCAN_BYTES):
+        decoder.decode(view[start:start + SCAN_BYTES])
+    decoder.decode(b"", final=True)
+
+
+def _positions(buf: np.ndarray, byte: int, step: int = 1 << 20) -> np.ndarray:
+    """Positions de `byte` dans buf, cherchées par tranches de `step` octets (masques qui restent en cache)."""
+    found = [np.flatnonzero(buf[i:i + step] == byte) + i for i in range(0, len(buf), step)]
+    return np.concatenate(found) if found else np.empty(0, dtype=np.intp)
+
+
+def _token_values(words, start, end) -> np.ndarray:
+    """
+    Valeur des mots buf[start:end] de 1 à 8 chiffres ASCII, -1 pour les autres (`end` >= 8).
+    `words[end - 8]` : les 8 octets qui finissent le mot, lus comme un entier 64 bits ; les octets
+    avant le mot sont remplacés par des '0', puis les chiffres sont combinés 2 par 2, 4 par 4 et 8 par 8.
+    """
+    length = end - start
+    short = np.minimum(length, 8)
+    digits = words[end - 8]
+    digits &= _KEEP_BYTES[short]
+    digits |= _ZERO_FILL[short]
+    digits -= _ZEROS
+    # Octet hors '0'..'9' : bit de poids fort levé dans `digits` ou dans `digits + 0x76`
+    bad = digits + _OVER_NINE
+    bad |= digits
+    bad &= _HIGH_BITS
+    for factor, shift, mask in _COMBINE:
+        digits *= factor
+        digits >>= shift
+        digits &= mask
+    values = digits.view(np.int64)
+    values[(bad != 0) | (length > 8)] = -1
+    return values
+
+
+def _slices(data: bytes, lo: np.ndarray, hi: np.ndarray):
+    """
+    Tranches data[lo[i]:hi[i]] (croissantes et disjointes) en tableau binaire Arrow, sans boucle
+    Python : les bornes entrelacées décrivent les tranches et les intervalles qui les séparent,
+    puis seules les tranches sont gardées.
+    """
+    import pyarrow as pa
+
+    if len(lo) == 0:
+        return pa.array([], type=pa.large_binary())
+    offsets = np.empty(2 * len(lo), dtype=np.int64)
+    offsets[0::2], offsets[1::2] = lo, hi
+    spans = pa.Array.from_buffers(pa.large_binary(), len(offsets) - 1,
+                                  [None, pa.py_buffer(offsets), pa.py_buffer(data)])
+    return spans.take(pa.array(np.arange(0, len(offsets), 2)))
+
+
+def _parse_vectorized(data: bytes, typed: bool = True, encoding: str = "utf-8"):
+    """
+    Moteur « vectorisé » de `parse_ubipharm_txt` sur le contenu complet (`_read_content`) :
+    le buffer est découpé en lignes et en mots par NumPy, sans objet Python par ligne.
+
+    - les lignes région (celles qui contiennent 'Pays') passent par REGION_RE, puis chaque
+      ligne reçoit la dernière région vue (report vers l'avant sur les indices) ;
+    - les mots sont les plages d'octets sans blanc ASCII ; une ligne produit se lit depuis la
+      fin : 7 ventes, CR, '/', puis le stock éventuel, le code et le nom. Les nombres sont
+      convertis 8 chiffres à la fois (`_token_values`). Ce découpage se fait par blocs de
+      `_BLOCK_ROWS` lignes (`_product_block`) : les tableaux intermédiaires tiennent en cache ;
+    - seuls les codes et noms distincts sont décodés (encodage par dictionnaire Arrow) ;
+    - les lignes hors de ce gabarit (blanc, chiffre ou caractère de contrôle que les motifs
+      texte voient autrement, '/' collé, texte après les ventes, nombre de plus de 8 chiffres,
+      nom qui peut contenir lui-même une fin de ligne produit...) passent par PRODUCT_RE :
+      la sortie est identique à celle de la boucle, ligne pour ligne.
+
+    `.str.extract` avec les motifs de la boucle n'est qu'environ 2x plus rapide que la boucle ;
+    ce moteur l'est d'environ 5x (`python -m benchmarks.run --sizes 1000000 --stages parse parse_vectorized`).
+    """
+    import pyarrow as pa
+    import pyarrow.compute as pc
+
+    if not data:
+        return pd.DataFrame()
+    buf = np.frombuffer(data, dtype=np.uint8)
+    size = len(buf)
+    breaks = _positions(buf, 0x0A)
+    starts = np.concatenate([[0], breaks + 1])
+    ends = np.append(breaks, size)
+    crlf = (ends > starts) & (buf[ends - 1] == 0x0D)
+
+    # Octets hors ASCII imprimable : décodés seulement s'il y en a (quelques accents en général),
+    # les '\r' sont comptés au passage
+    rest = data.translate(None, _PRINTABLE_BYTES)
+    bare_cr = rest.count(b"\r") != np.count_nonzero(crlf)
+    rest = rest.replace(b"\r", b"").decode(encoding, errors=DECODE_ERRORS)
+    # '\r' isolés ou autres fins de ligne (NEL, \v, \f...) : ramenés à '\n', puis nouveau découpage
+    if bare_cr or _EXTRA_SEP_RE.search(rest):
+        return _parse_vectorized(_LINE_SEP_BYTES_RE[encoding].sub(b"\n", data), typed, encoding)
+    ends[crlf] -= 1
+
+    def line(i) -> str:
+        return data[starts[i]:ends[i]].decode(encoding)
+
+    def line_of(pos):
+        return np.searchsorted(starts, pos, side="right") - 1
+
+    pos = data.find(HEADER_MARKER.encode("ascii"))
+    headers = _headers_from_line(line(line_of(pos))) if pos >= 0 else None
+
+    # Régions : codées dans l'ordre d'apparition, puis reportées sur les lignes suivantes
+    # (-1 : pas une ligne région, -2 : région sans nom, dont les lignes produit sont ignorées)
+    region_codes = {}
+    region_of = np.full(len(starts), -1, dtype=np.int32)
+    # Lignes qui contiennent 'Pays', repérées par le 'y' minuscule (rare dans les exports en majuscules)
+    y = _positions(buf[:-1], 0x79)
+    y = y[y >= 2]
+    for i in np.unique(line_of(y[(buf[y - 2] == 0x50) & (buf[y - 1] == 0x61) & (buf[y + 1] == 0x73)])):
+        m = REGION_RE.search(line(i))
+        if m:
+            region = m.group(1).strip()
+            region_of[i] = region_codes.setdefault(region, len(region_codes)) if region else -2
+    is_region = region_of != -1
+    last_region = np.maximum.accumulate(np.where(is_region, np.arange(len(starts)), -1))
+    line_region = np.where(last_region >= 0, region_of[last_region], -1)
+    rows = np.flatnonzero(~is_region & (line_region >= 0) & (ends > starts))
+
+    if len(rows) == 0:
+        return pd.DataFrame()
+
+    # Lignes du gabarit, bloc par bloc : les tableaux intermédiaires restent petits
+    words = np.ndarray(shape=(max(size - 7, 0),), dtype="<u8", buffer=data, strides=(1,))
+    parts = []
+    for i in range(0, len(rows), _BLOCK_ROWS):
+        block = rows[i:i + _BLOCK_ROWS]
+        keep, *columns = _product_block(data, words, starts[block], ends[block])
+        parts.append([keep + i, *columns])
+    keep, code_lo, code_hi, name_lo, name_hi, stock = (np.concatenate(column) for column in list(zip(*parts))[:6])
+    numbers = np.concatenate([part[6] for part in parts], axis=1)
+
+    # Codes : encodés par dictionnaire, seules les valeurs distinctes sont vérifiées
+    codes = pc.dictionary_encode(_slices(data, code_lo, code_hi))
+    valid_code = pc.match_substring_regex(codes.dictionary, _CODE_RE2).to_numpy(zero_copy_only=False)
+    ok = valid_code[codes.indices.to_numpy()]
+    # Blancs ou chiffres que seuls `\s` / `\d` reconnaissent, octets de contrôle : cherchés
+    # uniquement dans les lignes qui ont de tels octets
+    if _SLOW_CHARS_RE.search(rest):
+        odd = np.flatnonzero((buf >= 0x80) | ((buf < 0x20) & ~_WS_BYTES[buf]))
+        suspects = np.flatnonzero(np.isin(rows[keep], line_of(odd)))
+        ok[suspects] &= np.array([_SLOW_CHARS_RE.search(line(rows[keep[k]])) is None for k in suspects], dtype=bool)
+    if not ok.all():
+        keep, name_lo, name_hi, stock = keep[ok], name_lo[ok], name_hi[ok], stock[ok]
+        codes, numbers = codes.filter(pa.array(ok)), numbers.compress(ok, axis=1)
+    lines_kept = rows[keep]
+    names = pc.dictionary_encode(_slices(data, name_lo, name_hi))
+
+    # Lignes hors gabarit : expression régulière ligne par ligne, comme la boucle
+    slow = np.setdiff1d(rows, lines_kept, assume_unique=True)
+    matches = [(i, m.groups()) for i in slow for m in [PRODUCT_RE.match(line(i))] if m]
+    if matches:
+        order = np.argsort(np.concatenate([lines_kept, [i for i, _ in matches]]), kind="stable")
+        lines_kept = np.concatenate([lines_kept, [i for i, _ in matches]])[order]
+        codes = np.concatenate([_decoded(codes, encoding), [g[0] for _, g in matches]])[order]
+        names = np.concatenate([_decoded(names, encoding), [g[1].strip() for _, g in matches]])[order]
+        stock = np.concatenate([stock, [int(g[2]) if g[2] else -1 for _, g in matches]])[order]
+        numbers = np.hstack([numbers, np.array([[int(v) for v in g[3:]] for _, g in matches]).T]).take(order, axis=1)
+    elif typed:
+        codes, names = _categorical(codes, encoding), _categorical(names, encoding)
+    else:
+        codes, names = _decoded(codes, encoding), _decoded(names, encoding)
+
+    missing = stock < 0
+    if typed:
+        stock = pd.arrays.IntegerArray(stock, missing)
+    elif missing.all():
+        stock = np.full(len(stock), None, dtype=object)     # comme une liste de None
+    elif missing.any():
+        stock = np.where(missing, np.nan, stock)
+    numbers = np.ascontiguousarray(numbers)     # une ligne contiguë par colonne
+    return _build_frame(region_codes, line_region[lines_kept], codes, names, stock,
+                        numbers[0], list(numbers[1:]), headers, typed)
+
+
+def _product_block(data: bytes, words, starts, ends):
+    """
+    Lignes produit du gabarit de `_parse_vectorized` parmi les lignes data[starts[i]:ends[i]] d'un bloc.
+    Renvoie (rang des lignes retenues, début et fin du code, début et fin du nom, stock ou -1,
+    CR et 7 ventes en tableau 8 x n) ; `words[p]` : les 8 octets data[p:p + 8] en entier 64 bits.
+    """
+    buf = np.frombuffer(data, dtype=np.uint8)
+    lo = starts[0]
+    block = buf[lo:ends[-1]]
+    starts, ends = starts - lo, ends - lo
+
+    # Mots : plages d'octets > 0x20 (les autres octets de contrôle renvoient la ligne vers PRODUCT_RE)
+    blank = np.ones(len(block) + 2, dtype=bool)
+    np.less_equal(block, 0x20, out=blank[1:-1])
+    edges = np.flatnonzero(blank[1:] != blank[:-1]) + lo
+    tok_start, tok_end = edges[0::2], edges[1::2]
+    if len(tok_start) == 0:     # lignes faites de blancs seulement : aucune ligne produit
+        empty = np.empty(0, dtype=np.int64)
+        return empty, empty, empty, empty, empty, empty, np.empty((8, 0), dtype=np.int64)
+    first = np.searchsorted(tok_start, starts + lo)
+    slash = np.searchsorted(tok_start, ends + lo) - _TAIL_TOKENS
+
+    # Gabarit : blanc en tête, au moins un code et un mot de nom, puis '/', CR et les 7 ventes
+    fast = blank[starts + 1] & (slash - first >= 2)
+    slash = np.where(fast, slash, 0)
+    fast &= (tok_end[slash] - tok_start[slash] == 1) & (buf[tok_start[slash]] == 0x2F)
+    fast &= tok_end[slash - 1] >= 8      # 8 octets lisibles avant la fin de chaque nombre
+
+    # '/' dans les mots du début de ligne suivi d'au moins 7 mots : une fin de ligne produit
+    # pourrait commencer dans le nom (le nom de PRODUCT_RE est non gourmand)
+    long_head = np.flatnonzero(fast & (slash - first >= 8))
+    fast[long_head] = [data.find(b"/", tok_start[first[k]], tok_end[slash[k] - 8]) < 0 for k in long_head]
+
+    keep = np.flatnonzero(fast)
+    first, slash = first[keep], slash[keep]
+    # Stock éventuel (mot avant '/'), CR et 7 ventes : une ligne par colonne
+    tail = slash + _TAIL_OFFSETS[:, None]
+    numbers = _token_values(words, tok_start[tail], tok_end[tail])
+    stock, numbers = numbers[0], numbers[1:]
+    stock[slash - 1 < first + 2] = -1       # le nom ne peut pas être vide
+    name_end = np.where(stock >= 0, slash - 1, slash) - 1
+    ok = (numbers >= 0).all(axis=0) & (tok_end[slash - 1] - tok_start[slash - 1] <= 8)
+    keep, first, name_end, stock, numbers = keep[ok], first[ok], name_end[ok], stock[ok], numbers.compress(ok, axis=1)
+    return keep, tok_start[first], tok_end[first], tok_start[first + 1], tok_end[name_end], stock, numbers
+
+
+def _sorted_dictionary(encoded, encoding: str):
+    """
+    (valeurs distinctes décodées et triées, rang de chaque ligne) d'un tableau Arrow encodé par
+    dictionnaire. L'ordre des octets UTF-8 ou latin-1 est celui des caractères : le tri se fait
+    dans Arrow, seules les valeurs distinctes sont décodées.
+    """
+    import pyarrow as pa
+    import pyarrow.compute as pc
+
+    dictionary, indices = encoded.dictionary, encoded.indices.to_numpy()
+    # Valeurs des lignes écartées après l'encodage : retirées du dictionnaire
+    used = np.bincount(indices, minlength=len(dictionary)) > 0
+    if not used.all():
+        dictionary, indices = dictionary.filter(pa.array(used)), (np.cumsum(used) - 1)[indices]
+    order = pc.array_sort_indices(dictionary).to_numpy()
+    values = dictionary.take(pa.array(order))
+    if encoding != "utf-8":
+        values = _latin1_to_utf8(values)
+    values = values.cast(pa.large_string()).to_numpy(zero_copy_only=False)
+    rank = np.empty(len(order), dtype=np.int64)
+    rank[order] = np.arange(len(order))
+    return values, rank[indices]
+
+
+def _latin1_to_utf8(values):
+    """
+    Tableau binaire Arrow latin-1 recodé en UTF-8 sans boucle Python : tout le buffer est recodé
+    d'un coup, chaque octet >= 0x80 devenant 2 octets, et les bornes des valeurs sont décalées d'autant.
+    """
+    import pyarrow as pa
+
+    offsets = np.frombuffer(values.buffers()[1], dtype=np.int64)[values.offset:values.offset + len(values) + 1]
+    raw = values.buffers()[2].to_pybytes()[offsets[0]:offsets[-1]]
+    if raw.isascii():
+        return values
+    wide = np.concatenate([[0], np.cumsum(np.frombuffer(raw, dtype=np.uint8) >= 0x80)])
+    offsets = offsets - offsets[0]
+    return pa.Array.from_buffers(pa.large_binary(), len(values), [
+        None, pa.py_buffer(offsets + wide[offsets]), pa.py_buffer(raw.decode("latin-1").encode("utf-8"))])
+
+
+def _decoded(encoded, encoding: str) -> np.ndarray:
+    """Chaînes (object) d'un tableau Arrow encodé par dictionnaire."""
+    values, codes = _sorted_dictionary(encoded, encoding)
+    return values[codes]
+
+
+def _categorical(encoded, encoding: str) -> pd.Categorical:
+    """Équivalent de `pd.Categorical(list(valeurs))` pour un tableau Arrow encodé par dictionnaire."""
+    values, codes = _sorted_dictionary(encoded, encoding)
+    return pd.Categorical.from_codes(codes, categories=values, validate=False)
+
+
+@timed("ubipharm.region_scan", rows=len)
+def region_spans(buf, encoding: str) -> list:
+    """
+    Pré-scan des blocs région d'un buffer d'octets : [(région, début, fin), ...] où
+    [début, fin) couvre les lignes produit qui suivent la ligne 'Pays … Région NN/XX <nom>'.
+    Seules les lignes contenant 'Pays' sont examinées (recherche en C, pas de boucle par ligne).
+    Une région sans nom ferme le bloc précédent mais n'en ouvre pas : ses lignes produit sont ignorées.
+    """
+    marks = []
+    pos = 0
+    size = len(buf)
+    while True:
+        i = buf.find(b"Pays", pos)
+        if i < 0:
+            break
+        line_start = buf.rfind(b"\n", 0, i) + 1
+        line_end = buf.find(b"\n", i)
+        line_end = size if line_end < 0 else line_end
+        m = REGION_RE_BYTES.match(buf, line_start, line_end)
+        if m:
+            marks.append((m.group(1).strip().decode(encoding, errors=DECODE_ERRORS), line_start, line_end + 1))
+        pos = line_end + 1
+
+    return [
+        (name, body_start, marks[k + 1][1] if k + 1 < len(marks) else size)
+        for k, (name, _, body_start) in enumerate(marks)
+        if name
+    ]
+
+
+def _needs_text_parser(buf, encoding: str) -> bool:
+    """
+    Vrai si les motifs en octets ne donneraient pas la sortie des motifs texte : '\\r' isolé,
+    fin de ligne autre que '\\n' / '\\r\\n', blanc ou chiffre non ASCII (espace insécable, NEL...).
+    Seuls les octets hors ASCII imprimable sont décodés, par morceaux de `SCAN_BYTES`.
+    """
+    decoder = codecs.getincrementaldecoder(encoding)(errors=DECODE_ERRORS)
+    for start in range(0, len(buf), SCAN_BYTES):
+        chunk = buf[start:start + SCAN_BYTES]
+        end = start + len(chunk)
+        bare_cr = chunk.count(b"\r") - chunk.count(b"\r\n")
+        # '\r\n' à cheval sur deux morceaux : le '\r' final n'est pas isolé
+        if bare_cr and not (bare_cr == 1 and chunk.endswith(b"\r") and buf[end:end + 1] == b"\n"):
+            return True
+        rest = chunk.translate(None, _PLAIN_BYTES)
+        if rest and _TEXT_ONLY_RE.search(decoder.decode(rest)):
+            return True
+    return False
+
+
+def _header_from_buffer(buf, encoding: str):
+    """En-têtes de ventes lus sur la première ligne 'Stocks / CR' du buffer (None si absente)."""
+    pos = buf.find(HEADER_MARKER.encode("ascii"))
+    if pos < 0:
+        return None
+    line_start = buf.rfind(b"\n", 0, pos) + 1
+    line_end = buf.find(b"\n", pos)
+    line = buf[line_start:line_end if line_end >= 0 else len(buf)]
+    return _headers_from_line(line.decode(encoding, errors=DECODE_ERRORS).replace(BOM, ""))
+
+
+def _parse_spans(buf, spans, encoding: str):
+    """
+    Parse les lignes produit des blocs `spans` d'un buffer d'octets.
+    Renvoie les colonnes accumulées, régions codées dans leur ordre d'apparition.
+    """
+    region_codes = {}
+    regions = array("i")
+    codes = []
+    names = []
+    stocks = []
+    cr = array("q")
+    sales = [array("q") for _ in range(7)]
+
+    for region, start, end in spans:
+        region_code = region_codes.setdefault(region, len(region_codes))
+        for m in PRODUCT_RE_BYTES.finditer(buf, start, end):
+            groups = m.groups()
+            regions.append(region_code)
+            codes.append(groups[0].decode("ascii"))
+            names.append(groups[1].strip().decode(encoding, errors=DECODE_ERRORS))
+            stocks.append(int(groups[2]) if groups[2] else None)
+            cr.append(int(groups[3]))
+            for col, val in zip(sales, groups[4:]):
+                col.append(int(val))
+
+    return region_codes, regions, codes, names, stocks, cr, sales
+
+
+@timed("ubipharm.parse_file")
+def parse_ubipharm_file(path, encoding=None, typed=True, parallel=False, engine="loop"):
+    """
+    Parse un export TXT posé sur disque via mmap (gros fichiers ETL) : les expressions
+    régulières tournent directement sur les octets mappés, bloc région par bloc région,
+    et seuls les noms de région et de produit sont décodés. Même sortie que `parse_ubipharm_txt`,
+    vers lequel le fichier est renvoyé si `_needs_text_parser` l'exige.
+
+    `parallel` : voir `parse_ubipharm_parallel` ; `engine` : voir `parse_ubipharm_txt`.
+    """
+    _check_engine(engine, parallel)
+    if parallel:
+        return parse_ubipharm_parallel(path, encoding=encoding, typed=typed,
+                                       workers=None if parallel is True else parallel)
+    if engine != "loop":
+        with open(path, "rb") as f:
+            return parse_ubipharm_txt(f, encoding, typed, engine=engine)
+
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return pd.DataFrame()
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            encoding = encoding or sniff_encoding(mm[:SNIFF_BYTES])
+            text_only = _needs_text_parser(mm, encoding)
+            if not text_only:
+                headers = _header_from_buffer(mm, encoding)
+                columns = _parse_spans(mm, region_spans(mm, encoding), encoding)
+        if text_only:
+            return parse_ubipharm_txt(f, encoding, typed)
+
+    return _build_frame(*columns, headers, typed)
+
+
+def _parse_shard(source, spans, encoding: str):
+    """
+    Tâche d'un processus du pool : parse un lot de blocs région contigus.
+    `source` est un chemin (le fichier est re-mappé dans le processus, rien n'est copié)
+    ou les octets du lot (positions des blocs relatives au début du lot).
+    """
+    if isinstance(source, (bytes, bytearray)):
+        return _parse_spans(source, spans, encoding)
+    with open(source, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        return _parse_spans(mm, spans, encoding)
+
+
+def _shard_spans(spans: list, n_shards: int) -> list:
+    """Découpe les blocs région en lots contigus de tailles (en octets) voisines, ordre conservé."""
+    total = sum(end - start for _, start, end in spans)
+    target = total / n_shards
+    shards, current, size = [], [], 0
+    for span in spans:
+        current.append(span)
+        size += span[2] - span[1]
+        if size >= target and len(shards) < n_shards - 1:
+            shards.append(current)
+            current, size = [], 0
+    if current:
+        shards.append(current)
+    return shards
+
+
+def _merge_shards(results: list):
+    """
+    Concatène les colonnes des lots dans leur ordre d'origine. Les codes région locaux
+    sont renumérotés dans l'ordre de première apparition, comme le parseur séquentiel.
+    """
+    region_codes = {}
+    regions = array("i")
+    codes = []
+    names = []
+    stocks = []
+    cr = array("q")
+    sales = [array("q") for _ in range(7)]
+
+    for shard_regions, shard_idx, shard_codes, shard_names, shard_stocks, shard_cr, shard_sales in results:
+        remap = np.array([region_codes.setdefault(r, len(region_codes)) for r in shard_regions], dtype=np.int32)
+        regions.frombytes(remap[np.frombuffer(shard_idx, dtype=np.int32)].tobytes())
+        codes.extend(shard_codes)
+        names.extend(shard_names)
+        stocks.extend(shard_stocks)
+        cr.extend(shard_cr)
+        for col, shard_col in zip(sales, shard_sales):
+            col.extend(shard_col)
+
+    return region_codes, regions, codes, names, stocks, cr, sales
+
+
+@timed("ubipharm.parse_parallel")
+def parse_ubipharm_parallel(source, encoding=None, typed=True, workers=None,
+                            min_bytes=PARALLEL_MIN_BYTES):
+    """
+    Parse un export (chemin ou octets) en répartissant les blocs région sur un pool de processus.
+
+    Les frontières de région sont trouvées par `region_spans` (pré-scan des lignes 'Pays'),
+    les blocs sont regroupés en lots contigus, parsés en parallèle puis concaténés
+    dans l'ordre du fichier : même sortie que le parseur séquentiel.
+
+    Repasse en séquentiel sous `min_bytes`, avec moins de 2 régions ou 1 seul processus :
+    le démarrage du pool coûterait plus qu'il ne rapporte. Moteur "loop" uniquement.
+
+    Réservé au traitement par lots (batch.py, benchmarks) : chaque appel crée son pool
+    de processus (fork), ce qui est à éviter dans le serveur Streamlit multithreadé ;
+    les pages utilisent le moteur vectorisé, en séquentiel.
+    """
+    workers = workers or os.cpu_count() or 1
+    is_path = isinstance(source, (str, os.PathLike))
+    size = os.path.getsize(source) if is_path else len(source)
+
+    if workers < 2 or size < min_bytes:
+        if is_path:
+            return parse_ubipharm_file(source, encoding, typed)
+        return parse_ubipharm_txt(io.BytesIO(source), encoding, typed)
+
+    if is_path:
+        with open(source, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            encoding = encoding or sniff_encoding(mm[:SNIFF_BYTES])
+            text_only = _needs_text_parser(mm, encoding)
+            if not text_only:
+                headers = _header_from_buffer(mm, encoding)
+                spans = region_spans(mm, encoding)
+    else:
+        buf = bytes(source)
+        encoding = encoding or sniff_encoding(buf[:SNIFF_BYTES])
+        text_only = _needs_text_parser(buf, encoding)
+        if not text_only:
+            headers = _header_from_buffer(buf, encoding)
+            spans = region_spans(buf, encoding)
+
+    if text_only:
+        # Motifs texte, en séquentiel (cas rare : '\r' isolés, NEL, espaces insécables...)
+        with open(source, "rb") if is_path else io.BytesIO(buf) as f:
+            return parse_ubipharm_txt(f, encoding, typed)
+
+    if len(spans) < 2:
+        if is_path:
+            return parse_ubipharm_file(source, encoding, typed)
+        return _build_frame(*_parse_spans(buf, spans, encoding), headers, typed)
+
+    # Quelques lots par processus pour lisser les régions de tailles inégales
+    shards = _shard_spans(spans, min(len(spans), workers * 4))
+    tasks = []
+    for shard in shards:
+        if is_path:
+            tasks.append((os.fspath(source), shard))
+        else:
+            offset, end = shard[0][1], shard[-1][2]
+            tasks.append((buf[offset:end], [(r, s - offset, e - offset) for r, s, e in shard]))
+
+    with measure("ubipharm.parse_shards"), ProcessPoolExecutor(max_workers=min(workers, len(shards))) as pool:
+        futures = [pool.submit(_parse_shard, src, shard, encoding) for src, shard in tasks]
+        results = [future.result() for future in futures]
+
+    with measure("ubipharm.merge_shards"):
+        columns = _merge_shards(results)
+    return _build_frame(*columns, headers, typed)
+
+
+def parse_ubipharm_bytes(raw_bytes, parallel=False, engine="loop"):
+    """
+    Parse un TXT Ubipharm brut (octets ou fichier binaire) : encodage détecté sur un préfixe,
+    décodage incrémental ligne à ligne, sans copie décodée complète du fichier.
+    `parallel=True` : régions parsées sur plusieurs cœurs (traitement par lots uniquement).
+    `engine="vectorized"` : lignes traitées en bloc, voir `parse_ubipharm_txt`.
+    """
+    _check_engine(engine, parallel)
+    if parallel and isinstance(raw_bytes, (bytes, bytearray)):
+        return parse_ubipharm_parallel(raw_bytes, workers=None if parallel is True else parallel)
+    if isinstance(raw_bytes, (bytes, bytearray)):
+        raw_bytes = io.BytesIO(raw_bytes)
+    return parse_ubipharm_txt(raw_bytes, engine=engine)
@@ -0,0 +1,78 @@
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from components.communes import DEFAULT_REGIONS, commune_mapping, get_commune_mapping
+from components.repartition import repartir_regions
+
+SALES = pd.DataFrame({
+    "Région": pd.Categorical(["EST", "OUEST", "NORD", "EST"]),
+    "Code Produit": ["A", "A", "B", "C"],
+    "Nom Produit": ["ALPHA", "ALPHA", "BETA", "GAMMA"],
+    "11/26": [100, 40, 7, None],
+})
+
+
+def write_config(path, regions: dict, version: str):
+    path.write_text(json.dumps({"version": version, "regions": regions}), encoding="utf-8")
+
+
+def test_weighted_parts():
+    mapping = commune_mapping({"EST": {"C1": 3, "C2": 1}, "OUEST": ["C2", "C3"], "SUD": {"C4": 0, "C5": 0}})
+    assert mapping.weights_by_region == {
+        "EST": {"C1": 0.75, "C2": 0.25}, "OUEST": {"C2": 0.5, "C3": 0.5}, "SUD": {"C4": 0.5, "C5": 0.5},
+    }
+    assert mapping.regions_by_commune["C2"] == ["EST", "OUEST"]
+    np.testing.assert_allclose(mapping.matrix.sum(axis=1), 1)
+
+    # Poids passés à part : une commune sans poids a une part nulle
+    reweighted = commune_mapping({"EST": ["C1", "C2", "C3"]}, weights={"EST": {"C1": 1, "C3": 3}})
+    assert reweighted.weights_by_region["EST"] == {"C1": 0.25, "C2": 0.0, "C3": 0.75}
+
+
+@pytest.mark.parametrize("spec", [{"C1": -1}, {"C1": float("nan")}, "C1"])
+def test_invalid_weights(spec):
+    with pytest.raises(ValueError):
+        commune_mapping({"EST": spec})
+
+
+def test_weighted_split_of_sales():
+    mapping = commune_mapping({"EST": {"C1": 3, "C2": 1}, "OUEST": ["C2"]})
+    long = repartir_regions(SALES, col="11/26", mapping=mapping)
+    assert long[["Région", "Commune", "Code Produit"]].astype(str).values.tolist() == [
+        ["EST", "C1", "A"], ["EST", "C2", "A"], ["OUEST", "C2", "A"], ["EST", "C1", "C"], ["EST", "C2", "C"],
+    ]
+    assert long["11/26"].tolist() == [75, 25, 40, 0, 0]      # vente manquante comptée comme 0
+
+    wide = repartir_regions(SALES, col="11/26", mapping=mapping, horizontal=True)
+    assert wide[["11/26 C1", "11/26 C2"]].values.tolist() == [[75, 25], [0, 40], [0, 0]]
+
+
+def test_regions_missing_from_config(tmp_path):
+    path = tmp_path / "communes.json"
+    write_config(path, {"EST": {"C1": 1, "C2": 1}, "OUEST": ["C3"]}, "v1")
+    mapping = get_commune_mapping(str(path))
+    assert mapping.version == "v1" and "NORD" not in mapping
+    assert mapping.unmapped(SALES["Région"]) == ["NORD"]
+    np.testing.assert_array_equal(mapping.region_codes(SALES["Région"]), [0, 1, -1, 0])
+
+    # Ignorée par défaut, gardée entière (commune à son nom) avec keep_unmapped
+    assert "NORD" not in set(repartir_regions(SALES, col="11/26", mapping=mapping)["Région"])
+    kept = repartir_regions(SALES, col="11/26", mapping=mapping, keep_unmapped=True)
+    assert kept.loc[kept["Région"] == "NORD", ["Commune", "11/26"]].astype(object).values.tolist() == [["NORD", 7]]
+
+
+def test_config_reloaded_when_changed(tmp_path):
+    path = tmp_path / "communes.json"
+    write_config(path, {"EST": ["C1"]}, "v1")
+    first = get_commune_mapping(str(path))
+    assert get_commune_mapping(str(path)) is first
+
+    write_config(path, {"EST": ["C1"], "NORD": {"C9": 2, "C8": 2}}, "v2")
+    second = get_commune_mapping(str(path))
+    assert second.version == "v2" and second.weights_by_region["NORD"] == {"C9": 0.5, "C8": 0.5}
+
+    missing = get_commune_mapping(str(tmp_path / "absent.json"))
+    assert missing.communes_by_region == DEFAULT_REGIONS
@@ -0,0 +1,45 @@
+import numpy as np
+import pytest
+
+from components.cube import top_n_positions
+
+NAN = np.nan
+
+
+def sorted_positions(values, n, largest):
+    """Référence : tri stable complet, NaN en dernier dans l'ordre des positions."""
+    values = np.asarray(values, dtype=float)
+    keyed = np.where(np.isnan(values), np.inf, -values if largest else values)
+    return np.argsort(keyed, kind="stable")[:n].tolist()
+
+
+@pytest.mark.parametrize("largest", [True, False])
+def test_nan_last(largest):
+    values = [3, NAN, 1, 7, NAN, 5]
+    assert top_n_positions(values, 3, largest=largest).tolist() == ([3, 5, 0] if largest else [2, 0, 5])
+    assert top_n_positions(values, 6, largest=largest).tolist()[-2:] == [1, 4]
+    assert top_n_positions([NAN, NAN, NAN], 2, largest=largest).tolist() == [0, 1]
+
+
+@pytest.mark.parametrize("largest", [True, False])
+def test_ties_in_position_order(largest):
+    values = np.r_[np.full(100, 2.0), [3.0, 1.0]]
+    assert top_n_positions(values, 4, largest=largest).tolist() == ([100, 0, 1, 2] if largest else [101, 0, 1, 2])
+    assert top_n_positions([5] * 20, 3, largest=largest).tolist() == [0, 1, 2]
+
+
+@pytest.mark.parametrize("largest", [True, False])
+def test_n_larger_than_rows(largest):
+    assert top_n_positions([4, NAN, 9], 10, largest=largest).tolist() == ([2, 0, 1] if largest else [0, 2, 1])
+    assert top_n_positions([], 3, largest=largest).tolist() == []
+    assert top_n_positions([1, 2], 0, largest=largest).tolist() == []
+
+
+@pytest.mark.parametrize("largest", [True, False])
+def test_matches_stable_sort(largest):
+    rng = np.random.default_rng(0)
+    for _ in range(50):
+        values = rng.integers(0, 5, size=rng.integers(0, 40)).astype(float)
+        values[rng.random(len(values)) < 0.2] = NAN
+        for n in [1, 3, 10, 50]:
+            assert top_n_positions(values, n, largest=largest).tolist() == sorted_positions(values, n, largest)
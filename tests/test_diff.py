@@ -0,0 +1,77 @@
+import numpy as np
+import pandas as pd
+
+from components.diff import DISCONTINUED, KEPT, NEW, compare_exports, diff_summary, region_deltas
+
+OFFSETS = ["M-1", "M-2", "M-3", "M-4", "M-5", "M-6"]
+
+
+def export(month: str, rows: list) -> pd.DataFrame:
+    """Export parsé minimal : (région, code, nom, stock, CR, ventes du mois) par ligne."""
+    df = pd.DataFrame(rows, columns=["Région", "Code Produit", "Nom Produit", "Stock", "CR", month])
+    df["Stock"] = pd.array(df["Stock"], dtype="Int32")
+    for col in OFFSETS:
+        df[col] = 0
+    return df
+
+
+PREVIOUS = export("10/26", [
+    ("R1", "A", "ALPHA", 10, 1, 5),
+    ("R1", "B", "BETA", None, 2, 4),
+    ("R2", "A", "ALPHA", 3, 0, 0),
+])
+CURRENT = export("11/26", [
+    ("R1", "A", "ALPHA", 8, 2, 7),
+    ("R2", "A", "ALPHA", None, 1, 2),
+    ("R2", "C", "GAMMA", 1, 0, 3),
+])
+
+
+def rows(aligned: pd.DataFrame, cols: list) -> list:
+    return aligned[cols].astype(object).where(aligned[cols].notna(), None).values.tolist()
+
+
+def test_statuses_and_order():
+    aligned = compare_exports(PREVIOUS, CURRENT)
+    # Lignes du mois courant dans leur ordre, puis les produits arrêtés
+    assert rows(aligned, ["Région", "Code Produit", "Nom Produit", "Statut"]) == [
+        ["R1", "A", "ALPHA", KEPT],
+        ["R2", "A", "ALPHA", KEPT],
+        ["R2", "C", "GAMMA", NEW],
+        ["R1", "B", "BETA", DISCONTINUED],
+    ]
+    assert aligned.attrs["months"] == ("10/26", "11/26")
+    assert diff_summary(aligned) == {
+        "nouveaux": 1, "arrêtés": 1, "suivis": 2,
+        "ventes_préc": 9.0, "ventes": 12.0, "stock_préc": 13.0, "stock": 9.0,
+    }
+
+
+def test_deltas():
+    aligned = compare_exports(PREVIOUS, CURRENT)
+    assert rows(aligned, ["Ventes préc.", "Ventes", "Δ Ventes", "Évolution %"]) == [
+        [5.0, 7.0, 2.0, 40.0],
+        [0.0, 2.0, 2.0, None],      # pas d'évolution en % depuis 0
+        [None, 3.0, 3.0, None],
+        [4.0, None, -4.0, -100.0],   # produit arrêté : ventes comptées à 0
+    ]
+    # Stock absent d'un côté : écart inconnu ; CR absent compté comme 0
+    assert rows(aligned, ["Stock préc.", "Stock", "Δ Stock"]) == [
+        [10.0, 8.0, -2.0], [3.0, None, None], [None, 1.0, None], [None, None, None],
+    ]
+    assert rows(aligned, ["CR préc.", "CR", "Δ CR"]) == [[1.0, 2.0, 1.0], [0.0, 1.0, 1.0], [None, 0.0, 0.0], [2.0, None, -2.0]]
+    assert region_deltas(aligned)["Δ Ventes"].to_dict() == {"R1": -2.0, "R2": 5.0}
+
+
+def test_duplicate_keys_are_summed():
+    current = pd.concat([CURRENT, export("11/26", [("R1", "A", "ALPHA BIS", None, 3, 1)])], ignore_index=True)
+    previous = pd.concat([PREVIOUS, export("10/26", [("R2", "A", "ALPHA", 2, 1, 6)])], ignore_index=True)
+    aligned = compare_exports(previous, current)
+
+    assert len(aligned) == 4 and not aligned.duplicated(["Région", "Code Produit"]).any()
+    first = aligned.iloc[0]
+    assert first["Nom Produit"] == "ALPHA"      # nom de la première occurrence
+    assert (first["Ventes"], first["CR"], first["Stock"]) == (8.0, 5.0, 8.0)     # stock manquant ignoré
+    second = aligned.iloc[1]
+    assert (second["Ventes préc."], second["Stock préc."], second["CR préc."]) == (6.0, 5.0, 1.0)
+    assert np.isnan(second["Stock"])
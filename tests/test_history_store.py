@@ -0,0 +1,39 @@
+import pytest
+
+from benchmarks.synthetic import ubipharm_txt
+from components.history_store import HistoryStore, current_month
+from parsers.ubipharm import parse_ubipharm_txt
+
+
+def test_append_writes_one_partition_per_month(tmp_path):
+    df = parse_ubipharm_txt(ubipharm_txt(n_regions=2, n_products=5, month="02/26"))
+    store = HistoryStore(str(tmp_path))
+
+    assert store.append(df) == 7 * 2 * 5
+    assert store.months() == ["2025-08", "2025-09", "2025-10", "2025-11", "2025-12", "2026-01", "2026-02"]
+
+
+@pytest.mark.parametrize("month", ["13/26", "00/26"])
+def test_invalid_export_month_writes_nothing(tmp_path, month):
+    df = parse_ubipharm_txt(ubipharm_txt(n_regions=1, n_products=3, month=month))
+    store = HistoryStore(str(tmp_path))
+
+    with pytest.raises(ValueError):
+        current_month(df)
+    with pytest.raises(ValueError):
+        store.append(df)
+    assert store.months() == []
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_version_changes_when_a_partition_is_rewritten(tmp_path):
+    store = HistoryStore(str(tmp_path))
+    assert store.version() == ()
+    store.append(parse_ubipharm_txt(ubipharm_txt(n_regions=1, n_products=3, month="02/26")))
+    before = store.version("2026-01", "2026-02")
+    assert [month for month, *_ in before] == ["2026-01", "2026-02"]
+
+    store.append(parse_ubipharm_txt(ubipharm_txt(n_regions=1, n_products=3, month="03/26", seed=1)))
+    after = store.version("2026-01", "2026-02")
+    assert [month for month, *_ in after] == ["2026-01", "2026-02"]
+    assert after != before
@@ -0,0 +1,50 @@
+import pandas as pd
+
+from benchmarks.synthetic import iter_ubipharm_lines
+from components.repartition import repartir_regions
+from parsers.schema import INT_DTYPE, month_names, read_sales_csv
+from parsers.ubipharm import parse_ubipharm_txt
+
+SALES = ["11/26", "M-1", "M-2", "M-3", "M-4", "M-5", "M-6"]
+
+
+def test_month_names_from_current_month():
+    assert month_names(SALES) == {
+        "11/26": "11/26", "M-1": "10/26", "M-2": "09/26", "M-3": "08/26", "M-4": "07/26", "M-5": "06/26",
+        "M-6": "05/26",
+    }
+
+
+def test_invalid_current_month_leaves_columns_unnamed():
+    for month in ["13/26", "00/26"]:
+        assert month_names([month] + SALES[1:]) == {}
+
+
+def parsed_export() -> pd.DataFrame:
+    return parse_ubipharm_txt("\n".join(iter_ubipharm_lines(n_regions=2, n_products=5)))
+
+
+def test_read_sales_csv_types_exported_sales():
+    parsed = parsed_export()
+    df = read_sales_csv(parsed.to_csv(index=False).encode("utf-8"))
+    assert all(isinstance(df[c].dtype, pd.CategoricalDtype) for c in ["Région", "Code Produit", "Nom Produit"])
+    assert all(str(df[c].dtype) == INT_DTYPE for c in ["Stock", "CR"] + SALES)
+    assert df.attrs["months"]["M-1"] == "10/26"
+    pd.testing.assert_frame_equal(df.astype(object), parsed.astype(object), check_categorical=False)
+
+
+def test_read_sales_csv_keeps_commune_columns():
+    parsed = parsed_export()
+    split = repartir_regions(parsed, col="11/26", mapping={r: ["A", "B"] for r in parsed["Région"].unique()},
+                             horizontal=True)
+    df = read_sales_csv(split.to_csv(index=False).encode("utf-8"))
+    assert str(df["11/26"].dtype) == INT_DTYPE
+    assert df["11/26 A"].dtype == "float64" and list(df["11/26 A"]) == list(split["11/26 A"])
+
+
+def test_read_sales_csv_outside_schema_is_only_categorized():
+    parsed = parsed_export()
+    for edited in [parsed.drop(columns="Stock"), parsed.assign(CR=parsed["CR"] + 0.5)]:
+        df = read_sales_csv(edited.to_csv(index=False).encode("utf-8"))
+        assert isinstance(df["Région"].dtype, pd.CategoricalDtype)
+        assert df["M-1"].dtype == "int64" and "months" not in df.attrs
@@ -0,0 +1,58 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from components.trends import TREND_COLS, SalesTrends, linear_forecast, moving_average, sales_matrix
+
+SALES = ["11/26", "M-1", "M-2", "M-3", "M-4", "M-5", "M-6"]
+NAN = np.nan
+
+
+def sales_frame() -> pd.DataFrame:
+    """Ventes du plus ancien au plus récent mois (M-6 -> 11/26), mois courant en première colonne."""
+    oldest_first = [
+        [1, 2, 3, 4, 5, 6, 7],
+        [NAN, 0, 0, 0, 3, NAN, 3],      # mois manquants comptés comme 0
+        [0, 0, 0, 0, 0, 0, 0],
+    ]
+    df = pd.DataFrame([row[::-1] for row in oldest_first], columns=SALES)
+    df.insert(0, "Région", ["R1", "R1", "R2"])
+    df.insert(1, "Stock", pd.array([3, None, 5], dtype="Int32"))
+    return df
+
+
+def test_sales_matrix_oldest_first_and_missing_as_zero():
+    np.testing.assert_array_equal(sales_matrix(sales_frame()), [
+        [1, 2, 3, 4, 5, 6, 7], [0, 0, 0, 0, 3, 0, 3], [0, 0, 0, 0, 0, 0, 0],
+    ])
+
+
+def test_moving_average_and_forecast():
+    matrix = np.array([[1, 2, 3, 4, 5, 6, 7], [0, 0, 0, 0, 3, 0, 3]], dtype=float)
+    np.testing.assert_allclose(moving_average(matrix, 3), [[2, 3, 4, 5, 6], [0, 0, 1, 1, 2]])
+    assert moving_average(matrix, 10).shape == (2, 1)       # fenêtre bornée au nombre de mois
+    # Droite exacte pour la première ligne ; pente 3/7 autour de la moyenne 6/7 pour la seconde
+    np.testing.assert_allclose(linear_forecast(matrix), [8, 18 / 7])
+    np.testing.assert_allclose(linear_forecast(np.array([[5.0, 1.0, 0.0]])), [0])      # bornée à 0
+
+
+def test_product_trends():
+    trends = SalesTrends(sales_frame())
+    assert list(trends.products.columns) == TREND_COLS
+    np.testing.assert_allclose(trends.products.to_numpy(dtype=float), [
+        [6, 4.5, 100 / 6, 100, 0.5, 8],
+        [2, 1, NAN, NAN, NAN, 3],       # pas de croissance depuis 0 ; stock inconnu
+        [0, 0, NAN, NAN, NAN, 0],       # aucune vente : couverture indéfinie
+    ], equal_nan=True)
+
+
+def test_region_trends_and_kpis():
+    trends = SalesTrends(sales_frame())
+    assert list(trends.regions.index) == ["R1", "R2"]
+    np.testing.assert_allclose(trends.regions.to_numpy(dtype=float), [
+        [10, 8, 5.5, 400 / 6, 500 / 3, 3 / 8, 11],
+        [0, 0, 0, NAN, NAN, NAN, 0],
+    ], equal_nan=True)
+    kpis = trends.kpis()
+    assert kpis["prévision"] == 11 and kpis["ruptures"] == 1
+    assert kpis["évolution"] == pytest.approx(400 / 6) and kpis["couverture"] == pytest.approx(1)
@@ -0,0 +1,60 @@
+"""
+Export latin-1 dont les 64 premiers Kio sont en ASCII pur : `sniff_encoding` y voit de l'UTF-8,
+les accents trouvés plus loin doivent être relus en latin-1 (jamais remplacés par U+FFFD).
+"""
+import pandas as pd
+import pytest
+
+import parsers.ubipharm as ubipharm
+from benchmarks.synthetic import iter_ubipharm_lines
+from parsers.ubipharm import (
+    SNIFF_BYTES, parse_ubipharm_bytes, parse_ubipharm_file, parse_ubipharm_parallel, parse_ubipharm_txt,
+    sniff_encoding,
+)
+
+ACCENTED = [
+    "Pays 01 MALI          Région 09/ML SÉGOU",
+    "  A000001  ÉLIXIR PARÉGORIQUE B/1             12 / 3     1     2     3     4     5     6     7",
+    "  B000002  CRÈME HYDRATANTE 50ML               / 4     1     2     3     4     5     6     7",
+]
+
+
+def export_text() -> str:
+    ascii_lines = [line.replace("é", "e") for line in iter_ubipharm_lines(n_regions=2, n_products=400)]
+    return "\r\n".join(ascii_lines + ACCENTED)
+
+
+def test_late_latin1_accents_are_kept(tmp_path):
+    text = export_text()
+    raw = text.encode("latin-1")
+    assert raw[:SNIFF_BYTES].isascii() and sniff_encoding(raw[:SNIFF_BYTES]) == "utf-8"
+    path = tmp_path / "export.txt"
+    path.write_bytes(raw)
+
+    expected = parse_ubipharm_txt(text)
+    assert {"ÉLIXIR PARÉGORIQUE B/1", "CRÈME HYDRATANTE 50ML"} <= set(expected["Nom Produit"])
+    assert "SÉGOU" in set(expected["Région"])
+    for name, df in [
+        ("bytes", parse_ubipharm_bytes(raw)),
+        ("bytes_vectorized", parse_ubipharm_bytes(raw, engine="vectorized")),
+        ("file", parse_ubipharm_file(path)),
+        ("file_vectorized", parse_ubipharm_file(path, engine="vectorized")),
+        ("parallel_path", parse_ubipharm_parallel(path, workers=2, min_bytes=0)),
+        ("parallel_bytes", parse_ubipharm_parallel(raw, workers=2, min_bytes=0)),
+    ]:
+        pd.testing.assert_frame_equal(df, expected, obj=name)
+
+
+@pytest.mark.parametrize("scan_bytes", [1, 7, ubipharm.SCAN_BYTES])
+def test_utf8_checked_by_chunks(monkeypatch, scan_bytes):
+    # Caractères de 2 octets à cheval sur deux morceaux : toujours de l'UTF-8 valide
+    monkeypatch.setattr(ubipharm, "SCAN_BYTES", scan_bytes)
+    text = "\r\n".join(ACCENTED)
+    assert ubipharm._read_content(text.encode("utf-8"))[1] == "utf-8"
+    pd.testing.assert_frame_equal(parse_ubipharm_bytes(text.encode("utf-8"), engine="vectorized"),
+                                  parse_ubipharm_txt(text))
+
+    # Octet latin-1 isolé ou séquence UTF-8 tronquée en fin de contenu : seuls ces octets sont relus en latin-1
+    for tail, expected in [(b"\r\n\xe9", "\r\né"), (b"\xc3", "Ã")]:
+        data, data_encoding = ubipharm._read_content(text.encode("utf-8") + tail, "utf-8")
+        assert data == (text + expected).encode("utf-8") and data_encoding == "utf-8"
@@ -0,0 +1,74 @@
+"""
+Moteur vectorisé contre la boucle : même DataFrame (typé ou historique), y compris pour les
+lignes hors gabarit renvoyées vers PRODUCT_RE et quand les lignes sont découpées en plusieurs blocs.
+"""
+import pandas as pd
+import pytest
+
+import parsers.ubipharm as ubipharm
+from benchmarks.synthetic import iter_ubipharm_lines
+from parsers.ubipharm import parse_ubipharm_txt
+
+ODD_LINES = [
+    "  A1  ÉLIXIR PARÉGORIQUE B/1            12 / 3   1   2   3   4   5   6   7",
+    "  B2  SANS STOCK                             / 4   1   2   3   4   5   6   7",
+    "  C3  NOM / 1 2 3 4 5 6 7 8 9 AVEC FIN  15 / 5   1   2   3   4   5   6   7",
+    "  d4  CODE EN MINUSCULES                 9 / 6   1   2   3   4   5   6   7",
+    "  E5  GRAND NOMBRE                       9 / 7   1   2   3   4   5   6   123456789",
+    "  F6  COLLÉ                             9/8   1   2   3   4   5   6   7",
+    "  G7  TEXTE APRÈS                        9 / 9   1   2   3   4   5   6   7  FIN",
+    "  H8  INCOMPLÈTE                         9 / 9   1   2   3",
+    "  J9  NOM 12 34                         56 / 5   1   2   3   4   5   6   7",
+    "  K1  1234 / 5   1   2   3   4   5   6   7",
+    "  L2  STOCK À 9 CHIFFRES          123456789 / 5   1   2   3   4   5   6   7",
+    "  M3  TABULATIONS\t12 /\t5\t1\t2\t3\t4\t5\t6\t7",
+    "  N4  ZÉROS                          00000000 / 0   0   0   0   0   0   0   00000007",
+    "    ",
+    "\t ",
+]
+
+
+def export_text() -> str:
+    lines = list(iter_ubipharm_lines(n_regions=2, n_products=12))
+    return "\r\n".join(lines[:-6] + ODD_LINES + lines[-6:]) + "\r\n    \r\n"
+
+
+@pytest.mark.parametrize("block_rows", [1, 2, 5, ubipharm._BLOCK_ROWS])
+@pytest.mark.parametrize("encoding", ["latin-1", "utf-8"])
+@pytest.mark.parametrize("typed", [True, False])
+def test_vectorized_matches_loop(monkeypatch, block_rows, encoding, typed):
+    monkeypatch.setattr(ubipharm, "_BLOCK_ROWS", block_rows)
+    raw = export_text().encode(encoding)
+
+    expected = parse_ubipharm_txt(raw, typed=typed)
+    assert len(expected) == 2 * 12 + len(ODD_LINES) - 4     # minuscules, ligne incomplète et blancs ignorés
+    pd.testing.assert_frame_equal(parse_ubipharm_txt(raw, typed=typed, engine="vectorized"), expected)
+
+
+@pytest.mark.parametrize("text", [
+    "Pays 01 ML Région 01/ML R1\n  ",
+    "Pays 01 ML Région 01/ML R1\n  \n\t\n",
+    "  \n   ",
+])
+def test_blank_only_lines(text):
+    expected = parse_ubipharm_txt(text)
+    pd.testing.assert_frame_equal(parse_ubipharm_txt(text, engine="vectorized"), expected)
+
+
+def test_unnamed_region_products_are_skipped(tmp_path):
+    lines = list(iter_ubipharm_lines(n_regions=3, n_products=4))
+    # Deuxième région sans nom : ses produits ne sont rattachés à aucune région
+    second = next(i for i, line in enumerate(lines) if "Pays" in line and i > 0)
+    lines[second] = lines[second][:lines[second].index("Région")] + "Région 02/ML   "
+    raw = "\r\n".join(lines).encode("latin-1")
+    path = tmp_path / "export.txt"
+    path.write_bytes(raw)
+
+    expected = parse_ubipharm_txt(raw)
+    assert len(expected) == 2 * 4 and "" not in set(expected["Région"])
+    for name, df in [
+        ("vectorized", parse_ubipharm_txt(raw, engine="vectorized")),
+        ("file", ubipharm.parse_ubipharm_file(path)),
+        ("parallel", ubipharm.parse_ubipharm_parallel(path, workers=2, min_bytes=0)),
+    ]:
+        pd.testing.assert_frame_equal(df, expected, obj=name)
@@ -0,0 +1,61 @@
+"""
+Fins de ligne et blancs inhabituels : '\r' isolés (anciens exports Mac), NEL (\x85),
+séparateurs Unicode, espaces insécables entre les champs. Chaque chemin de parsing
+(texte, mmap, parallèle, vectorisé) doit rendre la même sortie que l'export '\n' ordinaire.
+"""
+import pandas as pd
+import pytest
+
+from benchmarks.synthetic import iter_ubipharm_lines
+from parsers.ubipharm import (
+    _needs_text_parser, parse_ubipharm_bytes, parse_ubipharm_file, parse_ubipharm_parallel, parse_ubipharm_txt,
+)
+
+LINES = list(iter_ubipharm_lines(n_regions=3, n_products=40))
+EXPECTED = parse_ubipharm_txt("\n".join(LINES))
+
+
+def nbsp_fields(lines: list) -> list:
+    """Espaces insécables autour du '/' et en tête des lignes produit (en-tête intact)."""
+    return [
+        "\xa0" + line[1:].replace(" / ", "\xa0/\xa0") if line.startswith("  ") and "Stocks" not in line else line
+        for line in lines
+    ]
+
+
+CASES = {
+    "cr": ("\r".join(LINES), ["latin-1", "utf-8"]),
+    "nel": ("\x85".join(LINES), ["latin-1", "utf-8"]),
+    "line_separator": ("\u2028".join(LINES), ["utf-8"]),
+    "form_feed": ("\f".join(LINES), ["latin-1", "utf-8"]),
+    "nbsp": ("\r\n".join(nbsp_fields(LINES)), ["latin-1", "utf-8"]),
+}
+PARAMS = [pytest.param(text, encoding, id=f"{name}-{encoding}")
+          for name, (text, encodings) in CASES.items() for encoding in encodings]
+
+
+def parsers(path, raw: bytes):
+    yield "txt", parse_ubipharm_txt(raw)
+    yield "txt_vectorized", parse_ubipharm_txt(raw, engine="vectorized")
+    yield "bytes_vectorized", parse_ubipharm_bytes(raw, engine="vectorized")
+    yield "file", parse_ubipharm_file(path)
+    yield "file_vectorized", parse_ubipharm_file(path, engine="vectorized")
+    yield "parallel_path", parse_ubipharm_parallel(path, workers=2, min_bytes=0)
+    yield "parallel_bytes", parse_ubipharm_parallel(raw, workers=2, min_bytes=0)
+
+
+@pytest.mark.parametrize("text, encoding", PARAMS)
+def test_every_path_matches_plain_export(tmp_path, text, encoding):
+    raw = text.encode(encoding)
+    path = tmp_path / "export.txt"
+    path.write_bytes(raw)
+
+    assert len(EXPECTED) == 3 * 40
+    for name, df in parsers(path, raw):
+        pd.testing.assert_frame_equal(df, EXPECTED, obj=name)
+
+
+def test_plain_export_keeps_byte_patterns():
+    for encoding in ["latin-1", "utf-8"]:
+        raw = "\r\n".join(LINES).encode(encoding)
+        assert not _needs_text_parser(raw, encoding)
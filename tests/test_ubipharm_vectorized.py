@@ -0,0 +1,71 @@
+"""
+Briques du moteur vectorisé : conversion des nombres 8 chiffres à la fois, tranches et
+dictionnaires Arrow, recodage latin-1 -> UTF-8, recherche d'octets par tranches.
+"""
+import re
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+import pytest
+
+from parsers.ubipharm import _latin1_to_utf8, _positions, _slices, _sorted_dictionary, _token_values
+
+
+def token_values(tokens: list) -> list:
+    """_token_values sur des mots séparés par des blancs, précédés de 8 octets de marge."""
+    data = b" " * 8 + b" ".join(tokens)
+    words = np.ndarray(shape=(len(data) - 7,), dtype="<u8", buffer=data, strides=(1,))
+    spans = [m.span() for m in re.finditer(rb"\S+", data)]
+    start, end = (np.array(column, dtype=np.int64) for column in zip(*spans))
+    return _token_values(words, start, end).tolist()
+
+
+def test_token_values_by_length():
+    tokens = [b"0", b"7", b"42", b"007", b"1234", b"99999", b"123456", b"1000000", b"98765432"]
+    assert token_values(tokens) == [int(t) for t in tokens]
+
+
+@pytest.mark.parametrize("token", [b"123456789", b"12a", b"a", b"/", b"1-2", b"\xb2", b"\xc2\xb2", b":", b"1.5"])
+def test_token_values_rejects_non_digits_and_long_numbers(token):
+    assert token_values([b"5", token, b"6"]) == [5, -1, 6]
+
+
+def test_token_values_right_after_a_digit():
+    # Les octets avant le mot (autres chiffres, blancs) ne comptent pas
+    assert token_values([b"99999999", b"1", b"99999999", b"22"]) == [99999999, 1, 99999999, 22]
+
+
+def test_slices():
+    data = b"ab cde f ghij"
+    sliced = _slices(data, np.array([0, 3, 7, 9]), np.array([2, 6, 8, 13]))
+    assert sliced.to_pylist() == [b"ab", b"cde", b"f", b"ghij"]
+    assert _slices(data, np.array([], dtype=np.int64), np.array([], dtype=np.int64)).to_pylist() == []
+
+
+def test_latin1_to_utf8():
+    values = pa.array([b"ABC", "ÉLIXIR".encode("latin-1"), b"", "CRÈME Ñ".encode("latin-1")], type=pa.large_binary())
+    assert _latin1_to_utf8(values).cast(pa.large_string()).to_pylist() == ["ABC", "ÉLIXIR", "", "CRÈME Ñ"]
+    # Tranche d'un tableau plus grand : bornes qui ne commencent pas à 0
+    assert _latin1_to_utf8(values.slice(1, 2)).cast(pa.large_string()).to_pylist() == ["ÉLIXIR", ""]
+    ascii_only = pa.array([b"A", b"B"], type=pa.large_binary())
+    assert _latin1_to_utf8(ascii_only) is ascii_only
+
+
+@pytest.mark.parametrize("encoding", ["latin-1", "utf-8"])
+def test_sorted_dictionary_drops_unused_values(encoding):
+    words = ["ZÉRO", "ABC", "ÉTÉ", "ABC", "ZÉRO", "BOB"]
+    encoded = pc.dictionary_encode(pa.array([w.encode(encoding) for w in words], type=pa.large_binary()))
+    encoded = encoded.filter(pa.array([True, True, False, True, True, False]))     # 'ÉTÉ' et 'BOB' inutilisés
+
+    values, codes = _sorted_dictionary(encoded, encoding)
+    assert values.tolist() == ["ABC", "ZÉRO"]
+    assert values[codes].tolist() == ["ZÉRO", "ABC", "ABC", "ZÉRO"]
+
+
+def test_positions_across_slices():
+    buf = np.frombuffer(b"\nab\n\ncd\n" * 5, dtype=np.uint8)
+    expected = np.flatnonzero(buf == 0x0A).tolist()
+    for step in [1, 3, 8, 1 << 20]:
+        assert _positions(buf, 0x0A, step=step).tolist() == expected
+    assert _positions(buf[:0], 0x0A).tolist() == []